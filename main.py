@@ -4,11 +4,14 @@ Hello-Scan-Code 顶层入口
 """
 import sys
 import os
+import multiprocessing
 
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 if __name__ == "__main__":
+    # 打包后的可执行文件中，分析进程池的工作进程（forkserver/spawn）由此进入
+    multiprocessing.freeze_support()
     # 导入并运行主程序
     from src.main import main
     # 调用click命令
@@ -9,6 +9,16 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 内置插件之间报告同一问题的规则，合并结果时视为同一规则族
+DEFAULT_RULE_FAMILIES: Dict[str, List[str]] = {
+    "hardcoded_credential": ["PASSWORD_LITERAL", "API_KEY_LITERAL", "SECRET_TOKEN", "SECURITY_001"],
+    "marker_todo": ["KEYWORD_TODO", "TODO_TODO"],
+    "marker_fixme": ["KEYWORD_FIXME", "TODO_FIXME"],
+    "marker_bug": ["KEYWORD_BUG", "TODO_BUG"],
+    "marker_hack": ["KEYWORD_HACK", "TODO_HACK"],
+    "marker_xxx": ["KEYWORD_XXX", "TODO_XXX"],
+}
+
 class ConfigManager:
     """配置管理器"""
     
@@ -47,7 +57,23 @@ class ConfigManager:
             },
             "scan": {
                 "timeout": 300,
-                "max_file_size": 10485760  # 10MB
+                "max_file_size": 10485760,  # 10MB
+                "prefilter_backend": "auto",
+                "unified_prefilter": True,
+                "concurrent_prefilter": True,
+                "jobs": 1,
+                "analysis_workers": 0,
+                "columnar_batch_lines": 0,
+                "merge_findings": True,
+                "rule_families": DEFAULT_RULE_FAMILIES,
+                "incremental": False,
+                "state_db": "db/scan_state.db",
+                "include": [],
+                "exclude": [],
+                "respect_gitignore": True,
+                "follow_symlinks": False,
+                "file_source": "auto",
+                "include_untracked": True
             }
         }
     
@@ -95,6 +121,78 @@ class ConfigManager:
         """获取最大文件大小"""
         return self.config.get("scan", {}).get("max_file_size", 10485760)
     
+    def get_scan_jobs(self) -> int:
+        """获取并行grep分片数"""
+        return self.config.get("scan", {}).get("jobs", 1)
+    
+    def get_analysis_workers(self) -> int:
+        """获取插件分析进程数，0表示在主进程内分析"""
+        return self.config.get("scan", {}).get("analysis_workers", 0)
+    
+    def get_columnar_batch_lines(self) -> int:
+        """获取列式批处理的每批行数，0表示按文件分批分析（需要pandas，多进程分析时不生效）"""
+        return self.config.get("scan", {}).get("columnar_batch_lines", 0)
+    
+    def get_merge_findings(self) -> bool:
+        """是否合并同一行上同一规则族的重复结果"""
+        return self.config.get("scan", {}).get("merge_findings", True)
+    
+    def get_rule_families(self) -> Dict[str, List[str]]:
+        """获取规则族定义: {规则族名: [规则ID, ...]}，未列出的规则自成一族"""
+        return self.config.get("scan", {}).get("rule_families", DEFAULT_RULE_FAMILIES)
+    
+    def get_incremental(self) -> bool:
+        """是否启用增量扫描"""
+        return self.config.get("scan", {}).get("incremental", False)
+    
+    def get_state_db_path(self) -> str:
+        """获取增量扫描状态数据库路径"""
+        return self.config.get("scan", {}).get("state_db", "db/scan_state.db")
+    
+    def get_since_revision(self) -> Optional[str]:
+        """获取git起始提交，只扫描该提交以来变更的文件"""
+        return self.config.get("scan", {}).get("since")
+    
+    def get_revision_range(self) -> Optional[str]:
+        """获取git提交区间（如 A..B），只扫描区间内变更的文件"""
+        return self.config.get("scan", {}).get("range")
+    
+    def get_include_globs(self) -> List[str]:
+        """获取文件包含通配规则"""
+        return self.config.get("scan", {}).get("include", [])
+    
+    def get_exclude_globs(self) -> List[str]:
+        """获取文件排除通配规则"""
+        return self.config.get("scan", {}).get("exclude", [])
+    
+    def get_respect_gitignore(self) -> bool:
+        """获取是否遵循.gitignore"""
+        return self.config.get("scan", {}).get("respect_gitignore", True)
+    
+    def get_follow_symlinks(self) -> bool:
+        """获取是否跟随符号链接目录"""
+        return self.config.get("scan", {}).get("follow_symlinks", False)
+    
+    def get_file_source(self) -> str:
+        """获取文件清单来源: auto（git工作区用git索引，否则遍历目录）、git、walk"""
+        return self.config.get("scan", {}).get("file_source", "auto")
+    
+    def get_include_untracked(self) -> bool:
+        """获取使用git索引时是否包含未跟踪文件"""
+        return self.config.get("scan", {}).get("include_untracked", True)
+    
+    def get_prefilter_backend(self) -> str:
+        """获取预扫描后端: auto、grep、rg、git、python、literal"""
+        return self.config.get("scan", {}).get("prefilter_backend", "auto")
+    
+    def get_unified_prefilter(self) -> bool:
+        """是否将所有插件的grep模式合并为一次预扫描"""
+        return self.config.get("scan", {}).get("unified_prefilter", True)
+    
+    def get_concurrent_prefilter(self) -> bool:
+        """不合并模式时，是否并发执行各模式组的预扫描"""
+        return self.config.get("scan", {}).get("concurrent_prefilter", True)
+    
     def get_plugin_config(self, plugin_id: str) -> Dict[str, Any]:
         """获取特定插件的配置"""
         return self.config.get("plugin_configs", {}).get(plugin_id, {})
@@ -19,6 +19,7 @@ class ScanResultModel:
     category: str = ""
     suggestion: Optional[str] = None
     code_snippet: Optional[str] = None
+    rule_ids: str = ""  # 合并记录中参与合并的全部规则ID，逗号分隔
     created_at: Optional[datetime] = None
     
     def to_dict(self) -> dict:
@@ -35,6 +36,7 @@ class ScanResultModel:
             "category": self.category,
             "suggestion": self.suggestion,
             "code_snippet": self.code_snippet,
+            "rule_ids": self.rule_ids,
             "created_at": self.created_at.isoformat() if self.created_at else None
         }
     
@@ -64,6 +66,32 @@ class ScanSummaryModel:
             "ended_at": self.ended_at.isoformat() if self.ended_at else None
         }
     
+    @classmethod
+    def from_dict(cls, data: dict):
+        """从字典创建实例"""
+        return cls(**data)
+
+@dataclass
+class FileStateModel:
+    """文件扫描状态模型（增量扫描缓存）"""
+    path: str = ""
+    size: int = 0
+    mtime_ns: int = 0
+    inode: int = 0
+    content_hash: str = ""
+    findings: str = "[]"  # 该文件产生的扫描结果（JSON）
+    
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            "path": self.path,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "inode": self.inode,
+            "content_hash": self.content_hash,
+            "findings": self.findings
+        }
+    
     @classmethod
     def from_dict(cls, data: dict):
         """从字典创建实例"""
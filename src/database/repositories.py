@@ -1,9 +1,9 @@
 """
 数据库仓储 - 负责数据访问
 """
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from .session_manager import DatabaseSessionManager
-from .models import ScanResultModel, ScanSummaryModel
+from .models import ScanResultModel, ScanSummaryModel, FileStateModel
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,21 +30,31 @@ class ScanResultRepository:
             category TEXT NOT NULL,
             suggestion TEXT,
             code_snippet TEXT,
+            rule_ids TEXT DEFAULT '',
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """
         try:
             self.session_manager.execute_non_query(create_table_sql)
+            self._add_missing_columns()
             logger.info("扫描结果表创建成功")
         except Exception as e:
             logger.error(f"创建扫描结果表失败: {e}")
     
+    def _add_missing_columns(self):
+        """为旧版本创建的表补充后来增加的列"""
+        columns = {row["name"] for row in self.session_manager.execute_query("PRAGMA table_info(scan_results)")}
+        if "rule_ids" not in columns:
+            self.session_manager.execute_non_query("ALTER TABLE scan_results ADD COLUMN rule_ids TEXT DEFAULT ''")
+            logger.info("扫描结果表已增加rule_ids列")
+    
     def save(self, result: ScanResultModel) -> int:
         """保存扫描结果"""
         insert_sql = """
         INSERT INTO scan_results 
-        (plugin_id, file_path, line_number, column, message, severity, rule_id, category, suggestion, code_snippet)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        (plugin_id, file_path, line_number, column, message, severity, rule_id, category, suggestion, code_snippet,
+         rule_ids)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         params = (
             result.plugin_id,
@@ -56,7 +66,8 @@ class ScanResultRepository:
             result.rule_id,
             result.category,
             result.suggestion,
-            result.code_snippet
+            result.code_snippet,
+            result.rule_ids
         )
         
         try:
@@ -68,12 +79,40 @@ class ScanResultRepository:
             return 0
     
     def save_batch(self, results: List[ScanResultModel]) -> int:
-        """批量保存扫描结果"""
-        saved_count = 0
-        for result in results:
-            if self.save(result) > 0:
-                saved_count += 1
-        return saved_count
+        """批量保存扫描结果（单个事务）"""
+        if not results:
+            return 0
+        
+        insert_sql = """
+        INSERT INTO scan_results 
+        (plugin_id, file_path, line_number, column, message, severity, rule_id, category, suggestion, code_snippet,
+         rule_ids)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        params_list = [
+            (
+                result.plugin_id,
+                result.file_path,
+                result.line_number,
+                result.column,
+                result.message,
+                result.severity,
+                result.rule_id,
+                result.category,
+                result.suggestion,
+                result.code_snippet,
+                result.rule_ids
+            )
+            for result in results
+        ]
+        
+        try:
+            rowcount = self.session_manager.execute_many(insert_sql, params_list)
+            logger.debug(f"批量保存扫描结果成功: {rowcount} 条")
+            return rowcount
+        except Exception as e:
+            logger.error(f"批量保存扫描结果失败: {e}")
+            return 0
     
     def get_all(self) -> List[ScanResultModel]:
         """获取所有扫描结果"""
@@ -94,7 +133,8 @@ class ScanResultRepository:
                     rule_id=row["rule_id"],
                     category=row["category"],
                     suggestion=row["suggestion"],
-                    code_snippet=row["code_snippet"]
+                    code_snippet=row["code_snippet"],
+                    rule_ids=row["rule_ids"] or ""
                 )
                 results.append(result)
             return results
@@ -121,7 +161,8 @@ class ScanResultRepository:
                     rule_id=row["rule_id"],
                     category=row["category"],
                     suggestion=row["suggestion"],
-                    code_snippet=row["code_snippet"]
+                    code_snippet=row["code_snippet"],
+                    rule_ids=row["rule_ids"] or ""
                 )
                 results.append(result)
             return results
@@ -210,4 +251,120 @@ class ScanSummaryRepository:
             return None
         except Exception as e:
             logger.error(f"获取最新扫描摘要失败: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+class FileStateRepository:
+    """文件扫描状态仓储（增量扫描缓存）"""
+    
+    def __init__(self, session_manager: DatabaseSessionManager):
+        self.session_manager = session_manager
+        self._create_table()
+    
+    def _create_table(self):
+        """创建表"""
+        create_state_sql = """
+        CREATE TABLE IF NOT EXISTS file_states (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            findings TEXT NOT NULL
+        )
+        """
+        create_meta_sql = """
+        CREATE TABLE IF NOT EXISTS scan_cache_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+        """
+        try:
+            self.session_manager.execute_non_query(create_state_sql)
+            self.session_manager.execute_non_query(create_meta_sql)
+            logger.info("文件状态表创建成功")
+        except Exception as e:
+            logger.error(f"创建文件状态表失败: {e}")
+    
+    def get_all(self) -> Dict[str, FileStateModel]:
+        """获取所有文件状态，以路径为键"""
+        select_sql = "SELECT path, size, mtime_ns, inode, content_hash, findings FROM file_states"
+        
+        try:
+            rows = self.session_manager.execute_query(select_sql)
+            return {
+                row["path"]: FileStateModel(
+                    path=row["path"],
+                    size=row["size"],
+                    mtime_ns=row["mtime_ns"],
+                    inode=row["inode"],
+                    content_hash=row["content_hash"],
+                    findings=row["findings"]
+                )
+                for row in rows
+            }
+        except Exception as e:
+            logger.error(f"获取文件状态失败: {e}")
+            return {}
+    
+    def save_batch(self, states: List[FileStateModel]) -> int:
+        """批量写入（覆盖）文件状态"""
+        if not states:
+            return 0
+        
+        upsert_sql = """
+        INSERT OR REPLACE INTO file_states 
+        (path, size, mtime_ns, inode, content_hash, findings)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """
+        params_list = [
+            (state.path, state.size, state.mtime_ns, state.inode, state.content_hash, state.findings)
+            for state in states
+        ]
+        
+        try:
+            return self.session_manager.execute_many(upsert_sql, params_list)
+        except Exception as e:
+            logger.error(f"保存文件状态失败: {e}")
+            return 0
+    
+    def delete_paths(self, paths: Iterable[str]) -> int:
+        """删除指定路径的文件状态"""
+        params_list = [(path,) for path in paths]
+        if not params_list:
+            return 0
+        
+        try:
+            return self.session_manager.execute_many("DELETE FROM file_states WHERE path = ?", params_list)
+        except Exception as e:
+            logger.error(f"删除文件状态失败: {e}")
+            return 0
+    
+    def delete_all(self) -> int:
+        """清空文件状态"""
+        try:
+            return self.session_manager.execute_non_query("DELETE FROM file_states")
+        except Exception as e:
+            logger.error(f"清空文件状态失败: {e}")
+            return 0
+    
+    def get_meta(self, key: str) -> Optional[str]:
+        """读取缓存元信息"""
+        try:
+            rows = self.session_manager.execute_query(
+                "SELECT value FROM scan_cache_meta WHERE key = ?", (key,)
+            )
+            return rows[0]["value"] if rows else None
+        except Exception as e:
+            logger.error(f"读取缓存元信息失败: {e}")
+            return None
+    
+    def set_meta(self, key: str, value: str) -> int:
+        """写入缓存元信息"""
+        try:
+            return self.session_manager.execute_non_query(
+                "INSERT OR REPLACE INTO scan_cache_meta (key, value) VALUES (?, ?)", (key, value)
+            )
+        except Exception as e:
+            logger.error(f"写入缓存元信息失败: {e}")
+            return 0
\ No newline at end of file
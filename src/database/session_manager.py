@@ -53,4 +53,12 @@ class DatabaseSessionManager:
             cursor = conn.cursor()
             cursor.execute(query, params)
             conn.commit()
+            return cursor.rowcount
+    
+    def execute_many(self, query: str, params_list):
+        """在单个事务中批量执行同一语句"""
+        with self.get_session() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(query, params_list)
+            conn.commit()
             return cursor.rowcount
\ No newline at end of file
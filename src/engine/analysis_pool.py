@@ -0,0 +1,131 @@
+"""
+插件分析进程池 - 将grep命中按文件分批交给多进程并行分析
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import logging
+import multiprocessing
+
+from src.plugin.base import ScanContext
+from .dispatch import plugin_entry
+
+logger = logging.getLogger(__name__)
+
+# 单个任务包含的最大命中行数，过小会放大进程间通信开销
+TASK_MAX_LINES = 1000
+
+# 单个文件的命中批次: (文件路径, [(行号, 行内容, 插件ID元组), ...])
+# 插件ID元组由引擎按扩展名分派表生成，只包含支持该文件的插件
+FileBatch = Tuple[str, List[Tuple[int, str, Tuple[str, ...]]]]
+
+# 工作进程内插件的scan_lines入口，每个进程只初始化一次
+_worker_scan_lines: Dict[str, Any] = {}
+_worker_context: Optional[ScanContext] = None
+# 工作进程中无法解析的插件ID，每个只警告一次
+_worker_missing: Set[str] = set()
+
+
+def _mp_context():
+    """
+    工作进程的启动方式: 优先forkserver，不支持时使用spawn
+
+    工作进程在预扫描、stderr读取和分片线程运行期间按需创建，此时fork会复制其他线程持有的锁，
+    子进程可能因此死锁；forkserver和spawn的子进程不继承这些线程状态。
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def _init_worker(config_manager, repo_path: str):
+    """工作进程初始化: 通过PluginManager加载并初始化启用的插件"""
+    global _worker_scan_lines, _worker_context
+    from src.plugin.manager import PluginManager
+
+    logging.getLogger().setLevel(logging.WARNING)
+    plugin_manager = PluginManager(config_manager)
+    plugin_manager.initialize()
+    _worker_scan_lines = {plugin.plugin_id: plugin_entry(plugin, "scan_lines")
+                          for plugin in plugin_manager.get_enabled_plugins()}
+    _worker_context = ScanContext(repo_path=repo_path)
+
+
+def _analyze_task(task: List[FileBatch]) -> List[Any]:
+    """在工作进程中分析一组文件批次"""
+    results = []
+    for file_path, hits in task:
+        # 按插件分组，每个插件每个文件只调用一次scan_lines
+        batches: Dict[str, List[Tuple[int, str]]] = {}
+        for line_no, line_content, plugin_ids in hits:
+            for plugin_id in plugin_ids:
+                batches.setdefault(plugin_id, []).append((line_no, line_content))
+        for plugin_id, plugin_hits in batches.items():
+            scan_lines = _worker_scan_lines.get(plugin_id)
+            if scan_lines is None:
+                if plugin_id not in _worker_missing:
+                    _worker_missing.add(plugin_id)
+                    logger.warning(f"分析进程中未找到插件 {plugin_id}，其命中行不会被分析 "
+                                   f"（首次出现于 {file_path}，{len(plugin_hits)} 行）")
+                continue
+            results.extend(scan_lines(file_path, plugin_hits, _worker_context))
+    return results
+
+
+class AnalysisPool:
+    """插件分析进程池"""
+
+    def __init__(self, config_manager, repo_path: str, workers: int):
+        self.workers = workers
+        # 在途任务上限，避免grep远快于分析时无限堆积
+        self.max_pending = workers * 4
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=_mp_context(),
+            initializer=_init_worker,
+            initargs=(config_manager, repo_path)
+        )
+
+    def analyze(self, batches: Iterable[FileBatch]) -> Iterator[List[Any]]:
+        """
+        并行分析文件批次
+
+        Args:
+            batches: 按文件分组的命中批次
+
+        Yields:
+            每个任务的分析结果，顺序与提交顺序一致
+        """
+        pending: Deque[Future] = deque()
+        for task in self._iter_tasks(batches):
+            pending.append(self._executor.submit(_analyze_task, task))
+            if len(pending) >= self.max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    @staticmethod
+    def _iter_tasks(batches: Iterable[FileBatch]) -> Iterator[List[FileBatch]]:
+        """把连续的文件批次合并为任务，单个文件批次过大时再切分"""
+        task: List[FileBatch] = []
+        task_lines = 0
+        for file_path, hits in batches:
+            for start in range(0, len(hits), TASK_MAX_LINES):
+                chunk = hits[start:start + TASK_MAX_LINES]
+                task.append((file_path, chunk))
+                task_lines += len(chunk)
+                if task_lines >= TASK_MAX_LINES:
+                    yield task
+                    task = []
+                    task_lines = 0
+        if task:
+            yield task
+
+    def shutdown(self):
+        """关闭进程池"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
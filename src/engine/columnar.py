@@ -0,0 +1,139 @@
+"""
+列式批处理 - 汇集多个文件的命中行为大批次，供插件向量化求值
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+import logging
+
+from .dispatch import file_extension
+
+try:
+    import numpy as np
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    np = None
+    pd = None
+    HAS_PANDAS = False
+
+logger = logging.getLogger(__name__)
+
+# 默认每批行数
+DEFAULT_BATCH_LINES = 65536
+
+
+class LineBatch:
+    """
+    多个文件命中行的列式批次
+
+    file_paths、line_numbers、lines、extensions为等长的pandas Series，
+    索引为批次内的行位置 0..n-1，同一文件的行连续排列。
+    lines固定为object类型，str.contains等按Python re的语义求值，
+    与逐行匹配的结果一致（pyarrow字符串使用RE2，语法与语义不同）。
+    """
+
+    def __init__(self, file_paths: "pd.Series", line_numbers: "pd.Series",
+                 lines: "pd.Series", extensions: "pd.Series"):
+        self.file_paths = file_paths
+        self.line_numbers = line_numbers
+        self.lines = lines
+        self.extensions = extensions
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple[str, int, str]]) -> "LineBatch":
+        """
+        由 (文件路径, 行号, 行内容) 列表创建批次
+
+        文件路径和扩展名以分类类型保存，每个文件只存一份。
+        """
+        files = [row[0] for row in rows]
+        ext_of = {file_path: file_extension(file_path) for file_path in dict.fromkeys(files)}
+        return cls(
+            pd.Series(files, dtype="category"),
+            pd.Series(np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))),
+            pd.Series([row[2] for row in rows], dtype=object),
+            pd.Series([ext_of[file_path] for file_path in files], dtype="category"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def take(self, positions: Sequence[int]) -> "LineBatch":
+        """取出指定位置的行组成新批次（重新编号索引）"""
+        def subset(column: "pd.Series") -> "pd.Series":
+            return column.take(positions).reset_index(drop=True)
+
+        return LineBatch(subset(self.file_paths), subset(self.line_numbers),
+                         subset(self.lines), subset(self.extensions))
+
+    def row(self, position: int) -> Tuple[str, int, str]:
+        """批次内某一行的 (文件路径, 行号, 行内容)"""
+        return (self.file_paths.iat[position], int(self.line_numbers.iat[position]),
+                self.lines.iat[position])
+
+    def iter_files(self) -> Iterator[Tuple[str, List[Tuple[int, str]]]]:
+        """
+        按文件拆分批次，供逐文件处理的插件使用
+
+        Yields:
+            (文件路径, [(行号, 行内容), ...])
+        """
+        current_file = None
+        hits: List[Tuple[int, str]] = []
+        for file_path, line_no, line_content in zip(self.file_paths.tolist(), self.line_numbers.tolist(),
+                                                    self.lines.tolist()):
+            if file_path != current_file:
+                if hits:
+                    yield current_file, hits
+                current_file = file_path
+                hits = []
+            hits.append((line_no, line_content))
+        if hits:
+            yield current_file, hits
+
+
+def iter_line_batches(routed_hits: Iterable[Tuple[str, int, str, Any]],
+                      batch_lines: int = DEFAULT_BATCH_LINES) -> Iterator[Tuple[LineBatch, List[Any]]]:
+    """
+    把命中流汇集为列式批次
+
+    Args:
+        routed_hits: (文件路径, 行号, 行内容, 路由信息) 流
+        batch_lines: 每批行数
+
+    Yields:
+        (批次, 与批次各行对应的路由信息列表)
+    """
+    batch_lines = max(1, batch_lines)
+    rows: List[Tuple[str, int, str]] = []
+    routes: List[Any] = []
+    for file_path, line_no, line_content, route in routed_hits:
+        rows.append((file_path, line_no, line_content))
+        routes.append(route)
+        if len(rows) >= batch_lines:
+            yield LineBatch.from_rows(rows), routes
+            rows = []
+            routes = []
+    if rows:
+        yield LineBatch.from_rows(rows), routes
+
+
+def group_by_plugin(extensions: Sequence[str], dispatches: Sequence[Any]) -> Dict[str, Tuple[Any, List[int]]]:
+    """
+    按插件收集批次中需要分析的行位置
+
+    Args:
+        extensions: 各行的文件扩展名
+        dispatches: 各行的分派表
+
+    Returns:
+        {插件ID: (插件, [行位置, ...])}，按插件首次出现的顺序
+    """
+    groups: Dict[str, Tuple[Any, List[int]]] = {}
+    for position, (file_ext, dispatch) in enumerate(zip(extensions, dispatches)):
+        for plugin_id in dispatch.plugin_ids_for(file_ext):
+            group = groups.get(plugin_id)
+            if group is None:
+                plugin = dispatch.plugins[dispatch.plugin_ids.index(plugin_id)]
+                group = groups[plugin_id] = (plugin, [])
+            group[1].append(position)
+    return groups
@@ -0,0 +1,162 @@
+"""
+插件分派表 - 扫描开始前按扩展名预先计算每个插件的入口
+"""
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from src.plugin.base import IScanPlugin
+
+logger = logging.getLogger(__name__)
+
+# 分派表条目: (插件ID, 绑定的scan_lines/scan_batch/scan_file方法)
+DispatchEntry = Tuple[str, Callable[..., Any]]
+
+# 单次scan_lines调用的最大行数，命中极多的文件分多批交给插件
+MAX_BATCH_LINES = 4096
+
+
+def file_extension(file_path: str) -> str:
+    """文件扩展名，与文件清单中的记录方式一致"""
+    return os.path.splitext(file_path)[1]
+
+
+def supported_extensions(plugin) -> Optional[Tuple[str, ...]]:
+    """插件声明支持的扩展名，未声明时返回None（表示支持所有文件）"""
+    get_extensions = getattr(plugin, "get_supported_extensions", None)
+    if not callable(get_extensions):
+        return None
+    extensions = get_extensions()
+    if not isinstance(extensions, (list, tuple, set, frozenset)):
+        return None
+    return tuple(extensions)
+
+
+def plugin_entry(plugin, method: str) -> Optional[Callable[..., Any]]:
+    """
+    获取插件的分派入口
+
+    scan_lines和scan_batch对未继承IScanPlugin的插件（只保证实现了scan_line）退化为逐行调用。
+    """
+    if method in ("scan_lines", "scan_batch") and not isinstance(plugin, IScanPlugin):
+        scan_line = getattr(plugin, "scan_line", None)
+        if scan_line is None:
+            return None
+
+        def scan_lines(file_path, hits, context):
+            for line_number, line_content in hits:
+                yield from scan_line(file_path, line_number, line_content, context)
+
+        if method == "scan_lines":
+            return scan_lines
+
+        def scan_batch(batch, context):
+            for file_path, hits in batch.iter_files():
+                yield from scan_lines(file_path, hits, context)
+
+        return scan_batch
+    return getattr(plugin, method, None)
+
+
+def iter_file_batches(routed_hits: Iterable[Tuple[str, int, str, Any]],
+                      max_lines: int = MAX_BATCH_LINES) -> Iterator[Tuple[str, List[Tuple[int, str, Any]]]]:
+    """
+    把连续的命中按文件分批
+
+    Args:
+        routed_hits: (文件路径, 行号, 行内容, 路由信息) 流，同一文件的命中连续到达
+        max_lines: 每批最大行数
+
+    Yields:
+        (文件路径, [(行号, 行内容, 路由信息), ...])
+    """
+    current_file = None
+    hits: List[Tuple[int, str, Any]] = []
+    for file_path, line_no, line_content, route in routed_hits:
+        if file_path != current_file or len(hits) >= max_lines:
+            if hits:
+                yield current_file, hits
+            current_file = file_path
+            hits = []
+        hits.append((line_no, line_content, route))
+    if hits:
+        yield current_file, hits
+
+
+def batch_by_plugin(hits: Iterable[Tuple[int, str, "DispatchTable"]],
+                    file_ext: str) -> Dict[str, Tuple[Callable[..., Any], List[Tuple[int, str]]]]:
+    """
+    把同一文件的命中按插件分组
+
+    Args:
+        hits: (行号, 行内容, 该行的分派表)；统一预扫描时各行的分派表可能不同
+        file_ext: 文件扩展名
+
+    Returns:
+        {插件ID: (入口, [(行号, 行内容), ...])}，按插件首次出现的顺序
+    """
+    batches: Dict[str, Tuple[Callable[..., Any], List[Tuple[int, str]]]] = {}
+    for line_no, line_content, dispatch in hits:
+        for plugin_id, entry in dispatch.get(file_ext):
+            batch = batches.get(plugin_id)
+            if batch is None:
+                batch = batches[plugin_id] = (entry, [])
+            batch[1].append((line_no, line_content))
+    return batches
+
+
+class DispatchTable:
+    """
+    扩展名到插件入口的分派表
+
+    每个扫描只构建一次，命中行的分析只需一次字典查找和若干次调用，
+    不再为每个命中、每个插件重复获取支持的扩展名列表并线性查找。
+    同一扩展名下的入口保持插件顺序。
+    """
+
+    def __init__(self, plugins: Iterable[Any], method: str = "scan_lines"):
+        """
+        Args:
+            plugins: 插件列表
+            method: 分派的插件方法名（scan_lines或scan_file）
+        """
+        resolved = [(plugin, plugin_entry(plugin, method)) for plugin in plugins]
+        resolved = [(plugin, entry) for plugin, entry in resolved if entry is not None]
+        self.plugins = tuple(plugin for plugin, _ in resolved)
+        self.plugin_ids = tuple(plugin.plugin_id for plugin in self.plugins)
+        self.method = method
+
+        declared: List[Optional[Tuple[str, ...]]] = [supported_extensions(plugin) for plugin in self.plugins]
+        entries = [(plugin.plugin_id, entry) for plugin, entry in resolved]
+
+        known_extensions = dict.fromkeys(
+            ext for extensions in declared if extensions is not None for ext in extensions
+        )
+        self._table: Dict[str, Tuple[DispatchEntry, ...]] = {
+            ext: tuple(entry for entry, extensions in zip(entries, declared)
+                       if extensions is None or ext in extensions)
+            for ext in known_extensions
+        }
+        # 未列出的扩展名只分派给未声明扩展名的插件
+        self._default: Tuple[DispatchEntry, ...] = tuple(
+            entry for entry, extensions in zip(entries, declared) if extensions is None
+        )
+        self._ids: Dict[str, Tuple[str, ...]] = {
+            ext: tuple(plugin_id for plugin_id, _ in table_entries)
+            for ext, table_entries in self._table.items()
+        }
+        self._default_ids = tuple(plugin_id for plugin_id, _ in self._default)
+
+    def get(self, file_ext: str) -> Tuple[DispatchEntry, ...]:
+        """该扩展名的插件入口"""
+        return self._table.get(file_ext, self._default)
+
+    def plugin_ids_for(self, file_ext: str) -> Tuple[str, ...]:
+        """该扩展名需要执行的插件ID"""
+        return self._ids.get(file_ext, self._default_ids)
+
+    def __bool__(self) -> bool:
+        return bool(self.plugins)
+
+    def __len__(self) -> int:
+        return len(self.plugins)
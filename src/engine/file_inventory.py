@@ -0,0 +1,132 @@
+"""
+文件清单 - 一次遍历仓库，供预扫描、全量扫描与统计共享
+"""
+import os
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from src.utils.file_walker import FileWalker
+
+logger = logging.getLogger(__name__)
+
+
+class FileInventory:
+    """
+    待扫描文件清单
+
+    按列紧凑存储: 路径列表 + 大小/修改时间整型数组 + 扩展名编号数组，
+    大仓库下比逐文件元组或Path对象节省大量内存。
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self.paths: List[str] = []
+        self.sizes = array('q')
+        self.mtimes_ns = array('q')
+        self._ext_ids = array('H')
+        self._ext_table: List[str] = []
+        self._ext_index: Dict[str, int] = {}
+
+    @classmethod
+    def build(cls, repo_path: str, ignore_dirs: Optional[List[str]] = None,
+              file_extensions: Optional[List[str]] = None, **walker_options: Any) -> "FileInventory":
+        """
+        遍历仓库建立文件清单
+
+        Args:
+            repo_path: 仓库路径
+            ignore_dirs: 忽略的目录名，进入前即剪枝
+            file_extensions: 文件扩展名过滤
+            **walker_options: 传给FileWalker的其他选项（include、exclude、respect_gitignore等）
+
+        Returns:
+            文件清单
+        """
+        inventory = cls(repo_path)
+        walker = FileWalker(repo_path, ignore_dirs, file_extensions, **walker_options)
+        for entry in walker.walk():
+            inventory.add(entry.rel_path, entry.size, entry.mtime_ns, entry.ext)
+
+        logger.debug(f"文件清单: {len(inventory)} 个文件")
+        return inventory
+
+    @classmethod
+    def from_paths(cls, repo_path: str, rel_paths: Iterable[str], ignore_dirs: Optional[List[str]] = None,
+                   file_extensions: Optional[List[str]] = None, **walker_options: Any) -> "FileInventory":
+        """
+        由已知的文件路径（如git索引）建立文件清单，不遍历目录
+
+        过滤规则与build一致。
+
+        Args:
+            repo_path: 仓库路径
+            rel_paths: 相对路径列表
+            ignore_dirs: 忽略的目录名
+            file_extensions: 文件扩展名过滤
+            **walker_options: 传给FileWalker的其他选项
+
+        Returns:
+            文件清单
+        """
+        inventory = cls(repo_path)
+        walker = FileWalker(repo_path, ignore_dirs, file_extensions, **walker_options)
+        for entry in walker.filter_paths(rel_paths):
+            inventory.add(entry.rel_path, entry.size, entry.mtime_ns, entry.ext)
+
+        logger.debug(f"文件清单: {len(inventory)} 个文件")
+        return inventory
+
+    def add(self, rel_path: str, size: int, mtime_ns: int, ext: Optional[str] = None):
+        """追加一个文件"""
+        if ext is None:
+            ext = os.path.splitext(rel_path)[1]
+        ext_id = self._ext_index.get(ext)
+        if ext_id is None:
+            ext_id = len(self._ext_table)
+            self._ext_table.append(ext)
+            self._ext_index[ext] = ext_id
+        self.paths.append(rel_path)
+        self.sizes.append(size)
+        self.mtimes_ns.append(mtime_ns)
+        self._ext_ids.append(ext_id)
+
+    def extension(self, index: int) -> str:
+        """获取第index个文件的扩展名"""
+        return self._ext_table[self._ext_ids[index]]
+
+    def restrict(self, rel_paths: Iterable[str]) -> "FileInventory":
+        """
+        取子集，保持原清单顺序
+
+        Args:
+            rel_paths: 需要保留的相对路径
+
+        Returns:
+            新的文件清单
+        """
+        keep = set(rel_paths)
+        subset = FileInventory(self.repo_path)
+        for index, rel_path in enumerate(self.paths):
+            if rel_path in keep:
+                subset.add(rel_path, self.sizes[index], self.mtimes_ns[index], self.extension(index))
+        return subset
+
+    def sized(self, file_extensions: Optional[List[str]] = None) -> Iterator[Tuple[str, int]]:
+        """产出 (相对路径, 大小)，可按扩展名再过滤"""
+        ext_set = set(file_extensions or [])
+        for index, rel_path in enumerate(self.paths):
+            if ext_set and self.extension(index) not in ext_set:
+                continue
+            yield rel_path, self.sizes[index]
+
+    def entries(self) -> Iterator[Tuple[str, str]]:
+        """产出 (相对路径, 扩展名)"""
+        for index, rel_path in enumerate(self.paths):
+            yield rel_path, self.extension(index)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
@@ -0,0 +1,181 @@
+"""
+结果合并 - 同一文件同一行上同一规则族的重复问题合并为一条
+"""
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+# 合并键: (行号, 规则族)，按文件分组
+MergeKey = Tuple[Any, str]
+
+
+def rank_by_file(stream: Iterable[Any], file_order: Dict[str, int],
+                 path_of: Callable[[Any], Any]) -> Iterator[Tuple[Tuple[int, int], Any]]:
+    """
+    为流中的元素标注所在文件在清单中的位置
+
+    不在清单中的文件（或缺少文件路径的元素）排在前一个清单文件之后，
+    按清单顺序产出的流标注后位置单调不减，可直接用于k路归并。
+
+    Args:
+        stream: 命中或结果流
+        file_order: 文件在清单中的序号
+        path_of: 取元素文件路径的函数
+
+    Yields:
+        ((文件序号, 是否不在清单中), 元素)
+    """
+    rank = (-1, 1)
+    for item in stream:
+        index = file_order.get(path_of(item))
+        rank = (index, 0) if index is not None else (rank[0], 1)
+        yield rank, item
+
+
+def order_findings(stages: Sequence[Iterable[Dict[str, Any]]],
+                   file_order: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+    """
+    按文件归并各扫描阶段的结果
+
+    每个阶段（预扫描分析、全量扫描）的结果已按文件清单顺序产出，
+    按文件序号k路归并后同一文件的结果连续排列；每次只保留一个文件的结果，
+    文件内排序后输出，内存占用与单个文件的结果数相当，而不是整次扫描。
+
+    Args:
+        stages: 各阶段的结果字典流，每个流内按文件清单顺序
+        file_order: 文件在清单中的序号
+
+    Yields:
+        结果，文件按清单顺序；文件内按行号、插件ID、规则ID、列号、说明排序，
+        与各阶段的执行方式和先后无关
+    """
+    ranked = [rank_by_file(stage, file_order, _file_of) for stage in stages]
+    if not ranked:
+        return
+    # 位置相同时heapq.merge先取排在前面的阶段，同一文件的结果不会被其他文件隔开
+    merged = heapq.merge(*ranked, key=itemgetter(0)) if len(ranked) > 1 else ranked[0]
+    current_file = None
+    findings: List[Dict[str, Any]] = []
+    for _, result in merged:
+        file_path = result.get("file_path")
+        if file_path != current_file and findings:
+            findings.sort(key=_position_of)
+            yield from findings
+            findings = []
+        current_file = file_path
+        findings.append(result)
+    findings.sort(key=_position_of)
+    yield from findings
+
+
+def _file_of(finding: Dict[str, Any]) -> Any:
+    """结果所在的文件"""
+    return finding.get("file_path")
+
+
+def _position_of(finding: Dict[str, Any]) -> Tuple[int, str, str, int, str]:
+    """文件内排序键，缺少行号的结果排在文件最前"""
+    line_number = finding.get("line_number")
+    column = finding.get("column")
+    return (line_number if isinstance(line_number, int) else -1, str(finding.get("plugin_id") or ""),
+            str(finding.get("rule_id") or ""), column if isinstance(column, int) else 0,
+            str(finding.get("message") or ""))
+
+
+def _precedence(finding: Dict[str, Any]) -> Tuple[int, str, str, str]:
+    """合并时的先后顺序：严重级别从高到低，其次插件ID、规则ID、说明"""
+    return (-_SEVERITY_RANK.get(finding.get("severity"), -1), str(finding.get("plugin_id") or ""),
+            str(finding["rule_id"]), str(finding.get("message") or ""))
+
+
+def combine_findings(findings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    合并同一行同一规则族的多个结果
+
+    以严重级别最高的结果为主记录，级别相同时依次按插件ID、规则ID取最小者，
+    与结果到达的先后无关；rule_ids按同样的顺序记录全部参与合并的规则ID。
+    同一规则在同一行的多次报告（如一行出现多个弱加密算法）保留各自的说明。
+
+    Args:
+        findings: 至少两个待合并的结果字典
+
+    Returns:
+        合并后的结果字典（新对象）
+    """
+    findings = sorted(findings, key=_precedence)
+    primary = findings[0]
+    merged = dict(primary)
+    merged["rule_ids"] = list(dict.fromkeys(finding["rule_id"] for finding in findings))
+    messages = list(dict.fromkeys(finding.get("message", "") for finding in findings
+                                  if finding["rule_id"] == primary["rule_id"]))
+    if len(messages) > 1:
+        merged["message"] = "; ".join(messages)
+    return merged
+
+
+class FindingMerger:
+    """
+    结果合并器
+
+    规则族由配置给出（规则族名 -> 规则ID列表），未列出的规则自成一族。
+    结果按 (行号, 规则族) 的哈希键归并，键相同的结果合并为一条；
+    缺少文件、行号或规则ID的结果不参与合并，原样输出。
+    """
+
+    def __init__(self, rule_families: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        Args:
+            rule_families: 规则族定义，{规则族名: [规则ID, ...]}
+        """
+        self._family_of: Dict[str, str] = {}
+        for family, rule_ids in (rule_families or {}).items():
+            for rule_id in rule_ids:
+                self._family_of[rule_id] = family
+        self.merged_count = 0
+
+    def family_of(self, rule_id: str) -> str:
+        """规则所属的规则族"""
+        return self._family_of.get(rule_id, rule_id)
+
+    def merge(self, results: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        合并结果流
+
+        输入中同一文件的结果须连续排列（见order_findings），每个文件的结果收齐后输出，
+        文件内保持输入顺序；任一时刻只保留一个文件的结果。
+
+        Args:
+            results: 规范化后的结果字典流
+
+        Yields:
+            合并后的结果
+        """
+        current_file = None
+        groups: Dict[MergeKey, List[Dict[str, Any]]] = {}
+        for result in results:
+            file_path = result.get("file_path")
+            line_number = result.get("line_number")
+            rule_id = result.get("rule_id")
+            if file_path != current_file:
+                yield from self._emit(groups)
+                current_file = file_path
+                groups = {}
+            if file_path is None or line_number is None or not rule_id:
+                yield result
+                continue
+            groups.setdefault((line_number, self.family_of(rule_id)), []).append(result)
+        yield from self._emit(groups)
+
+    def _emit(self, groups: Dict[MergeKey, List[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        """输出一个文件的结果"""
+        for findings in groups.values():
+            if len(findings) == 1:
+                yield findings[0]
+                continue
+            self.merged_count += len(findings) - 1
+            yield combine_findings(findings)
@@ -1,47 +1,174 @@
 """
 Grep预扫描器 - 使用系统grep进行高性能初筛
 """
-import subprocess
+import io
 import os
+import heapq
+import queue
 import platform
-from typing import Generator, Tuple, List, Optional
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Generator, Iterable, Tuple, List, Optional, Iterator, Sequence
 from pathlib import Path
 import logging
 
+from .file_inventory import FileInventory
+from .pattern_compiler import GrepArgs, PatternSyntax, PrefilterPattern, build_grep_args, grep_supports_pcre
+from .prefilter import PatternLike, PrefilterBackend, PythonPrefilter
+from .process_supervisor import ProcessSupervisor
+from src.utils.file_walker import FileWalker
+from src.utils.git_utils import is_git_work_tree
+
 logger = logging.getLogger(__name__)
 
-class GrepScanner:
+# 分片结果队列的容量，消费过慢时阻塞分片线程而不是无限缓存
+_SHARD_QUEUE_SIZE = 1024
+_SHARD_DONE = None
+# 每次从工具标准输出读取的字节数
+_READ_CHUNK_SIZE = 1 << 20
+# grep未匹配时退出码为1；xargs在任一命令以1-125退出时返回123
+_GREP_RETURNCODES = (0, 1)
+_XARGS_RETURNCODES = (0, 123)
+
+
+def iter_null_delimited(stream, line_no_separator: bytes = b":",
+                        chunk_size: int = _READ_CHUNK_SIZE) -> Iterator[Tuple[bytes, int, bytes]]:
+    """
+    解析以\0结束文件名的搜索输出（grep -Z / rg --null / git grep -z）
+
+    按块读取二进制输出，文件名中的':'不会被误判为分隔符；
+    文件名与行内容保持字节形式，由调用方按需解码。
+
+    Args:
+        stream: 二进制输出流
+        line_no_separator: 行号之后的分隔符，git grep -z为\0，grep与rg为':'
+        chunk_size: 每次读取的字节数
+
+    Yields:
+        (文件名字节, 行号, 行内容字节)
+    """
+    read = getattr(stream, "read1", stream.read)
+    pending = b""
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        records = (pending + chunk).split(b"\n")
+        pending = records.pop()
+        for record in records:
+            hit = _parse_record(record, line_no_separator)
+            if hit is not None:
+                yield hit
+    if pending:
+        hit = _parse_record(pending, line_no_separator)
+        if hit is not None:
+            yield hit
+
+
+def _parse_record(record: bytes, line_no_separator: bytes) -> Optional[Tuple[bytes, int, bytes]]:
+    """解析一条 path\0line:content 记录"""
+    path, found, rest = record.partition(b"\0")
+    if not found:
+        return None
+    line_no, found, content = rest.partition(line_no_separator)
+    if not found:
+        return None
+    try:
+        return path, int(line_no), content
+    except ValueError:
+        return None
+
+
+def decode_content(content: bytes) -> str:
+    """解码命中行内容并去除行尾空白"""
+    return content.rstrip().decode("utf-8", errors="replace")
+
+class GrepScanner(PrefilterBackend):
     """Grep预扫描器"""
     
+    name = "grep"
+    # 是否支持由工具自身递归遍历仓库；不支持时总是按文件清单分片执行
+    recursive_scan = True
+    # -Z输出中行号之后的分隔符
+    line_no_separator = b":"
+    
     def __init__(self, repo_path: str, ignore_dirs: Optional[List[str]] = None, 
-                 timeout: int = 300):
-        self.repo_path = Path(repo_path).resolve()
-        self.ignore_dirs = ignore_dirs or []
-        self.timeout = timeout
+                 timeout: int = 300, jobs: int = 1):
+        super().__init__(repo_path, ignore_dirs, timeout, jobs)
         self.is_windows = platform.system() == "Windows"
+        # 所有工具进程由监管器启动，超时按scan.timeout计算
+        self.supervisor = ProcessSupervisor(timeout)
+    
+    @classmethod
+    def is_available(cls, repo_path: str) -> bool:
+        """Windows上使用findstr或Python回退，总是可用"""
+        return platform.system() == "Windows" or shutil.which("grep") is not None
         
-    def scan(self, pattern: str, file_extensions: Optional[List[str]] = None) -> Generator[Tuple[str, int, str], None, None]:
+    def scan(self, pattern: PatternLike, file_extensions: Optional[List[str]] = None, 
+             files: Optional[Iterable[str]] = None) -> Generator[Tuple[str, int, str], None, None]:
         """
         执行grep扫描
         
         Args:
-            pattern: 搜索模式
+            pattern: 搜索模式（ERE字符串或PrefilterPattern）
             file_extensions: 文件扩展名过滤
+            files: 限定扫描的文件（相对路径列表或FileInventory），为None时扫描整个仓库
             
         Yields:
             (文件路径, 行号, 行内容)
         """
+        specs = self._compile_patterns([pattern])
         if self.is_windows:
-            yield from self._scan_windows(pattern, file_extensions)
+            if files is not None:
+                yield from self._fallback_scan(specs, file_extensions, files)
+            else:
+                yield from self._scan_windows(specs[0], file_extensions)
         else:
-            yield from self._scan_unix(pattern, file_extensions)
+            yield from self._scan_unix(specs, file_extensions, files)
     
-    def _scan_unix(self, pattern: str, file_extensions: Optional[List[str]]) -> Generator[Tuple[str, int, str], None, None]:
+    def scan_multi(self, patterns: Sequence[PatternLike], file_extensions: Optional[List[str]] = None, 
+                   files: Optional[Iterable[str]] = None) -> Generator[Tuple[str, int, str], None, None]:
+        """
+        单次遍历同时匹配多个模式
+        
+        模式按编译结果选择-F/-E/-P与-i，仓库只读取一遍。
+        命中行不区分是哪个模式匹配的，由调用方自行路由。
+        
+        Args:
+            patterns: 搜索模式列表
+            file_extensions: 文件扩展名过滤
+            files: 限定扫描的文件（相对路径列表或FileInventory），为None时扫描整个仓库
+            
+        Yields:
+            (文件路径, 行号, 行内容)
+        """
+        if not patterns:
+            return
+        specs = self._compile_patterns(patterns)
+        if self.is_windows:
+            # findstr不支持多表达式的正则交替，直接使用Python实现
+            yield from self._fallback_scan(specs, file_extensions, files)
+        else:
+            yield from self._scan_unix(specs, file_extensions, files)
+    
+    def _scan_unix(self, patterns: List[PrefilterPattern], file_extensions: Optional[List[str]], 
+                   files: Optional[Iterable[str]] = None) -> Generator[Tuple[str, int, str], None, None]:
         """Unix系统grep扫描"""
+        grep_args = self._pattern_args(patterns)
+        if grep_args is None:
+            logger.info("模式无法由该后端表达，改用Python实现")
+            yield from self._fallback_scan(patterns, file_extensions, files)
+            return
+        
+        if files is not None or self.jobs > 1 or not self.recursive_scan:
+            yield from self._scan_unix_sharded(grep_args, file_extensions, files)
+            return
+        
         try:
             cmd = [
                 "grep", 
-                "-rn",           # 递归，显示行号
+                "-rnZ",          # 递归，显示行号，文件名后输出\0
                 "--binary-files=without-match",  # 跳过二进制文件
                 "-I",            # 忽略二进制文件
             ]
@@ -55,41 +182,29 @@ class GrepScanner:
             for ignore_dir in self.ignore_dirs:
                 cmd.extend(["--exclude-dir", ignore_dir])
             
-            # 添加模式和路径
-            cmd.extend(["-E", pattern, str(self.repo_path)])
+            # 添加模式，每个模式一个 -e 表达式；不指定路径时递归当前目录，输出即为相对路径
+            cmd.extend(grep_args.args)
             
             logger.debug(f"执行grep命令: {' '.join(cmd)}")
             
-            process = subprocess.Popen(
+            process = self.supervisor.spawn(
                 cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
+                cwd=str(self.repo_path),
+                env=self._command_env(grep_args),
+                expected_returncodes=_GREP_RETURNCODES
             )
             
-            if process.stdout is not None:
-                try:
-                    for line in process.stdout:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        
-                        # 解析grep输出格式: path:line:content
-                        parts = line.split(':', 2)
-                        if len(parts) == 3:
-                            file_path, line_no, content = parts
-                            # 转换为相对路径
-                            rel_path = os.path.relpath(file_path, self.repo_path)
-                            yield rel_path, int(line_no), content
-                        
-                    # 等待进程完成
-                    process.wait(timeout=self.timeout)
-                    
-                except subprocess.TimeoutExpired:
-                    logger.warning("Grep扫描超时")
-                    process.terminate()
+            with process:
+                # 同一文件的命中连续输出，文件名只在变化时解码
+                raw_path, rel_path = None, ""
+                for path, line_no, content in iter_null_delimited(process.stdout, self.line_no_separator):
+                    if path != raw_path:
+                        raw_path, rel_path = path, os.fsdecode(path)
+                    yield rel_path, line_no, decode_content(content)
+                process.wait()
+            
+            if process.timed_out:
+                logger.warning("Grep扫描超时，结果不完整")
                 
         except FileNotFoundError:
             logger.error("系统中未找到grep命令")
@@ -98,17 +213,197 @@ class GrepScanner:
             logger.error(f"Grep扫描失败: {e}")
             raise
     
-    def _scan_windows(self, pattern: str, file_extensions: Optional[List[str]]) -> Generator[Tuple[str, int, str], None, None]:
+    def _pattern_args(self, patterns: List[PrefilterPattern]) -> Optional[GrepArgs]:
+        """构建模式相关的grep参数，无法表达时返回None"""
+        return build_grep_args(patterns, pcre_supported=grep_supports_pcre("grep"))
+    
+    @staticmethod
+    def _command_env(grep_args: GrepArgs) -> Optional[Dict[str, str]]:
+        """按字节匹配与UTF-8匹配结果一致时使用C locale，避免多字节解码的开销"""
+        if not grep_args.c_locale:
+            return None
+        return dict(os.environ, LC_ALL="C")
+    
+    def _scan_unix_sharded(self, grep_args: GrepArgs, file_extensions: Optional[List[str]], 
+                           files: Optional[Iterable[str]] = None) -> Generator[Tuple[str, int, str], None, None]:
+        """按文件清单分片执行grep（分片间并行），结果按文件清单顺序归并"""
+        if files is None:
+            file_sizes = list(self._list_files(file_extensions))
+        else:
+            file_sizes = list(self._sized_files(files, file_extensions))
+        shards = self._split_shards(file_sizes, self.jobs)
+        if not shards:
+            return
+        
+        cmd = ["xargs", "-0"]    # 从标准输入读取以\0分隔的文件清单
+        cmd.extend(self._shard_command(grep_args))
+        env = self._command_env(grep_args)
+        logger.debug(f"分片grep: {len(file_sizes)} 个文件, {len(shards)} 个分片, 命令: {' '.join(cmd)}")
+        
+        queues = [queue.Queue(maxsize=_SHARD_QUEUE_SIZE) for _ in shards]
+        stop_event = threading.Event()
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            futures = [
+                executor.submit(self._run_shard, cmd, shard, shard_queue, stop_event, env)
+                for shard, shard_queue in zip(shards, queues)
+            ]
+            try:
+                # 每个分片内部已按文件序号有序，k路归并即可得到确定的全局顺序
+                for _, rel_path, line_no, content in heapq.merge(*(self._drain_queue(q) for q in queues)):
+                    yield rel_path, line_no, content
+            finally:
+                stop_event.set()
+                for shard_queue in queues:
+                    self._discard_queue(shard_queue)
+            for future in futures:
+                error = future.exception()
+                if error is not None:
+                    self.errors += 1
+                    logger.error(f"Grep分片扫描失败: {error}")
+    
+    def _shard_command(self, grep_args: GrepArgs) -> List[str]:
+        """构建由xargs追加文件参数的搜索命令，输出格式须为 path\0line:content"""
+        cmd = [
+            "grep",
+            "-nHZ",          # 显示行号和文件名，文件名后输出\0
+            "--binary-files=without-match",
+            "-I",
+        ]
+        cmd.extend(grep_args.args)
+        cmd.append("--")
+        return cmd
+    
+    def _list_files(self, file_extensions: Optional[List[str]]) -> Generator[Tuple[str, int], None, None]:
+        """列出待扫描文件 (相对路径, 大小)"""
+        for entry in FileWalker(str(self.repo_path), self.ignore_dirs, file_extensions).walk():
+            yield entry.rel_path, entry.size
+    
+    def _sized_files(self, files: Iterable[str], 
+                     file_extensions: Optional[List[str]]) -> Generator[Tuple[str, int], None, None]:
+        """为给定的文件列表补充文件大小，跳过不存在的文件"""
+        if isinstance(files, FileInventory):
+            # 文件清单已记录大小，无需再次stat
+            yield from files.sized(file_extensions)
+            return
+        for rel_path in files:
+            if file_extensions and os.path.splitext(rel_path)[1] not in file_extensions:
+                continue
+            try:
+                size = os.path.getsize(os.path.join(self.repo_path, rel_path))
+            except OSError:
+                continue
+            yield rel_path, size
+    
+    @staticmethod
+    def _split_shards(files: List[Tuple[str, int]], jobs: int) -> List[List[Tuple[int, str]]]:
+        """按文件大小均衡切分为若干分片，分片内保持文件清单顺序"""
+        shard_count = min(jobs, len(files))
+        if shard_count == 0:
+            return []
+        
+        # 最大优先贪心: 大文件先分配给当前负载最小的分片
+        loads = [(0, index) for index in range(shard_count)]
+        shards: List[List[Tuple[int, str]]] = [[] for _ in range(shard_count)]
+        order = sorted(range(len(files)), key=lambda i: files[i][1], reverse=True)
+        for file_index in order:
+            load, shard_index = heapq.heappop(loads)
+            rel_path, size = files[file_index]
+            shards[shard_index].append((file_index, rel_path))
+            heapq.heappush(loads, (load + size, shard_index))
+        
+        for shard in shards:
+            shard.sort()
+        return shards
+    
+    def _run_shard(self, cmd: List[str], shard: List[Tuple[int, str]], 
+                   out_queue: queue.Queue, stop_event: threading.Event,
+                   env: Optional[Dict[str, str]] = None):
+        """执行单个分片的grep并把命中写入队列"""
+        # 按输出中的原始字节文件名查找，无需解码
+        file_index = {os.fsencode(rel_path): (index, rel_path) for index, rel_path in shard}
+        try:
+            process = self.supervisor.spawn(
+                cmd,
+                stdin=True,
+                cwd=str(self.repo_path),
+                env=env,
+                expected_returncodes=_XARGS_RETURNCODES
+            )
+            feeder = threading.Thread(
+                target=self._feed_file_list,
+                args=(process.stdin, [rel_path for _, rel_path in shard]),
+                daemon=True
+            )
+            feeder.start()
+            try:
+                with process:
+                    for path, line_no, content in iter_null_delimited(process.stdout, self.line_no_separator):
+                        if stop_event.is_set():
+                            # 消费方已停止读取，直接结束grep避免阻塞在写管道上
+                            process.kill()
+                            break
+                        entry = file_index.get(path)
+                        if entry is None:
+                            continue
+                        index, rel_path = entry
+                        out_queue.put((index, rel_path, line_no, decode_content(content)))
+                    process.wait()
+                if process.timed_out:
+                    logger.warning("Grep分片扫描超时，结果不完整")
+            finally:
+                feeder.join()
+        finally:
+            out_queue.put(_SHARD_DONE)
+    
+    @staticmethod
+    def _feed_file_list(stdin, files: List[str]):
+        """向xargs写入以\\0分隔的文件清单"""
+        try:
+            for rel_path in files:
+                stdin.write(os.fsencode(rel_path) + b"\0")
+        except (BrokenPipeError, OSError, ValueError):
+            pass
+        finally:
+            try:
+                stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+    
+    @staticmethod
+    def _drain_queue(shard_queue: queue.Queue) -> Iterator[Tuple[int, str, int, str]]:
+        """逐个读取分片队列直到结束标记"""
+        while True:
+            item = shard_queue.get()
+            if item is _SHARD_DONE:
+                return
+            yield item
+    
+    @staticmethod
+    def _discard_queue(shard_queue: queue.Queue):
+        """丢弃队列中剩余结果，避免分片线程阻塞在put上"""
+        try:
+            while True:
+                shard_queue.get_nowait()
+        except queue.Empty:
+            pass
+    
+    def _scan_windows(self, pattern: PrefilterPattern, file_extensions: Optional[List[str]]) -> Generator[Tuple[str, int, str], None, None]:
         """Windows系统扫描（使用findstr）"""
+        if pattern.syntax is not PatternSyntax.LITERAL:
+            # findstr的正则只支持很小的子集，交替等语法直接使用Python实现
+            yield from self._fallback_scan([pattern], file_extensions)
+            return
         try:
-            # Windows使用findstr命令
+            # Windows使用findstr命令，多个/C:表示任一字面量匹配
             cmd = [
                 "findstr",
                 "/S",           # 递归搜索
                 "/N",           # 显示行号
-                "/R",           # 使用正则
-                pattern
+                "/L",           # 字面量
             ]
+            if pattern.ignore_case:
+                cmd.append("/I")
+            cmd.extend(f"/C:{literal}" for literal in pattern.literals)
             
             # 构建搜索路径和文件模式
             if file_extensions:
@@ -124,74 +419,113 @@ class GrepScanner:
             
             logger.debug(f"执行findstr命令: {' '.join(cmd)}")
             
-            process = subprocess.Popen(
+            process = self.supervisor.spawn(
                 cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                shell=True,  # Windows需要shell
-                cwd=str(self.repo_path)  # 设置工作目录
+                cwd=str(self.repo_path),  # 设置工作目录
+                expected_returncodes=_GREP_RETURNCODES
             )
             
-            if process.stdout is not None:
-                try:
-                    for line in process.stdout:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        
-                        # 解析findstr输出格式: path:line:content
-                        # 例如: test_security.py:1:password = "123456"
-                        logger.debug(f"Findstr输出行: {line}")
-                        parts = line.split(':', 2)
-                        if len(parts) == 3:
-                            file_path, line_no, content = parts
-                            # 转换为相对路径
-                            try:
-                                full_path = Path(self.repo_path) / file_path
-                                rel_path = os.path.relpath(full_path, self.repo_path)
-                                yield rel_path, int(line_no), content
-                            except Exception as e:
-                                logger.debug(f"解析路径失败: {e}")
-                
-                    process.wait(timeout=self.timeout)
+            with process:
+                for line in io.TextIOWrapper(process.stdout, errors="replace"):
+                    line = line.strip()
+                    if not line:
+                        continue
                     
-                except subprocess.TimeoutExpired:
-                    logger.warning("Findstr扫描超时")
-                    process.terminate()
+                    # 解析findstr输出格式: path:line:content
+                    # 例如: test_security.py:1:password = "123456"
+                    logger.debug(f"Findstr输出行: {line}")
+                    parts = line.split(':', 2)
+                    if len(parts) == 3:
+                        file_path, line_no, content = parts
+                        # 转换为相对路径
+                        try:
+                            full_path = Path(self.repo_path) / file_path
+                            rel_path = os.path.relpath(full_path, self.repo_path)
+                            yield rel_path, int(line_no), content
+                        except Exception as e:
+                            logger.debug(f"解析路径失败: {e}")
+                process.wait()
+            
+            if process.timed_out:
+                logger.warning("Findstr扫描超时")
                 
         except Exception as e:
             logger.error(f"Windows扫描失败: {e}")
             # 回退到Python实现
-            yield from self._fallback_scan(pattern, file_extensions)
+            yield from self._fallback_scan([pattern], file_extensions)
     
-    def _fallback_scan(self, pattern: str, file_extensions: Optional[List[str]]) -> Generator[Tuple[str, int, str], None, None]:
+    def _fallback_scan(self, patterns: List[PrefilterPattern], file_extensions: Optional[List[str]], 
+                       files: Optional[Iterable[str]] = None) -> Generator[Tuple[str, int, str], None, None]:
         """回退的Python实现扫描"""
-        import re
-        
         logger.info("使用Python回退扫描")
-        pattern_re = re.compile(pattern)
-        
-        for root, dirs, files in os.walk(self.repo_path):
-            # 过滤忽略目录
-            dirs[:] = [d for d in dirs if d not in self.ignore_dirs]
-            
-            for file in files:
-                file_path = Path(root) / file
-                
-                # 文件扩展名过滤
-                if file_extensions and file_path.suffix not in file_extensions:
-                    continue
-                
-                # 转换为相对路径
-                rel_path = os.path.relpath(file_path, self.repo_path)
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        for line_no, line in enumerate(f, 1):
-                            if pattern_re.search(line):
-                                yield rel_path, line_no, line.strip()
-                except Exception as e:
-                    logger.debug(f"读取文件失败 {file_path}: {e}")
\ No newline at end of file
+        fallback = PythonPrefilter(str(self.repo_path), self.ignore_dirs, self.timeout, self.jobs)
+        yield from fallback.scan_multi(patterns, file_extensions, files)
+
+
+class RipgrepScanner(GrepScanner):
+    """ripgrep预扫描后端，按文件清单分片执行rg"""
+    
+    name = "rg"
+    recursive_scan = False
+    
+    @classmethod
+    def is_available(cls, repo_path: str) -> bool:
+        return shutil.which("rg") is not None and shutil.which("xargs") is not None
+    
+    def _pattern_args(self, patterns: List[PrefilterPattern]) -> Optional[GrepArgs]:
+        """rg的正则语法兼容ERE（含POSIX字符类），不受locale影响"""
+        grep_args = build_grep_args(patterns)
+        if grep_args is None:
+            return None
+        # rg默认即为正则模式，没有-E选项
+        args = [arg for arg in grep_args.args if arg != "-E"]
+        return GrepArgs(args, False)
+    
+    def _shard_command(self, grep_args: GrepArgs) -> List[str]:
+        cmd = [
+            "rg",
+            "--no-config",       # 不读取用户的rg配置，保证输出格式稳定
+            "--no-heading",
+            "--with-filename",
+            "--line-number",
+            "--null",            # 文件名后输出\0
+            "--color", "never",
+            "--no-messages",
+        ]
+        cmd.extend(grep_args.args)
+        cmd.append("--")
+        return cmd
+
+
+class GitGrepScanner(GrepScanner):
+    """git grep预扫描后端，直接读取git对象数据库中的已跟踪文件"""
+    
+    name = "git"
+    recursive_scan = False
+    line_no_separator = b"\0"
+    
+    @classmethod
+    def is_available(cls, repo_path: str) -> bool:
+        if shutil.which("git") is None or shutil.which("xargs") is None:
+            return False
+        return is_git_work_tree(repo_path)
+    
+    def _pattern_args(self, patterns: List[PrefilterPattern]) -> Optional[GrepArgs]:
+        """git grep -P取决于git的编译选项，不使用"""
+        return build_grep_args(patterns)
+    
+    def _shard_command(self, grep_args: GrepArgs) -> List[str]:
+        cmd = [
+            "git",
+            "--literal-pathspecs",       # 文件名按字面匹配，不作为通配符解释
+            "-c", "core.quotepath=false",
+            "grep",
+            "-nz",                       # 文件名与行号后均输出\0
+            "-I",
+            "--no-color",
+            "--untracked",               # 文件清单中可能包含未跟踪文件
+            "--no-exclude-standard",
+        ]
+        cmd.extend(grep_args.args)
+        cmd.append("--")
+        return cmd
@@ -0,0 +1,158 @@
+"""
+增量扫描缓存 - 基于文件状态跳过未变更文件并回放缓存结果
+"""
+import hashlib
+import json
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from src.database.models import FileStateModel
+from src.database.repositories import FileStateRepository
+from src.utils.file_utils import get_file_hash
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_KEY = "fingerprint"
+
+
+class IncrementalCache:
+    """增量扫描缓存"""
+
+    def __init__(self, repository: FileStateRepository, repo_path: str):
+        self.repository = repository
+        self.repo_path = repo_path
+        self._states: Dict[str, FileStateModel] = {}
+        self._pending: Dict[str, FileStateModel] = {}
+        self._findings: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._deleted: List[str] = []
+
+    @staticmethod
+    def compute_fingerprint(plugins: List[Any], plugin_configs: Dict[str, Any], repo_path: str,
+                            scan_settings: Optional[Dict[str, Any]] = None) -> str:
+        """
+        计算缓存指纹
+
+        插件集合、插件版本、插件配置、插件声明的附加内容（如规则包文件）
+        或影响缓存结果的扫描设置变化时指纹随之变化，缓存整体失效。
+
+        Args:
+            plugins: 启用的插件
+            plugin_configs: 插件配置
+            repo_path: 仓库路径
+            scan_settings: 影响缓存结果的扫描设置，如结果合并选项和扩展名
+        """
+        plugin_ids = sorted(plugin.plugin_id for plugin in plugins)
+        payload = {
+            "repo_path": os.path.abspath(repo_path),
+            "plugins": sorted((plugin.plugin_id, plugin.version) for plugin in plugins),
+            "plugin_configs": {plugin_id: plugin_configs.get(plugin_id, {}) for plugin_id in plugin_ids},
+            "plugin_fingerprints": {plugin.plugin_id: IncrementalCache._plugin_fingerprint(plugin)
+                                    for plugin in plugins},
+            "scan_settings": scan_settings or {},
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _plugin_fingerprint(plugin: Any) -> str:
+        """插件声明的附加内容摘要，未实现get_cache_fingerprint的旧插件为空"""
+        get_fingerprint = getattr(plugin, "get_cache_fingerprint", None)
+        return get_fingerprint() if callable(get_fingerprint) else ""
+
+    def load(self, fingerprint: str):
+        """加载缓存，指纹不一致时清空"""
+        stored = self.repository.get_meta(FINGERPRINT_KEY)
+        if stored != fingerprint:
+            if stored is not None:
+                logger.info("插件、插件配置或扫描设置已变化，增量缓存失效")
+            self.repository.delete_all()
+            self.repository.set_meta(FINGERPRINT_KEY, fingerprint)
+            self._states = {}
+        else:
+            self._states = self.repository.get_all()
+        logger.debug(f"增量缓存已加载 {len(self._states)} 个文件状态")
+
+    def classify(self, files: Iterable[str], prune_missing: bool = True) -> Tuple[List[str], List[FileStateModel]]:
+        """
+        区分需要重新扫描的文件与可复用缓存的文件
+
+        先比较大小、修改时间和inode，不一致时再比较内容哈希。
+
+        Args:
+            files: 本次扫描范围内的文件
+            prune_missing: 是否从缓存中删除不在files中的文件；
+                只扫描部分文件（如git变更范围）时应为False
+
+        Returns:
+            (需要扫描的文件列表, 可复用的文件状态列表)
+        """
+        changed: List[str] = []
+        unchanged: List[FileStateModel] = []
+        seen = set()
+
+        for rel_path in files:
+            seen.add(rel_path)
+            try:
+                stat = os.stat(os.path.join(self.repo_path, rel_path))
+            except OSError:
+                continue
+
+            cached = self._states.get(rel_path)
+            if (cached is not None and cached.size == stat.st_size and
+                    cached.mtime_ns == stat.st_mtime_ns and cached.inode == stat.st_ino):
+                unchanged.append(cached)
+                continue
+
+            content_hash = get_file_hash(os.path.join(self.repo_path, rel_path))
+            state = FileStateModel(
+                path=rel_path,
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                inode=stat.st_ino,
+                content_hash=content_hash,
+            )
+            if cached is not None and content_hash and cached.content_hash == content_hash:
+                # 仅元数据变化（如touch、checkout），内容未变，沿用缓存结果
+                state.findings = cached.findings
+                self._pending[rel_path] = state
+                unchanged.append(state)
+            else:
+                self._pending[rel_path] = state
+                changed.append(rel_path)
+
+        if prune_missing:
+            self._deleted = [path for path in self._states if path not in seen]
+        logger.info(f"增量扫描: {len(changed)} 个文件需要扫描，{len(unchanged)} 个文件复用缓存")
+        return changed, unchanged
+
+    @staticmethod
+    def replay(states: Iterable[FileStateModel]) -> Iterator[Dict[str, Any]]:
+        """回放缓存的扫描结果"""
+        for state in states:
+            yield from json.loads(state.findings)
+
+    def record(self, result: Dict[str, Any]):
+        """记录本次扫描产生的结果，按文件归类"""
+        file_path = result.get("file_path")
+        if file_path in self._pending:
+            self._findings[file_path].append(result)
+
+    def commit(self):
+        """写回本次扫描的文件状态与结果"""
+        for rel_path, findings in self._findings.items():
+            self._pending[rel_path].findings = json.dumps(findings, ensure_ascii=False, default=str)
+        self.repository.save_batch(list(self._pending.values()))
+        self.repository.delete_paths(self._deleted)
+        logger.debug(f"增量缓存已更新 {len(self._pending)} 个文件，删除 {len(self._deleted)} 个文件")
+        self._pending.clear()
+        self._findings.clear()
+        self._deleted = []
+
+    def discard(self):
+        """丢弃本次扫描的文件状态与结果，缓存保持扫描前的内容"""
+        logger.debug(f"丢弃 {len(self._pending)} 个文件的待写入状态")
+        self._pending.clear()
+        self._findings.clear()
+        self._deleted = []
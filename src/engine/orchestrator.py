@@ -0,0 +1,172 @@
+"""
+预扫描编排 - 多个模式组的预扫描并发执行，命中经有界队列交给分析阶段
+"""
+import heapq
+import queue
+import threading
+from typing import Any, Callable, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 队列容量（批数），消费过慢时阻塞生产线程而不是无限缓存
+_QUEUE_SIZE = 64
+# 每批命中数，减少线程间交接的次数
+_BATCH_SIZE = 256
+# 生产线程等待队列空位时检查停止标记的间隔（秒）
+_PUT_INTERVAL = 0.1
+
+_STREAM_DONE = object()
+
+
+class PrefilterOrchestrator:
+    """
+    并发预扫描编排器
+
+    每个命中流（通常是一次grep调用）由独立线程驱动，命中按批写入有界队列，
+    消费方按到达顺序读取，或按键从各流的队列中归并读取。总耗时接近最慢的一个模式组，
+    而不是所有模式组之和；分析阶段跟不上时队列写满，生产线程随之阻塞，grep也因管道写满而暂停。
+    """
+
+    def __init__(self, queue_size: int = _QUEUE_SIZE, batch_size: int = _BATCH_SIZE):
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        # 出错结束的流数，非零表示命中不完整
+        self.errors = 0
+
+    def run(self, streams: Sequence[Tuple[Hashable, Iterable[Any]]],
+            key: Optional[Callable[[Any], Any]] = None) -> Iterator[Tuple[Hashable, Any]]:
+        """
+        并发消费多个命中流
+
+        同一个流内的顺序保持不变。未给出key时不同流之间按到达顺序交错，交错方式取决于线程调度，
+        每次运行可能不同；给出key时每个流写入各自的有界队列，按key归并读取，
+        要求每个流内已按key有序，输出顺序与线程调度无关（key相同时排在前面的流先输出）。
+        某个流出错时记录日志并结束该流，不影响其他流，出错的流数记入errors。
+
+        Args:
+            streams: (键, 命中流) 列表
+            key: 归并用的排序键，作用于命中
+
+        Yields:
+            (键, 命中)
+        """
+        if not streams:
+            return
+        if len(streams) == 1:
+            yield from self.merge(streams, key)
+            return
+
+        # 按到达顺序读取时所有流共用一个队列，按key归并时每个流一个队列
+        shared = key is None
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(1 if shared else len(streams))]
+        targets = [queues[0] if shared else queues[index] for index in range(len(streams))]
+        stop_event = threading.Event()
+        threads = [
+            threading.Thread(target=self._produce, args=(stream_key, stream, target, stop_event), daemon=True)
+            for (stream_key, stream), target in zip(streams, targets)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            if shared:
+                yield from self._drain(queues[0], len(threads))
+            else:
+                yield from heapq.merge(*(self._drain(out_queue, 1) for out_queue in queues),
+                                       key=lambda keyed: key(keyed[1]))
+        finally:
+            # 消费方提前结束时通知生产线程停止，并清空队列避免其阻塞在put上
+            stop_event.set()
+            for thread, target in zip(threads, targets):
+                while thread.is_alive():
+                    self._discard(target)
+                    thread.join(timeout=_PUT_INTERVAL)
+
+    def merge(self, streams: Sequence[Tuple[Hashable, Iterable[Any]]],
+              key: Optional[Callable[[Any], Any]] = None) -> Iterator[Tuple[Hashable, Any]]:
+        """
+        在当前线程内按key归并多个命中流，不预读
+
+        各流在消费时才被拉取，适合不需要并发预读的场景；出错处理与run相同。
+        未给出key时依次输出各流。
+
+        Args:
+            streams: (键, 命中流) 列表，每个流内已按key有序
+            key: 归并用的排序键，作用于命中
+
+        Yields:
+            (键, 命中)
+        """
+        guarded = [self._guard(stream_key, stream) for stream_key, stream in streams]
+        if key is None or len(guarded) == 1:
+            for stream in guarded:
+                yield from stream
+            return
+        yield from heapq.merge(*guarded, key=lambda keyed: key(keyed[1]))
+
+    def _guard(self, stream_key: Hashable, stream: Iterable[Any]) -> Iterator[Tuple[Hashable, Any]]:
+        """逐个产出流中的命中，出错时记录并结束该流"""
+        try:
+            for item in stream:
+                yield stream_key, item
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"预扫描 '{stream_key}' 失败: {e}")
+
+    @staticmethod
+    def _drain(out_queue: queue.Queue, stream_count: int) -> Iterator[Tuple[Hashable, Any]]:
+        """从队列中读取命中，直到写入该队列的所有流结束"""
+        remaining = stream_count
+        while remaining:
+            stream_key, batch = out_queue.get()
+            if batch is _STREAM_DONE:
+                remaining -= 1
+                continue
+            for item in batch:
+                yield stream_key, item
+
+    def _produce(self, key: Hashable, stream: Iterable[Any], out_queue: queue.Queue,
+                 stop_event: threading.Event):
+        """驱动单个命中流并按批写入队列"""
+        iterator = iter(stream)
+        batch: List[Any] = []
+        try:
+            for item in iterator:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    if not self._put(out_queue, (key, batch), stop_event):
+                        return
+                    batch = []
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"预扫描 '{key}' 失败: {e}")
+        finally:
+            # 出错前已产出的命中照常交付
+            if batch:
+                self._put(out_queue, (key, batch), stop_event)
+            # 在本线程内关闭生成器，使后端终止仍在运行的工具进程
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            self._put(out_queue, (key, _STREAM_DONE), stop_event)
+
+    @staticmethod
+    def _put(out_queue: queue.Queue, item: Tuple[Hashable, Any], stop_event: threading.Event) -> bool:
+        """阻塞写入队列，消费方停止后放弃；返回是否写入"""
+        while not stop_event.is_set():
+            try:
+                out_queue.put(item, timeout=_PUT_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _discard(out_queue: queue.Queue):
+        """丢弃队列中剩余的命中"""
+        try:
+            while True:
+                out_queue.get_nowait()
+        except queue.Empty:
+            pass
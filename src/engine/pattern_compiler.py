@@ -0,0 +1,252 @@
+"""
+预筛选模式编译 - 按插件声明的选项对模式分类，生成代价最低的grep调用
+"""
+import re
+import shutil
+import subprocess
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+import logging
+
+from src.utils.aho_corasick import parse_literal_alternation
+from src.utils.regex_literals import analyze_prefilter, escape_ere
+
+logger = logging.getLogger(__name__)
+
+
+class PatternSyntax(Enum):
+    """预筛选模式的语法"""
+    LITERAL = "literal"   # 固定字符串（交替），可使用grep -F
+    ERE = "ere"           # POSIX扩展正则，grep -E
+    PCRE = "pcre"         # Perl/Python风格正则，grep -P或转换为ERE
+
+
+# 只有PCRE/Python正则支持的写法，出现时不能直接交给grep -E
+_PCRE_ONLY = re.compile(r"\\[dDAzZhHvVKRQE]|\(\?|[*+?}]\?|[*+?}]\+")
+# ERE中的POSIX字符类在Python正则方括号中的写法
+# 按POSIX locale的ASCII定义精确展开：写成更宽的\w、\S时，在取反的方括号（如[^[:alpha:]]）中反而更严格
+_POSIX_CLASSES = {
+    "[:alnum:]_": "0-9A-Za-z_",
+    "[:alnum:]": "0-9A-Za-z",
+    "[:alpha:]": "A-Za-z",
+    "[:upper:]": "A-Z",
+    "[:lower:]": "a-z",
+    "[:digit:]": "0-9",
+    "[:xdigit:]": "0-9A-Fa-f",
+    "[:space:]": r" \t\n\r\f\v",
+    "[:blank:]": r" \t",
+    "[:punct:]": r"!-/:-@\[-`{-~",
+    "[:cntrl:]": r"\x00-\x1f\x7f",
+    "[:graph:]": r"\x21-\x7e",
+    "[:print:]": r"\x20-\x7e",
+}
+_POSIX_CLASS_RE = re.compile("|".join(re.escape(name) for name in _POSIX_CLASSES))
+# 模式开头的全局内联标志，如(?i)
+_GLOBAL_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+
+
+@dataclass(frozen=True)
+class PrefilterPattern:
+    """
+    编译后的预筛选模式
+
+    相同模式与选项的插件共用同一个实例作为分组键。
+    """
+    pattern: str
+    syntax: PatternSyntax = PatternSyntax.ERE
+    ignore_case: bool = False
+    # LITERAL模式的字面量
+    literals: Tuple[str, ...] = ()
+
+    def __str__(self) -> str:
+        return self.pattern
+
+    def to_ere(self) -> Optional[str]:
+        """ERE形式（不含大小写处理），PCRE模式无法转换时返回None"""
+        if self.syntax is PatternSyntax.LITERAL:
+            return "|".join(escape_ere(literal) for literal in self.literals)
+        if self.syntax is PatternSyntax.ERE:
+            return self.pattern
+        # grep -P的\d、\w等默认只匹配ASCII，按re.ASCII语义转换
+        analyzed = analyze_prefilter(self.pattern, re.ASCII)
+        return analyzed[0] if analyzed is not None else None
+
+    def to_python(self) -> str:
+        """Python正则形式（不含大小写处理），用于纯Python后端和命中行路由"""
+        if self.syntax is PatternSyntax.LITERAL:
+            return "|".join(re.escape(literal) for literal in self.literals)
+        if self.syntax is PatternSyntax.ERE:
+            return ere_to_python(self.pattern)
+        return scope_global_flags(self.pattern)
+
+    def to_pcre(self) -> str:
+        """PCRE形式（不含大小写处理）"""
+        if self.syntax is PatternSyntax.PCRE:
+            return self.pattern
+        # ERE语法（含方括号中的POSIX字符类）本身就是合法的PCRE
+        return self.to_ere()
+
+    def python_regex(self) -> "re.Pattern":
+        """编译为Python正则"""
+        return re.compile(self.to_python(), re.IGNORECASE if self.ignore_case else 0)
+
+    def scoped_python(self) -> str:
+        """带局部大小写标志的Python正则，可以与其他模式合并"""
+        return f"(?{'i' if self.ignore_case else ''}:{self.to_python()})"
+
+    @property
+    def c_locale_safe(self) -> bool:
+        """
+        是否可以在LC_ALL=C下执行
+
+        C locale按字节匹配，只在结果与UTF-8 locale相同时使用：
+        字面量区分大小写，或只含ASCII；ERE只含ASCII，且没有会匹配单个多字节字符的.、
+        方括号或字符类转义。
+        """
+        if self.syntax is PatternSyntax.LITERAL:
+            return not self.ignore_case or all(literal.isascii() for literal in self.literals)
+        ere = self.to_ere()
+        if ere is None or not ere.isascii() or "[" in ere:
+            return False
+        if re.search(r"\\[A-Za-z]", ere):
+            # \w、\s等GNU扩展在C locale下只匹配ASCII
+            return False
+        # .*和.+按字节匹配时仍能覆盖多字节字符
+        return re.search(r"(?<!\\)\.(?![*+])", ere) is None
+
+
+def ere_to_python(pattern: str) -> str:
+    """将ERE中的POSIX字符类转换为Python正则写法，其余ERE语法与Python兼容"""
+    return _POSIX_CLASS_RE.sub(lambda match: _POSIX_CLASSES[match.group(0)], pattern)
+
+
+def scope_global_flags(pattern: str) -> str:
+    """
+    把开头的全局内联标志（如(?i)）改写为局部标志组
+
+    Python只允许全局标志出现在整个表达式开头，改写后的模式嵌入分组或与其他模式合并时仍然合法，
+    匹配结果不变。
+    """
+    flags = ""
+    match = _GLOBAL_FLAGS.match(pattern)
+    while match is not None:
+        flags += match.group(1)
+        pattern = pattern[match.end():]
+        match = _GLOBAL_FLAGS.match(pattern)
+    if not flags:
+        return pattern
+    # 详细模式下末尾的注释会吞掉同一行的右括号
+    closing = "\n)" if "x" in flags else ")"
+    return f"(?{flags}:{pattern}{closing}"
+
+
+def _pcre_pattern(pattern: str, ignore_case: bool) -> PrefilterPattern:
+    """PCRE模式；内联的(?i)在转换为ERE后丢失，记为忽略大小写选项，使grep加-i"""
+    analyzed = analyze_prefilter(pattern, re.ASCII)
+    inline_ignore_case = analyzed is not None and analyzed[1]
+    return PrefilterPattern(pattern, PatternSyntax.PCRE, ignore_case or inline_ignore_case)
+
+
+def compile_pattern(pattern: Union[str, PrefilterPattern],
+                    flags: Optional[Dict[str, Any]] = None) -> PrefilterPattern:
+    """
+    按插件声明的选项对模式分类
+
+    Args:
+        pattern: 插件的grep模式
+        flags: 插件声明的选项 {"ignore_case": bool, "syntax": "ere" | "literal" | "pcre"}
+
+    Returns:
+        编译后的预筛选模式
+    """
+    if isinstance(pattern, PrefilterPattern):
+        return pattern
+    flags = flags or {}
+    ignore_case = bool(flags.get("ignore_case", False))
+    syntax = flags.get("syntax", PatternSyntax.ERE.value)
+
+    if syntax == PatternSyntax.LITERAL.value:
+        return PrefilterPattern(pattern, PatternSyntax.LITERAL, ignore_case, (pattern,))
+    if syntax == PatternSyntax.PCRE.value:
+        return _pcre_pattern(pattern, ignore_case)
+
+    literals = parse_literal_alternation(pattern)
+    if literals is not None and not any("\n" in literal for literal in literals):
+        return PrefilterPattern(pattern, PatternSyntax.LITERAL, ignore_case, tuple(literals))
+    if _PCRE_ONLY.search(pattern):
+        return _pcre_pattern(pattern, ignore_case)
+    return PrefilterPattern(pattern, PatternSyntax.ERE, ignore_case)
+
+
+def plugin_pattern(plugin) -> Optional[PrefilterPattern]:
+    """读取插件的grep模式与选项，插件没有grep模式时返回None"""
+    pattern = plugin.get_grep_pattern()
+    if not pattern:
+        return None
+    get_flags = getattr(plugin, "get_grep_flags", None)
+    flags = get_flags() if callable(get_flags) else {}
+    # 未实现get_grep_flags的旧插件使用默认选项
+    return compile_pattern(pattern, flags if isinstance(flags, dict) else {})
+
+
+class GrepArgs(NamedTuple):
+    """grep调用的模式参数"""
+    args: List[str]
+    c_locale: bool   # 是否可以在LC_ALL=C下执行
+
+
+@lru_cache(maxsize=None)
+def grep_supports_pcre(grep: str = "grep") -> bool:
+    """grep是否支持-P（取决于编译时是否启用PCRE）"""
+    if shutil.which(grep) is None:
+        return False
+    try:
+        result = subprocess.run([grep, "-P", "x"], input=b"", capture_output=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    # 0/1表示执行成功（匹配/未匹配），2表示不支持
+    return result.returncode in (0, 1)
+
+
+def build_grep_args(patterns: Sequence[PrefilterPattern], pcre_supported: bool = False) -> Optional[GrepArgs]:
+    """
+    为一组模式选择代价最低的grep调用
+
+    - 全部是字面量时使用-F
+    - 可以表达为ERE时使用-E
+    - 否则在grep支持时使用-P
+
+    任一模式忽略大小写时整体加-i：预筛选只需要不漏行，多出的命中行由路由和插件排除。
+
+    Returns:
+        GrepArgs；无法用grep表达时返回None，由调用方改用Python实现
+    """
+    if not patterns:
+        return None
+    ignore_case = any(pattern.ignore_case for pattern in patterns)
+    case_args = ["-i"] if ignore_case else []
+    c_locale = all(pattern.c_locale_safe for pattern in patterns)
+
+    if all(pattern.syntax is PatternSyntax.LITERAL for pattern in patterns):
+        literals = list(dict.fromkeys(literal for pattern in patterns for literal in pattern.literals))
+        args = ["-F"] + case_args
+        for literal in literals:
+            args.extend(["-e", literal])
+        return GrepArgs(args, c_locale)
+
+    eres = [pattern.to_ere() for pattern in patterns]
+    if all(ere is not None for ere in eres):
+        args = ["-E"] + case_args
+        for ere in dict.fromkeys(eres):
+            args.extend(["-e", ere])
+        return GrepArgs(args, c_locale)
+
+    if pcre_supported:
+        # grep -P只接受一个模式，合并为一个交替
+        combined = "|".join(f"(?:{pattern.to_pcre()})" for pattern in patterns)
+        return GrepArgs(["-P"] + case_args + ["-e", combined], False)
+
+    logger.debug("存在无法转换为ERE的模式且grep不支持-P")
+    return None
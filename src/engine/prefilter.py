@@ -0,0 +1,240 @@
+"""
+预扫描后端 - 统一的预筛选接口与纯Python实现
+"""
+import mmap
+import os
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Generator, Iterable, List, Optional, Sequence, Tuple, Union
+import logging
+
+from src.utils.aho_corasick import AhoCorasick
+from src.utils.file_walker import FileWalker
+from src.utils.text_utils import LineIndex
+from .pattern_compiler import PatternSyntax, PrefilterPattern, compile_pattern
+
+logger = logging.getLogger(__name__)
+
+# 文件不小于该大小时使用mmap，小文件直接读入更快
+MMAP_THRESHOLD = 64 * 1024
+# 检测二进制文件时读取的字节数
+BINARY_SNIFF_SIZE = 8192
+
+# 规范化的命中: (相对路径, 从1开始的行号, 去掉行尾空白的行内容)
+PrefilterHit = Tuple[str, int, str]
+# 模式可以是ERE字符串，或由插件选项编译得到的PrefilterPattern
+PatternLike = Union[str, PrefilterPattern]
+
+
+class PrefilterBackend(ABC):
+    """
+    预扫描后端接口
+
+    所有实现产出相同格式的命中流，引擎无需关心底层使用的工具:
+    - 路径为相对仓库根目录的本地路径
+    - 行号从1开始
+    - 行内容保留行首缩进，去掉行尾换行和空白
+    - 给定文件清单时，命中按清单中的文件顺序产出
+    """
+
+    # 后端名称，对应配置 scan.prefilter_backend
+    name: str = ""
+
+    def __init__(self, repo_path: str, ignore_dirs: Optional[List[str]] = None,
+                 timeout: int = 300, jobs: int = 1):
+        self.repo_path = Path(repo_path).resolve()
+        self.ignore_dirs = ignore_dirs or []
+        self.timeout = timeout
+        self.jobs = max(1, jobs)
+        # 记录日志后未向调用方抛出的错误次数，非零表示命中流可能不完整
+        self.errors = 0
+
+    @classmethod
+    def is_available(cls, repo_path: str) -> bool:
+        """当前环境是否可以使用该后端"""
+        return True
+
+    def scan(self, pattern: PatternLike, file_extensions: Optional[List[str]] = None,
+             files: Optional[Iterable[str]] = None) -> Generator[PrefilterHit, None, None]:
+        """
+        匹配单个模式
+
+        Args:
+            pattern: 搜索模式（ERE字符串或PrefilterPattern）
+            file_extensions: 文件扩展名过滤
+            files: 限定扫描的文件（相对路径列表或FileInventory），为None时扫描整个仓库
+
+        Yields:
+            (文件路径, 行号, 行内容)
+        """
+        yield from self.scan_multi([pattern], file_extensions, files)
+
+    @abstractmethod
+    def scan_multi(self, patterns: Sequence[PatternLike], file_extensions: Optional[List[str]] = None,
+                   files: Optional[Iterable[str]] = None) -> Generator[PrefilterHit, None, None]:
+        """
+        单次遍历同时匹配多个模式，任一模式匹配即产出该行
+
+        Args:
+            patterns: 搜索模式列表
+            file_extensions: 文件扩展名过滤
+            files: 限定扫描的文件（相对路径列表或FileInventory），为None时扫描整个仓库
+
+        Yields:
+            (文件路径, 行号, 行内容)
+        """
+
+    @staticmethod
+    def _compile_patterns(patterns: Sequence[PatternLike]) -> List[PrefilterPattern]:
+        """字符串模式按区分大小写的ERE编译"""
+        return [compile_pattern(pattern) for pattern in patterns]
+
+    def _iter_files(self, file_extensions: Optional[List[str]],
+                    files: Optional[Iterable[str]]) -> Generator[str, None, None]:
+        """列出待扫描文件的相对路径"""
+        if files is None:
+            for entry in FileWalker(str(self.repo_path), self.ignore_dirs, file_extensions).walk():
+                yield entry.rel_path
+            return
+        for rel_path in files:
+            if not file_extensions or os.path.splitext(rel_path)[1] in file_extensions:
+                yield rel_path
+
+
+class PythonPrefilter(PrefilterBackend):
+    """
+    纯Python预扫描后端，不依赖任何外部命令
+
+    整个文件作为一个字节缓冲区（大文件使用mmap）交给一个编译好的bytes正则，
+    只为命中计算行号、只解码命中行，避免逐行解码和逐行匹配。
+    """
+
+    name = "python"
+
+    def scan_multi(self, patterns: Sequence[PatternLike], file_extensions: Optional[List[str]] = None,
+                   files: Optional[Iterable[str]] = None) -> Generator[PrefilterHit, None, None]:
+        if not patterns:
+            return
+        specs = self._compile_patterns(patterns)
+        pattern = "|".join(spec.scoped_python() for spec in specs)
+
+        bytes_re = None
+        # bytes正则的忽略大小写只处理ASCII
+        if all(spec.pattern.isascii() or not spec.ignore_case for spec in specs):
+            try:
+                bytes_re = re.compile(pattern.encode("utf-8"), re.MULTILINE)
+            except re.error as e:
+                # 个别语法只能在str正则中使用，退回逐行解码匹配
+                logger.debug(f"模式无法编译为bytes正则，使用逐行匹配: {e}")
+        text_re = re.compile(pattern) if bytes_re is None else None
+
+        for rel_path in self._iter_files(file_extensions, files):
+            file_path = self.repo_path / rel_path
+            try:
+                if bytes_re is not None:
+                    yield from self._scan_buffer(rel_path, file_path, bytes_re)
+                else:
+                    yield from self._scan_text(rel_path, file_path, text_re)
+            except Exception as e:
+                logger.debug(f"读取文件失败 {file_path}: {e}")
+
+    def _scan_buffer(self, rel_path: str, file_path: Path,
+                     bytes_re: "re.Pattern") -> Generator[PrefilterHit, None, None]:
+        """在整个文件缓冲区上匹配，按行产出命中"""
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            if size >= MMAP_THRESHOLD:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buffer = f.read()
+            try:
+                # 与grep -I一致，跳过二进制文件
+                if buffer.find(b"\0", 0, BINARY_SNIFF_SIZE) != -1:
+                    return
+                yield from self._iter_line_hits(rel_path, buffer, size, bytes_re)
+            finally:
+                if isinstance(buffer, mmap.mmap):
+                    buffer.close()
+
+    @staticmethod
+    def _iter_line_hits(rel_path: str, buffer, size: int,
+                        bytes_re: "re.Pattern") -> Generator[PrefilterHit, None, None]:
+        """由匹配位置反查所在行，换行偏移索引在首个匹配时建立一次"""
+        index = None
+        pos = 0
+        while pos < size:
+            match = bytes_re.search(buffer, pos)
+            if match is None:
+                return
+            if index is None:
+                index = LineIndex(buffer)
+            line_no = index.line_of(match.start())
+            line_start, line_end = index.span(line_no)
+            line = buffer[line_start:line_end]
+            # 匹配可能跨越换行（如\s、[^x]），按grep的行语义在单行内确认
+            if match.end() <= line_end or bytes_re.search(line):
+                yield rel_path, line_no, line.decode("utf-8", errors="replace").rstrip()
+            # 同一行只报告一次
+            pos = line_end + 1
+
+    @staticmethod
+    def _scan_text(rel_path: str, file_path: Path,
+                   text_re: "re.Pattern") -> Generator[PrefilterHit, None, None]:
+        """逐行解码匹配"""
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            for line_no, line in enumerate(f, 1):
+                if text_re.search(line):
+                    yield rel_path, line_no, line.rstrip()
+
+
+class LiteralPrefilter(PythonPrefilter):
+    """
+    基于Aho–Corasick的纯Python预扫描后端
+
+    所有模式都是字面量交替（如关键字列表）时，一次线性扫描匹配全部字面量；
+    存在真正的正则时回退到bytes正则实现。
+    """
+
+    name = "literal"
+
+    def scan_multi(self, patterns: Sequence[PatternLike], file_extensions: Optional[List[str]] = None,
+                   files: Optional[Iterable[str]] = None) -> Generator[PrefilterHit, None, None]:
+        specs = self._compile_patterns(patterns)
+        ignore_case = any(spec.ignore_case for spec in specs)
+        literals = [literal for spec in specs for literal in spec.literals]
+        if (not specs or any(spec.syntax is not PatternSyntax.LITERAL for spec in specs)
+                or (ignore_case and not all(literal.isascii() for literal in literals))):
+            # bytes的大小写转换只处理ASCII
+            yield from super().scan_multi(specs, file_extensions, files)
+            return
+
+        # 任一模式忽略大小写时整体忽略，多出的命中由路由排除
+        matcher = AhoCorasick([literal.encode("utf-8") for literal in literals], case_sensitive=not ignore_case)
+        for rel_path in self._iter_files(file_extensions, files):
+            file_path = self.repo_path / rel_path
+            try:
+                with open(file_path, 'rb') as f:
+                    buffer = f.read()
+                if buffer.find(b"\0", 0, BINARY_SNIFF_SIZE) != -1:
+                    continue
+                yield from self._iter_literal_hits(rel_path, buffer, matcher)
+            except Exception as e:
+                logger.debug(f"读取文件失败 {file_path}: {e}")
+
+    @staticmethod
+    def _iter_literal_hits(rel_path: str, buffer: bytes,
+                           matcher: AhoCorasick) -> Generator[PrefilterHit, None, None]:
+        """一次遍历缓冲区找出所有匹配，跳过已报告行上的匹配，同一行只报告一次"""
+        index = None
+        line_end = -1
+        for start, _ in matcher.iter_matches(buffer):
+            if start <= line_end:
+                continue
+            if index is None:
+                index = LineIndex(buffer)
+            line_no = index.line_of(start)
+            line_start, line_end = index.span(line_no)
+            yield rel_path, line_no, buffer[line_start:line_end].decode("utf-8", errors="replace").rstrip()
@@ -0,0 +1,346 @@
+"""
+子进程监管 - 预扫描工具进程的启动、超时终止、清理与执行记录
+"""
+import errno
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 每个进程保留的stderr末尾行数
+_STDERR_TAIL_LINES = 20
+# posix_spawn启动的进程轮询退出状态的最长间隔（秒）
+_MAX_POLL_INTERVAL = 0.05
+# posix_spawn不支持切换工作目录，由sh切换后exec目标命令，不额外保留shell进程
+_CHDIR_TRAMPOLINE = ["/bin/sh", "-c", 'cd -- "$0" && exec "$@"']
+
+
+@dataclass
+class ProcessRecord:
+    """单个子进程的执行记录"""
+    args: List[str]
+    pid: int
+    spawn_method: str                   # "posix_spawn" 或 "popen"
+    started: float                      # time.monotonic()
+    finished: Optional[float] = None
+    returncode: Optional[int] = None
+    timed_out: bool = False             # 超过期限被终止
+    killed: bool = False                # 调用方提前结束而终止
+    stderr_lines: int = 0
+    stderr_tail: List[str] = field(default_factory=list)
+
+    @property
+    def command(self) -> str:
+        """可执行文件名"""
+        return os.path.basename(self.args[0]) if self.args else ""
+
+    @property
+    def duration(self) -> Optional[float]:
+        """运行时长（秒），未结束时为None"""
+        if self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+class _SpawnedProcess:
+    """
+    posix_spawn启动的进程，提供与Popen相同的常用接口
+
+    posix_spawn不复制父进程的地址空间，父进程堆很大时比fork快得多。
+    进程放入以自身pid为组号的新进程组。
+    """
+
+    def __init__(self, args: Sequence[str], stdin: bool, cwd: Optional[str],
+                 env: Optional[Dict[str, str]]):
+        executable = shutil.which(args[0])
+        if executable is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), args[0])
+        argv = [executable] + list(args[1:])
+        if cwd is not None:
+            argv = _CHDIR_TRAMPOLINE + [str(cwd)] + argv
+
+        self.args = list(args)
+        self.returncode: Optional[int] = None
+        self._lock = threading.Lock()
+
+        # os.pipe创建的描述符不可继承，子进程只会得到dup2到0/1/2上的一端
+        parent_fds = []
+        child_fds = []
+        file_actions = []
+        try:
+            if stdin:
+                stdin_read, stdin_write = os.pipe()
+                parent_fds.append(stdin_write)
+                child_fds.append(stdin_read)
+                file_actions.append((os.POSIX_SPAWN_DUP2, stdin_read, 0))
+            else:
+                file_actions.append((os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0))
+            stdout_read, stdout_write = os.pipe()
+            parent_fds.append(stdout_read)
+            child_fds.append(stdout_write)
+            file_actions.append((os.POSIX_SPAWN_DUP2, stdout_write, 1))
+            stderr_read, stderr_write = os.pipe()
+            parent_fds.append(stderr_read)
+            child_fds.append(stderr_write)
+            file_actions.append((os.POSIX_SPAWN_DUP2, stderr_write, 2))
+
+            self.pid = os.posix_spawn(
+                argv[0], argv, os.environ if env is None else env,
+                file_actions=file_actions,
+                setpgroup=0,
+                # 与Popen一致，恢复Python忽略的信号，使工具在管道关闭时正常退出
+                setsigdef=(signal.SIGPIPE, signal.SIGXFSZ),
+            )
+        except BaseException:
+            for fd in parent_fds:
+                os.close(fd)
+            raise
+        finally:
+            for fd in child_fds:
+                os.close(fd)
+
+        self.stdin = os.fdopen(stdin_write, "wb") if stdin else None
+        self.stdout = os.fdopen(stdout_read, "rb")
+        self.stderr = os.fdopen(stderr_read, "rb")
+
+    def poll(self) -> Optional[int]:
+        """进程已退出时回收并返回退出码"""
+        with self._lock:
+            if self.returncode is None:
+                try:
+                    pid, status = os.waitpid(self.pid, os.WNOHANG)
+                except ChildProcessError:
+                    # 已被其他途径回收
+                    self.returncode = -1
+                else:
+                    if pid:
+                        self.returncode = os.waitstatus_to_exitcode(status)
+            return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        """等待进程退出"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = 0.001
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            time.sleep(interval)
+            interval = min(interval * 2, _MAX_POLL_INTERVAL)
+        return self.returncode
+
+    def kill(self):
+        """终止进程"""
+        if self.poll() is None:
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+class SupervisedProcess:
+    """
+    受监管的子进程
+
+    stderr由后台线程持续读取，避免管道写满后子进程阻塞；
+    超过期限时终止整个进程组（包括xargs启动的grep等子进程）。
+    作为上下文管理器使用时，退出时总是终止并回收进程。
+    """
+
+    def __init__(self, process, record: ProcessRecord, timeout: Optional[float],
+                 expected_returncodes: Sequence[int]):
+        self.process = process
+        self.record = record
+        self.stdin = process.stdin
+        self.stdout = process.stdout
+        self.timeout = timeout
+        self.expected_returncodes = tuple(expected_returncodes)
+        self._stderr_tail = deque(maxlen=_STDERR_TAIL_LINES)
+        self._finished = False
+        self._finish_lock = threading.Lock()
+
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+        self._timer = None
+        if timeout is not None and timeout > 0:
+            self._timer = threading.Timer(timeout, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self.record.returncode
+
+    @property
+    def timed_out(self) -> bool:
+        return self.record.timed_out
+
+    def _drain_stderr(self):
+        """持续读取stderr，保留末尾若干行"""
+        stderr = self.process.stderr
+        try:
+            for raw_line in iter(stderr.readline, b""):
+                line = raw_line.rstrip().decode("utf-8", errors="replace")
+                self.record.stderr_lines += 1
+                self._stderr_tail.append(line)
+                logger.debug(f"{self.record.command}[{self.pid}] stderr: {line}")
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                stderr.close()
+            except OSError:
+                pass
+
+    def _expire(self):
+        """到达期限仍未结束时终止进程组"""
+        if self.process.poll() is None:
+            self.record.timed_out = True
+            logger.warning(f"{self.record.command} 运行超过 {self.timeout}s，终止进程组 {self.pid}")
+            self._kill_group()
+
+    def _kill_group(self):
+        """终止进程所在的整个进程组"""
+        if self.process.poll() is not None:
+            return
+        try:
+            if hasattr(os, "killpg"):
+                # 进程以自身pid为组号启动
+                os.killpg(self.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def kill(self):
+        """调用方不再需要输出时提前终止"""
+        if self.process.poll() is None:
+            self.record.killed = True
+            self._kill_group()
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        """等待进程退出并记录结果"""
+        returncode = self.process.wait(timeout)
+        self._finish()
+        return returncode
+
+    def close(self):
+        """终止（如仍在运行）并回收进程，关闭管道"""
+        self.kill()
+        for stream in (self.stdin, self.stdout):
+            if stream is not None:
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+        self.process.wait()
+        self._finish()
+
+    def _finish(self):
+        with self._finish_lock:
+            if self._finished:
+                return
+            self._finished = True
+        if self._timer is not None:
+            self._timer.cancel()
+        self._stderr_thread.join(timeout=1)
+        record = self.record
+        record.finished = time.monotonic()
+        record.returncode = self.process.poll()
+        record.stderr_tail = list(self._stderr_tail)
+        logger.debug(f"{record.command}[{record.pid}] 退出码 {record.returncode}, "
+                     f"耗时 {record.duration:.3f}s, stderr {record.stderr_lines} 行")
+        if (record.returncode not in self.expected_returncodes
+                and not record.timed_out and not record.killed):
+            detail = "; ".join(record.stderr_tail[-3:])
+            logger.warning(f"{record.command} 异常退出 ({record.returncode}): {detail}")
+
+    def __enter__(self) -> "SupervisedProcess":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ProcessSupervisor:
+    """
+    预扫描子进程监管器
+
+    统一负责启动（优先posix_spawn）、超时终止与执行记录，
+    所有进程的记录在扫描结束后可供查询。
+    """
+
+    def __init__(self, timeout: Optional[float] = None, use_posix_spawn: bool = True):
+        """
+        Args:
+            timeout: 每个进程的运行期限（秒），为None或0时不限制
+            use_posix_spawn: 平台支持时使用posix_spawn启动进程
+        """
+        self.timeout = timeout
+        self.use_posix_spawn = use_posix_spawn and os.name == "posix" and hasattr(os, "posix_spawn")
+        self._records: List[ProcessRecord] = []
+        self._lock = threading.Lock()
+
+    def spawn(self, args: Sequence[str], stdin: bool = False, cwd: Optional[str] = None,
+              env: Optional[Dict[str, str]] = None,
+              expected_returncodes: Sequence[int] = (0,)) -> SupervisedProcess:
+        """
+        启动受监管的子进程
+
+        Args:
+            args: 命令行
+            stdin: 是否需要向进程写入标准输入（否则连接到空设备）
+            cwd: 工作目录
+            env: 环境变量，为None时继承当前环境
+            expected_returncodes: 正常的退出码（如grep未匹配时为1），其他退出码记录警告
+
+        Returns:
+            受监管的进程，stdin/stdout为二进制流
+        """
+        if self.use_posix_spawn:
+            process = _SpawnedProcess(args, stdin, cwd, env)
+            spawn_method = "posix_spawn"
+        else:
+            process = self._popen(args, stdin, cwd, env)
+            spawn_method = "popen"
+        record = ProcessRecord(list(args), process.pid, spawn_method, time.monotonic())
+        with self._lock:
+            self._records.append(record)
+        logger.debug(f"启动进程 {record.command}[{record.pid}] ({spawn_method})")
+        return SupervisedProcess(process, record, self.timeout, expected_returncodes)
+
+    @staticmethod
+    def _popen(args: Sequence[str], stdin: bool, cwd: Optional[str],
+               env: Optional[Dict[str, str]]) -> subprocess.Popen:
+        """不支持posix_spawn时使用Popen，同样放入新的进程组"""
+        options = {}
+        if os.name == "posix":
+            options["start_new_session"] = True
+        else:
+            options["creationflags"] = getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+        return subprocess.Popen(
+            list(args),
+            stdin=subprocess.PIPE if stdin else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+            **options
+        )
+
+    @property
+    def records(self) -> List[ProcessRecord]:
+        """已启动进程的执行记录"""
+        with self._lock:
+            return list(self._records)
@@ -1,13 +1,32 @@
 """
 优化扫描引擎 - 双阶段扫描架构
 """
+import re
 import time
-from typing import List, Dict, Any, Optional
+from dataclasses import asdict
+from enum import Enum
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from collections import defaultdict
+from operator import itemgetter
 import logging
 from pathlib import Path
 
-from .grep_scanner import GrepScanner
+from .grep_scanner import GrepScanner, RipgrepScanner, GitGrepScanner
+from .prefilter import PrefilterBackend, PythonPrefilter, LiteralPrefilter
+from .pattern_compiler import PrefilterPattern, plugin_pattern
+from .process_supervisor import ProcessSupervisor
+from .orchestrator import PrefilterOrchestrator
+from .dispatch import (
+    DispatchTable, batch_by_plugin, file_extension, iter_file_batches, plugin_entry, supported_extensions,
+)
+from .columnar import HAS_PANDAS, group_by_plugin, iter_line_batches
+from .finding_merger import FindingMerger, order_findings, rank_by_file
+from .analysis_pool import AnalysisPool
+from .incremental import IncrementalCache
+from .file_inventory import FileInventory
+from src.database.session_manager import DatabaseSessionManager
+from src.database.repositories import FileStateRepository
+from src.utils.git_utils import get_changed_files, is_git_work_tree, list_files
 from src.plugin.manager import PluginManager
 from src.plugin.base import IScanPlugin, ScanContext, ScanResult
 
@@ -20,13 +39,23 @@ class OptimizedScanEngine:
         self.config_manager = config_manager
         self.plugin_manager = plugin_manager
         logger.debug(f"扫描引擎初始化，插件管理器ID: {id(plugin_manager)}")
-        self.grep_scanner: Optional[GrepScanner] = None
-        self.stats = {
+        self.grep_scanner: Optional[PrefilterBackend] = None
+        self.stats = self._new_stats()
+    
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        """创建空的统计信息"""
+        return {
             'total_files': 0,
             'scanned_files': 0,
             'total_plugins': 0,
             'scan_time': 0,
-            'results_count': 0
+            'results_count': 0,
+            'prefilter_passes': 0,
+            'prefilter_timeouts': 0,
+            'prefilter_errors': 0,
+            'cached_files': 0,
+            'merged_findings': 0
         }
     
     def scan(self, repo_path: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -39,7 +68,26 @@ class OptimizedScanEngine:
         Returns:
             扫描结果列表
         """
+        return list(self.scan_iter(repo_path))
+    
+    def scan_iter(self, repo_path: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        流式执行代码扫描，问题一经确认立即产出
+        
+        结果不在引擎内累积，调用方逐条消费即可保持内存占用平稳。
+        新扫描文件的结果按文件清单顺序逐个文件输出，文件内按行号排序，
+        与统一、并发或逐组预扫描的选择无关；引擎只保留当前文件的结果，
+        结果合并（scan.merge_findings）也在这一窗口内完成。
+        统计信息在迭代结束后完整可用。
+        
+        Args:
+            repo_path: 代码仓库路径，为None时使用配置中的路径
+            
+        Yields:
+            扫描结果字典
+        """
         start_time = time.time()
+        self.stats = self._new_stats()
         
         # 获取配置
         if repo_path is None:
@@ -52,13 +100,23 @@ class OptimizedScanEngine:
         ignore_dirs = self.config_manager.get_ignore_dirs()
         file_extensions = self.config_manager.get_file_extensions()
         
-        # 计算总文件数
-        file_list = list(self._walk_files(repo_path, file_extensions))
-        self.stats['total_files'] = len(file_list)
+        # 一次遍历建立文件清单，预扫描、全量扫描和统计共用
+        inventory = self._build_inventory(str(repo_path), ignore_dirs, file_extensions)
+        
+        # git变更范围模式：只扫描指定提交以来（或区间内）变更的文件
+        partial_scan = False
+        since = self.config_manager.get_since_revision()
+        rev_range = self.config_manager.get_revision_range()
+        if since or rev_range:
+            inventory = inventory.restrict(get_changed_files(str(repo_path), since=since, rev_range=rev_range))
+            partial_scan = True
+            logger.info(f"git变更范围 {rev_range or since}: {len(inventory)} 个待扫描文件")
+        
+        self.stats['total_files'] = len(inventory)
         logger.debug(f"总文件数: {self.stats['total_files']}")
         
-        # 初始化扫描器
-        self.grep_scanner = GrepScanner(str(repo_path), ignore_dirs)
+        # 初始化预扫描后端
+        self.grep_scanner = self._create_prefilter(str(repo_path), ignore_dirs)
         
         # 获取启用的插件
         enabled_plugins = self.plugin_manager.get_enabled_plugins()
@@ -73,44 +131,218 @@ class OptimizedScanEngine:
         
         self.stats['total_plugins'] = len(enabled_plugins)
         
+        # 增量模式：只扫描状态变化的文件，其余文件回放缓存结果
+        incremental_cache = None
+        if self.config_manager.get_incremental():
+            incremental_cache = self._open_incremental_cache(str(repo_path), enabled_plugins)
+            changed_files, unchanged_states = incremental_cache.classify(
+                inventory, prune_missing=not partial_scan
+            )
+            inventory = inventory.restrict(changed_files)
+            self.stats['cached_files'] = len(unchanged_states)
+            for result in incremental_cache.replay(unchanged_states):
+                self.stats['results_count'] += 1
+                yield result
+        
         logger.info(f"开始扫描仓库: {repo_path}")
         logger.info(f"启用插件数量: {len(enabled_plugins)}")
         
+        # 文件在清单中的序号，各阶段的命中与结果按此归并
+        file_order = {file_path: index for index, file_path in enumerate(inventory)}
+        
         # 按grep模式分组插件
         pattern_groups = self._group_plugins_by_pattern(enabled_plugins)
         
-        all_results = []
+        grep_groups = {pattern: plugins for pattern, plugins in pattern_groups.items() if pattern}
         
         # 第一阶段：grep预扫描 + 插件精准分析
-        for pattern, plugins in pattern_groups.items():
-            if pattern:  # 使用grep优化的插件
+        # 只让预扫描读取至少一个插件支持的文件
+        group_extensions = {pattern: self._prefilter_extensions(plugins, file_extensions)
+                            for pattern, plugins in grep_groups.items()}
+        for pattern, extensions in group_extensions.items():
+            if extensions == []:
+                logger.info(f"grep模式 '{pattern}' 的插件不支持任何已配置的扩展名，跳过")
+        grep_groups = {pattern: plugins for pattern, plugins in grep_groups.items()
+                       if group_extensions[pattern] != []}
+        
+        if len(grep_groups) > 1 and self.config_manager.get_unified_prefilter():
+            # 所有模式合并为一次遍历，命中行按子模式路由到对应插件
+            logger.info(f"使用统一预扫描，合并 {len(grep_groups)} 个grep模式")
+            unified_extensions = self._prefilter_extensions(
+                [plugin for plugins in grep_groups.values() for plugin in plugins], file_extensions
+            )
+            stages = [self._scan_with_unified_grep(grep_groups, str(repo_path), unified_extensions, inventory)]
+        elif len(grep_groups) > 1:
+            # 各模式组分别预扫描，命中按文件清单顺序归并后统一分析；
+            # 并发时各组的预扫描同时执行，耗时接近最慢的一组
+            concurrent = self.config_manager.get_concurrent_prefilter()
+            if concurrent:
+                logger.info(f"并发执行 {len(grep_groups)} 个grep模式")
+            stages = [self._scan_with_grouped_grep(grep_groups, group_extensions, str(repo_path),
+                                                   inventory, file_order, concurrent)]
+        else:
+            stages = []
+            for pattern, plugins in grep_groups.items():
                 logger.info(f"使用grep模式扫描: {pattern}")
-                results = self._scan_with_grep(pattern, plugins, str(repo_path), file_extensions)
-                all_results.extend(results)
+                stages.append(self._scan_with_grep(pattern, plugins, str(repo_path),
+                                                   group_extensions[pattern], inventory))
         
         # 第二阶段：全量扫描插件（不支持grep的插件）
         fallback_plugins = [p for p in enabled_plugins if not p.get_grep_pattern()]
         if fallback_plugins:
             logger.info(f"执行全量扫描插件: {len(fallback_plugins)} 个")
-            results = self._scan_fallback(fallback_plugins, str(repo_path), file_extensions)
-            all_results.extend(results)
+            stages.append(self._scan_fallback(fallback_plugins, str(repo_path), file_extensions, inventory))
+        
+        # 各阶段的结果都按文件清单顺序产出，按文件归并后同一文件的结果连续排列，
+        # 文件内重新排序，使输出与执行方式无关，也使同一文件的结果可以合并
+        results = order_findings([(self._normalize_result(result) for result in stage) for stage in stages],
+                                 file_order)
+        merge_findings = self.config_manager.get_merge_findings()
+        # 合并同一行上同一规则族的重复结果（逐个文件进行），缓存中保存的是合并后的结果
+        merger = None
+        if merge_findings:
+            merger = FindingMerger(self.config_manager.get_rule_families())
+            results = merger.merge(results)
+        for result in results:
+            if incremental_cache is not None:
+                incremental_cache.record(result)
+            self.stats['results_count'] += 1
+            yield result
+        if merger is not None:
+            self.stats['merged_findings'] = merger.merged_count
+        
+        self._collect_process_records()
+        if incremental_cache is not None:
+            if self.stats['prefilter_timeouts'] or self.stats['prefilter_errors']:
+                # 预扫描不完整时变更文件的结果可能缺失，不能当作"无问题"缓存
+                logger.warning("预扫描超时或失败，本次结果不写入增量缓存，变更文件下次重新扫描")
+                incremental_cache.discard()
+            else:
+                incremental_cache.commit()
         
         # 更新统计信息
         self.stats['scan_time'] = int(time.time() - start_time)  # 转换为整数
-        self.stats['results_count'] = len(all_results)
         
         logger.info(f"扫描完成，耗时: {self.stats['scan_time']:.2f}s")
         logger.info(f"发现问题: {self.stats['results_count']} 个")
+    
+    def _collect_process_records(self):
+        """汇总预扫描工具进程的执行记录与后端内部的错误"""
+        self.stats['prefilter_errors'] += getattr(self.grep_scanner, 'errors', 0)
+        supervisor = getattr(self.grep_scanner, 'supervisor', None)
+        if not isinstance(supervisor, ProcessSupervisor):
+            return
+        for record in supervisor.records:
+            logger.debug(f"预扫描进程 {record.command}[{record.pid}]: 退出码 {record.returncode}, "
+                         f"耗时 {record.duration or 0:.3f}s, 超时 {record.timed_out}")
+            if record.timed_out:
+                self.stats['prefilter_timeouts'] += 1
+    
+    def _create_prefilter(self, repo_path: str, ignore_dirs: List[str]) -> PrefilterBackend:
+        """
+        按配置创建预扫描后端
         
-        return all_results
+        auto依次尝试rg、grep，都不可用时使用纯Python实现；
+        指定的后端不可用时同样按auto的顺序回退。
+        """
+        backends = {
+            "rg": RipgrepScanner,
+            "grep": GrepScanner,
+            "git": GitGrepScanner,
+            "python": PythonPrefilter,
+            "literal": LiteralPrefilter,
+        }
+        name = self.config_manager.get_prefilter_backend()
+        if name == "auto":
+            candidates = [backends["rg"], backends["grep"]]
+        elif name in backends:
+            candidates = [backends[name], backends["rg"], backends["grep"]]
+        else:
+            logger.warning(f"未知的预扫描后端 '{name}'，使用auto")
+            candidates = [backends["rg"], backends["grep"]]
+        
+        backend_cls = next((cls for cls in candidates if cls.is_available(repo_path)), PythonPrefilter)
+        if name not in ("auto", backend_cls.name):
+            logger.warning(f"预扫描后端 '{name}' 不可用，改用 '{backend_cls.name}'")
+        logger.debug(f"使用预扫描后端: {backend_cls.name}")
+        return backend_cls(
+            repo_path, ignore_dirs,
+            timeout=self.config_manager.get_scan_timeout(),
+            jobs=self.config_manager.get_scan_jobs()
+        )
+    
+    def _build_inventory(self, repo_path: str, ignore_dirs: List[str], 
+                         file_extensions: List[str]) -> FileInventory:
+        """
+        建立文件清单
+        
+        git工作区直接读取git索引（已遵循.gitignore），否则按配置的忽略与通配规则遍历仓库。
+        """
+        walker_options = {
+            "include": self.config_manager.get_include_globs(),
+            "exclude": self.config_manager.get_exclude_globs(),
+            "follow_symlinks": self.config_manager.get_follow_symlinks(),
+        }
+        respect_gitignore = self.config_manager.get_respect_gitignore()
+        
+        file_source = self.config_manager.get_file_source()
+        # 不遵循.gitignore时需要被忽略的文件，git索引无法提供
+        if file_source != "walk" and respect_gitignore:
+            if is_git_work_tree(repo_path):
+                try:
+                    rel_paths = list_files(repo_path, self.config_manager.get_include_untracked())
+                except RuntimeError as e:
+                    logger.warning(f"读取git索引失败，改为遍历目录: {e}")
+                    rel_paths = []
+                # 索引为空（如扫描路径本身被外层仓库忽略）时同样遍历目录，避免漏扫
+                if rel_paths:
+                    logger.debug(f"使用git索引建立文件清单: {len(rel_paths)} 个文件")
+                    # .gitignore已由git处理，这里只需应用.scanignore
+                    return FileInventory.from_paths(
+                        repo_path, rel_paths, ignore_dirs, file_extensions,
+                        respect_gitignore=False, **walker_options
+                    )
+            elif file_source == "git":
+                logger.warning(f"{repo_path} 不是git工作区，改为遍历目录")
+        
+        return FileInventory.build(
+            repo_path, ignore_dirs, file_extensions,
+            respect_gitignore=respect_gitignore, **walker_options
+        )
     
-    def _group_plugins_by_pattern(self, plugins) -> Dict[str, List]:
-        """按grep模式分组插件"""
+    def _open_incremental_cache(self, repo_path: str, plugins: List) -> IncrementalCache:
+        """打开增量扫描缓存，插件集合、版本、配置或影响结果的扫描设置变化时自动失效"""
+        session_manager = DatabaseSessionManager(self.config_manager.get_state_db_path())
+        cache = IncrementalCache(FileStateRepository(session_manager), repo_path)
+        # 缓存中保存的是合并后的结果，合并选项变化时同样需要失效
+        scan_settings = {
+            "file_extensions": self.config_manager.get_file_extensions(),
+            "merge_findings": self.config_manager.get_merge_findings(),
+            "rule_families": self.config_manager.get_rule_families(),
+        }
+        fingerprint = IncrementalCache.compute_fingerprint(
+            plugins, self.config_manager.get_plugin_configs(), repo_path, scan_settings
+        )
+        cache.load(fingerprint)
+        return cache
+    
+    @staticmethod
+    def _normalize_result(result) -> Dict[str, Any]:
+        """统一结果格式: ScanResult数据类转换为字典，枚举转换为取值"""
+        if isinstance(result, ScanResult):
+            result = asdict(result)
+        severity = result.get("severity")
+        if isinstance(severity, Enum):
+            result["severity"] = severity.value
+        return result
+    
+    def _group_plugins_by_pattern(self, plugins) -> Dict[Optional[PrefilterPattern], List]:
+        """按grep模式及其匹配选项分组插件"""
         groups = defaultdict(list)
         
         for plugin in plugins:
-            pattern = plugin.get_grep_pattern()
-            if pattern:
+            pattern = plugin_pattern(plugin)
+            if pattern is not None:
                 # 合并相同的模式
                 groups[pattern].append(plugin)
             else:
@@ -119,60 +351,234 @@ class OptimizedScanEngine:
         
         return dict(groups)
     
-    def _scan_with_grep(self, pattern: str, plugins: List, 
-                       repo_path: str, file_extensions: List[str]) -> List[Dict[str, Any]]:
-        """使用grep预扫描进行优化扫描"""
-        results = []
+    @staticmethod
+    def _prefilter_extensions(plugins: List, file_extensions: List[str]) -> Optional[List[str]]:
+        """
+        计算一组插件在预扫描时需要读取的扩展名
         
+        即插件支持的扩展名的并集与配置的扩展名的交集，保持配置中的顺序。
+        
+        Args:
+            plugins: 共用一次预扫描的插件
+            file_extensions: 配置的扩展名，为空表示不限制
+            
+        Returns:
+            扩展名列表；None表示不限制；空列表表示没有需要读取的文件
+        """
+        supported = []
+        for plugin in plugins:
+            plugin_extensions = supported_extensions(plugin)
+            if plugin_extensions is None:
+                # 未声明支持范围的插件需要所有文件
+                return file_extensions or None
+            supported.extend(plugin_extensions)
+        supported = list(dict.fromkeys(supported))
+        if not file_extensions:
+            return supported
+        supported_set = set(supported)
+        return [ext for ext in file_extensions if ext in supported_set]
+    
+    def _scan_with_grep(self, pattern: PrefilterPattern, plugins: List, repo_path: str, 
+                       file_extensions: Optional[List[str]], files: Optional[FileInventory] = None) -> Iterator[Any]:
+        """使用grep预扫描进行优化扫描"""
         try:
             # 执行grep扫描
             if self.grep_scanner is not None:
-                grep_stream = self.grep_scanner.scan(pattern, file_extensions)
+                grep_stream = self.grep_scanner.scan(pattern, file_extensions, files)
+                self.stats['prefilter_passes'] += 1
                 
-                # 创建扫描上下文
-                context = ScanContext(repo_path=repo_path)
+                dispatch = DispatchTable(plugins)
+                routed_hits = ((file_path, line_no, line_content, dispatch)
+                               for file_path, line_no, line_content in grep_stream)
+                match_count = [0]
+                yield from self._analyze_hits(routed_hits, repo_path, match_count)
                 
-                # 处理grep结果
-                match_count = 0
-                for file_path, line_no, line_content in grep_stream:
-                    match_count += 1
-                    logger.debug(f"Grep匹配: {file_path}:{line_no}: {line_content}")
-                    # 对每个匹配的行执行插件分析
-                    for plugin in plugins:
-                        # 检查文件类型支持
-                        file_ext = Path(file_path).suffix
-                        if hasattr(plugin, 'get_supported_extensions'):
-                            supported_extensions = plugin.get_supported_extensions()
-                            if file_ext not in supported_extensions:
-                                continue
-                        
-                        # 执行插件扫描
-                        if hasattr(plugin, 'scan_line'):
-                            plugin_results = plugin.scan_line(
-                                file_path, line_no, line_content, context
-                            )
-                            if plugin_results:
-                                logger.debug(f"插件 {plugin.plugin_id} 发现问题: {len(plugin_results)} 个")
-                            results.extend(plugin_results)
-                
-                logger.debug(f"Grep模式 '{pattern}' 找到 {match_count} 个匹配")
+                logger.debug(f"Grep模式 '{pattern}' 找到 {match_count[0]} 个匹配")
                     
         except Exception as e:
+            self.stats['prefilter_errors'] += 1
             logger.error(f"Grep扫描失败: {e}")
+    
+    def _scan_with_unified_grep(self, pattern_groups: Dict[PrefilterPattern, List], repo_path: str, 
+                                file_extensions: Optional[List[str]], files: Optional[FileInventory] = None) -> Iterator[Any]:
+        """所有grep模式合并为一次预扫描，按子模式路由命中行"""
+        routes = self._build_pattern_routes(pattern_groups)
+        
+        try:
+            if self.grep_scanner is not None:
+                grep_stream = self.grep_scanner.scan_multi(list(pattern_groups.keys()), file_extensions, files)
+                self.stats['prefilter_passes'] += 1
+                
+                match_count = [0]
+                yield from self._analyze_hits(self._route_hits(grep_stream, routes), repo_path, match_count)
+                
+                logger.debug(f"统一预扫描找到 {match_count[0]} 个匹配")
         
-        return results
+        except Exception as e:
+            self.stats['prefilter_errors'] += 1
+            logger.error(f"统一Grep扫描失败: {e}")
     
-    def _scan_fallback(self, plugins: List, repo_path: str, 
-                      file_extensions: List[str]) -> List[Dict[str, Any]]:
+    def _scan_with_grouped_grep(self, pattern_groups: Dict[PrefilterPattern, List],
+                                group_extensions: Dict[PrefilterPattern, Optional[List[str]]],
+                                repo_path: str, files: Optional[FileInventory], file_order: Dict[str, int],
+                                concurrent: bool = False) -> Iterator[Any]:
+        """
+        各模式组分别预扫描，命中按文件清单顺序k路归并后交给插件分析
+        
+        每组的命中已按清单顺序产出，归并后同一文件的命中连续到达，只需一次分析，
+        结果顺序与各组的完成先后无关。并发时每组由独立线程驱动并经有界队列预读，
+        否则在消费时才拉取各组的命中（各组的工具进程同时运行，由管道限流）。
+        """
+        if self.grep_scanner is None:
+            return
+        streams = []
+        for pattern in pattern_groups:
+            logger.info(f"使用grep模式扫描: {pattern}")
+            hits = self.grep_scanner.scan(pattern, group_extensions[pattern], files)
+            streams.append((pattern, rank_by_file(hits, file_order, itemgetter(0))))
+            self.stats['prefilter_passes'] += 1
+        
+        dispatch = {pattern: DispatchTable(plugins) for pattern, plugins in pattern_groups.items()}
+        orchestrator = PrefilterOrchestrator()
+        merge = orchestrator.run if concurrent else orchestrator.merge
+        routed_hits = ((file_path, line_no, line_content, dispatch[pattern])
+                       for pattern, (_, (file_path, line_no, line_content)) in merge(streams, key=itemgetter(0)))
+        match_count = [0]
+        try:
+            yield from self._analyze_hits(routed_hits, repo_path, match_count)
+        finally:
+            self.stats['prefilter_errors'] += orchestrator.errors
+        
+        logger.debug(f"{len(streams)} 个grep模式共找到 {match_count[0]} 个匹配")
+    
+    def _route_hits(self, grep_stream, routes: List[Tuple[Optional[re.Pattern], List]]):
+        """只把命中行交给子模式匹配的插件，每种子模式组合的分派表只构建一次"""
+        tables: Dict[Tuple[int, ...], DispatchTable] = {}
+        for file_path, line_no, line_content in grep_stream:
+            key = tuple(index for index, (matcher, _) in enumerate(routes)
+                        if matcher is None or matcher.search(line_content))
+            dispatch = tables.get(key)
+            if dispatch is None:
+                dispatch = DispatchTable([plugin for index in key for plugin in routes[index][1]])
+                tables[key] = dispatch
+            yield file_path, line_no, line_content, dispatch
+    
+    def _analyze_hits(self, routed_hits, repo_path: str, match_count: List[int]) -> Iterator[Any]:
+        """
+        执行插件分析阶段
+        
+        Args:
+            routed_hits: (文件路径, 行号, 行内容, 分派表) 流
+            repo_path: 仓库路径
+            match_count: 单元素列表，累加处理的命中行数
+            
+        Yields:
+            插件分析结果
+        """
+        workers = self.config_manager.get_analysis_workers()
+        if workers > 0:
+            yield from self._analyze_hits_in_pool(routed_hits, repo_path, match_count, workers)
+            return
+        batch_lines = self.config_manager.get_columnar_batch_lines()
+        if batch_lines > 0:
+            if HAS_PANDAS:
+                yield from self._analyze_hits_columnar(routed_hits, repo_path, match_count, batch_lines)
+                return
+            logger.warning("未安装pandas，列式批处理不可用，改为按文件分批分析")
+        
+        context = ScanContext(repo_path=repo_path)
+        try:
+            debug = logger.isEnabledFor(logging.DEBUG)
+            # 同一文件的命中连续到达，按文件分批后每个插件每批只调用一次scan_lines
+            for file_path, hits in iter_file_batches(routed_hits):
+                match_count[0] += len(hits)
+                if debug:
+                    for line_no, line_content, _ in hits:
+                        logger.debug(f"Grep匹配: {file_path}:{line_no}: {line_content}")
+                batches = batch_by_plugin(hits, file_extension(file_path))
+                for plugin_id, (scan_lines, plugin_hits) in batches.items():
+                    plugin_results = scan_lines(file_path, plugin_hits, context)
+                    if plugin_results:
+                        if debug:
+                            logger.debug(f"插件 {plugin_id} 处理 {len(plugin_hits)} 行")
+                        yield from plugin_results
+        finally:
+            context.close()
+    
+    def _analyze_hits_columnar(self, routed_hits, repo_path: str, match_count: List[int],
+                               batch_lines: int) -> Iterator[Any]:
+        """汇集多个文件的命中行为列式批次，每个插件每批只调用一次scan_batch"""
+        context = ScanContext(repo_path=repo_path)
+        try:
+            entries: Dict[str, Any] = {}
+            for batch, dispatches in iter_line_batches(routed_hits, batch_lines):
+                match_count[0] += len(batch)
+                groups = group_by_plugin(batch.extensions.tolist(), dispatches)
+                batch_results = []
+                for plugin_id, (plugin, positions) in groups.items():
+                    scan_batch = entries.get(plugin_id)
+                    if scan_batch is None:
+                        scan_batch = entries[plugin_id] = plugin_entry(plugin, "scan_batch")
+                    plugin_batch = batch if len(positions) == len(batch) else batch.take(positions)
+                    plugin_results = scan_batch(plugin_batch, context)
+                    if plugin_results:
+                        logger.debug(f"插件 {plugin_id} 批量处理 {len(plugin_batch)} 行")
+                        batch_results.extend(self._normalize_result(result) for result in plugin_results)
+                # 一批跨多个文件，按插件产出的结果恢复为文件顺序，与其他分析方式一致
+                file_rank = {file_path: rank for rank, file_path in enumerate(dict.fromkeys(batch.file_paths))}
+                batch_results.sort(key=lambda result: file_rank.get(result.get("file_path"), len(file_rank)))
+                yield from batch_results
+        finally:
+            context.close()
+    
+    def _analyze_hits_in_pool(self, routed_hits, repo_path: str, 
+                              match_count: List[int], workers: int) -> Iterator[Any]:
+        """按文件分批，交给进程池中的插件并行分析，结果按提交顺序合并"""
+        
+        def file_batches():
+            for file_path, hits in iter_file_batches(routed_hits):
+                match_count[0] += len(hits)
+                file_ext = file_extension(file_path)
+                # 只发送支持该扩展名的插件
+                batch = [(line_no, line_content, dispatch.plugin_ids_for(file_ext))
+                         for line_no, line_content, dispatch in hits]
+                batch = [hit for hit in batch if hit[2]]
+                if batch:
+                    yield file_path, batch
+        
+        with AnalysisPool(self.config_manager, repo_path, workers) as pool:
+            for task_results in pool.analyze(file_batches()):
+                yield from task_results
+    
+    def _build_pattern_routes(self, pattern_groups: Dict[PrefilterPattern, List]) -> List[Tuple[Optional[re.Pattern], List]]:
+        """为每个grep模式编译路由用的Python正则（遵循模式的大小写选项）"""
+        routes = []
+        for pattern, plugins in pattern_groups.items():
+            try:
+                matcher = pattern.python_regex()
+            except re.error as e:
+                # 无法用Python正则表达的模式（如POSIX字符类）不做路由过滤，交由插件自行确认
+                logger.debug(f"模式 '{pattern}' 无法编译为Python正则，命中行全部交给插件: {e}")
+                matcher = None
+            routes.append((matcher, plugins))
+        return routes
+    
+    def _scan_fallback(self, plugins: List, repo_path: str, file_extensions: List[str], 
+                       files: Optional[FileInventory] = None) -> Iterator[Any]:
         """全量扫描回退方案"""
-        results = []
         context = ScanContext(repo_path=repo_path)
         
-        # 遍历所有文件
-        for file_path in self._walk_files(repo_path, file_extensions):
+        # 遍历文件清单中的所有文件
+        if files is None:
+            files = self._build_inventory(repo_path, self.config_manager.get_ignore_dirs(), file_extensions)
+        dispatch = DispatchTable(plugins, method="scan_file")
+        for file_path, file_ext in files.entries():
+            self.stats['scanned_files'] += 1
+            # 只读取至少一个插件支持的文件
+            file_plugins = dispatch.get(file_ext)
+            if not file_plugins:
+                continue
             try:
-                self.stats['scanned_files'] += 1
-                file_ext = Path(file_path).suffix
                 full_path = Path(repo_path) / file_path
                 
                 # 读取文件内容
@@ -180,37 +586,14 @@ class OptimizedScanEngine:
                     content = f.read()
                 
                 # 对每个插件执行文件扫描
-                for plugin in plugins:
-                    if hasattr(plugin, 'get_supported_extensions'):
-                        supported_extensions = plugin.get_supported_extensions()
-                        if file_ext in supported_extensions:
-                            if hasattr(plugin, 'scan_file'):
-                                plugin_results = plugin.scan_file(
-                                    file_path, content, context
-                                )
-                                results.extend(plugin_results)
+                for _, scan_file in file_plugins:
+                    plugin_results = scan_file(
+                        file_path, content, context
+                    )
+                    yield from plugin_results
                         
             except Exception as e:
                 logger.debug(f"扫描文件 {file_path} 失败: {e}")
-        
-        return results
-    
-    def _walk_files(self, repo_path: str, file_extensions: List[str]):
-        """遍历代码文件"""
-        repo_path_obj = Path(repo_path)
-        ignore_dirs = self.config_manager.get_ignore_dirs()  # 从配置中获取忽略目录
-        
-        for item in repo_path_obj.rglob('*'):
-            if item.is_file():
-                # 检查忽略目录
-                if any(ignore in str(item) for ignore in ignore_dirs):
-                    continue
-                
-                # 文件扩展名过滤
-                if file_extensions and item.suffix not in file_extensions:
-                    continue
-                
-                yield str(item.relative_to(repo_path_obj))
     
     def get_stats(self) -> Dict[str, Any]:
         """获取扫描统计信息"""
@@ -1,7 +1,7 @@
 """
 数据库导出器
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
 from src.database.repositories import ScanResultRepository, ScanSummaryRepository
 from src.database.models import ScanResultModel, ScanSummaryModel
 import logging
@@ -9,6 +9,37 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# 流式导出时每批写入的结果数
+EXPORT_BATCH_SIZE = 1000
+
+
+class DatabaseStreamWriter:
+    """数据库流式写入器，按批次提交，内存中最多保留一个批次"""
+    
+    def __init__(self, exporter: "DatabaseExporter", batch_size: int = EXPORT_BATCH_SIZE):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.count = 0
+        self._batch: List[ScanResultModel] = []
+    
+    def write(self, result: Dict[str, Any]):
+        """写入一条结果"""
+        self._batch.append(self.exporter._to_model(result))
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+    
+    def _flush(self):
+        if self._batch:
+            self.count += self.exporter.result_repository.save_batch(self._batch)
+            self._batch = []
+    
+    def close(self) -> int:
+        """提交剩余批次并返回保存数量"""
+        self._flush()
+        logger.info(f"已将 {self.count} 条扫描结果保存到数据库")
+        return self.count
+
+
 class DatabaseExporter:
     """数据库导出器"""
     
@@ -20,21 +51,7 @@ class DatabaseExporter:
         """导出扫描结果到数据库"""
         try:
             # 转换字典结果为模型对象
-            model_results = []
-            for result_dict in results:
-                model_result = ScanResultModel(
-                    plugin_id=result_dict.get("plugin_id", ""),
-                    file_path=result_dict.get("file_path", ""),
-                    line_number=result_dict.get("line_number", 0),
-                    column=result_dict.get("column", 0),
-                    message=result_dict.get("message", ""),
-                    severity=result_dict.get("severity", "medium"),
-                    rule_id=result_dict.get("rule_id", ""),
-                    category=result_dict.get("category", ""),
-                    suggestion=result_dict.get("suggestion"),
-                    code_snippet=result_dict.get("code_snippet")
-                )
-                model_results.append(model_result)
+            model_results = [self._to_model(result_dict) for result_dict in results]
             
             # 批量保存到数据库
             saved_count = self.result_repository.save_batch(model_results)
@@ -46,6 +63,38 @@ class DatabaseExporter:
             logger.error(f"导出扫描结果到数据库失败: {e}")
             raise
     
+    @staticmethod
+    def _to_model(result_dict: Dict[str, Any]) -> ScanResultModel:
+        """字典结果转换为模型对象"""
+        return ScanResultModel(
+            plugin_id=result_dict.get("plugin_id", ""),
+            file_path=result_dict.get("file_path", ""),
+            line_number=result_dict.get("line_number", 0),
+            column=result_dict.get("column", 0),
+            message=result_dict.get("message", ""),
+            severity=result_dict.get("severity", "medium"),
+            rule_id=result_dict.get("rule_id", ""),
+            category=result_dict.get("category", ""),
+            suggestion=result_dict.get("suggestion"),
+            code_snippet=result_dict.get("code_snippet"),
+            rule_ids=",".join(result_dict.get("rule_ids") or [])
+        )
+    
+    def stream_writer(self, batch_size: int = EXPORT_BATCH_SIZE) -> DatabaseStreamWriter:
+        """创建流式写入器，用于边扫描边导出"""
+        return DatabaseStreamWriter(self, batch_size)
+    
+    def export_stream(self, results: Iterable[Dict[str, Any]], batch_size: int = EXPORT_BATCH_SIZE) -> int:
+        """分批导出结果流到数据库"""
+        try:
+            writer = self.stream_writer(batch_size)
+            for result in results:
+                writer.write(result)
+            return writer.close()
+        except Exception as e:
+            logger.error(f"导出扫描结果到数据库失败: {e}")
+            raise
+    
     def export_summary(self, summary: Dict[str, Any]) -> int:
         """导出扫描摘要到数据库"""
         try:
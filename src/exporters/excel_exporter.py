@@ -3,12 +3,52 @@ Excel导出器
 """
 import pandas as pd
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 结果表的列顺序
+RESULT_COLUMNS = [
+    "plugin_id", "file_path", "line_number", "column", "message",
+    "severity", "rule_id", "category", "suggestion", "code_snippet", "rule_ids"
+]
+
+
+def _cell_value(value: Any) -> Any:
+    """单元格取值，合并记录的规则ID列表以逗号连接"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value)
+    return value
+
+
+class ExcelStreamWriter:
+    """逐行写入Excel的流式写入器，内存占用与结果数量无关"""
+    
+    def __init__(self, filepath: str):
+        from openpyxl import Workbook
+        
+        self.filepath = filepath
+        self.count = 0
+        # write_only模式下行写入后即序列化，不在内存中保留单元格对象
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+        self._sheet.append(RESULT_COLUMNS)
+    
+    def write(self, result: Dict[str, Any]):
+        """写入一条结果"""
+        self._sheet.append([_cell_value(result.get(col, "")) for col in RESULT_COLUMNS])
+        self.count += 1
+    
+    def close(self) -> str:
+        """保存文件并返回路径"""
+        self._workbook.save(self.filepath)
+        logger.info(f"Excel报告已导出到: {self.filepath}")
+        return self.filepath
+
 class ExcelExporter:
     """Excel导出器"""
     
@@ -39,14 +79,12 @@ class ExcelExporter:
                     "rule_id": pd.Series(dtype='str'),
                     "category": pd.Series(dtype='str'),
                     "suggestion": pd.Series(dtype='str'),
-                    "code_snippet": pd.Series(dtype='str')
+                    "code_snippet": pd.Series(dtype='str'),
+                    "rule_ids": pd.Series(dtype='str')
                 })
             
             # 确保必要的列存在
-            required_columns = [
-                "plugin_id", "file_path", "line_number", "column", "message",
-                "severity", "rule_id", "category", "suggestion", "code_snippet"
-            ]
+            required_columns = RESULT_COLUMNS
             
             for col in required_columns:
                 if col not in df.columns:
@@ -54,6 +92,7 @@ class ExcelExporter:
             
             # 重新排列列的顺序
             df = df[required_columns]
+            df["rule_ids"] = df["rule_ids"].map(_cell_value)
             
             # 生成完整的文件路径
             filepath = os.path.join(self.output_dir, filename)
@@ -68,6 +107,21 @@ class ExcelExporter:
             logger.error(f"导出Excel报告失败: {e}")
             raise
     
+    def stream_writer(self, filename: str = "scan_results.xlsx") -> ExcelStreamWriter:
+        """创建流式写入器，用于边扫描边导出"""
+        return ExcelStreamWriter(os.path.join(self.output_dir, filename))
+    
+    def export_stream(self, results: Iterable[Dict[str, Any]], filename: str = "scan_results.xlsx") -> str:
+        """以有界内存导出结果流到Excel文件"""
+        try:
+            writer = self.stream_writer(filename)
+            for result in results:
+                writer.write(result)
+            return writer.close()
+        except Exception as e:
+            logger.error(f"导出Excel报告失败: {e}")
+            raise
+    
     def export_summary(self, summary: Dict[str, Any], filename: str = "scan_summary.xlsx") -> str:
         """导出扫描摘要到Excel文件"""
         try:
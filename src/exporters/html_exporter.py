@@ -2,7 +2,8 @@
 HTML导出器
 """
 import os
-from typing import List, Dict, Any
+import tempfile
+from typing import List, Dict, Any, Iterable
 from pathlib import Path
 import logging
 from datetime import datetime
@@ -51,7 +52,26 @@ class HTMLExporter:
             grouped_results[plugin_id].append(result)
         
         # 生成HTML
-        html = f"""
+        html = self._render_report_head(len(results), len(grouped_results))
+        
+        # 添加每个插件的结果
+        for plugin_id, plugin_results in grouped_results.items():
+            html += self._render_plugin_head(plugin_id, len(plugin_results))
+            
+            # 添加每个结果
+            for result in plugin_results:
+                html += self._render_result_item(result)
+            
+            html += self._render_plugin_tail()
+        
+        html += self._render_report_tail()
+        
+        return html
+    
+    @staticmethod
+    def _render_report_head(total_results: int, plugin_count: int) -> str:
+        """生成报告头部和摘要"""
+        return f"""
 <!DOCTYPE html>
 <html lang="zh-CN">
 <head>
@@ -156,11 +176,11 @@ class HTMLExporter:
         <h2>扫描摘要</h2>
         <div class="stats">
             <div class="stat-item">
-                <div class="stat-number">{len(results)}</div>
+                <div class="stat-number">{total_results}</div>
                 <div class="stat-label">发现问题</div>
             </div>
             <div class="stat-item">
-                <div class="stat-number">{len(grouped_results)}</div>
+                <div class="stat-number">{plugin_count}</div>
                 <div class="stat-label">插件</div>
             </div>
         </div>
@@ -168,39 +188,64 @@ class HTMLExporter:
     
     <div class="results">
 """
-        
-        # 添加每个插件的结果
-        for plugin_id, plugin_results in grouped_results.items():
-            html += f"""
+    
+    @staticmethod
+    def _render_plugin_head(plugin_id: str, result_count: int) -> str:
+        """生成插件分组的标题"""
+        return f"""
         <div class="plugin-section">
             <div class="plugin-header">
-                <h2>{plugin_id} <span style="font-size: 16px;">({len(plugin_results)} 个问题)</span></h2>
+                <h2>{plugin_id} <span style="font-size: 16px;">({result_count} 个问题)</span></h2>
             </div>
 """
-            
-            # 添加每个结果
-            for result in plugin_results:
-                severity_class = f"severity-{result.get('severity', 'medium')}"
-                html += f"""
+    
+    @staticmethod
+    def _render_result_item(result: Dict[str, Any]) -> str:
+        """生成单条结果"""
+        severity_class = f"severity-{result.get('severity', 'medium')}"
+        rule_ids = result.get('rule_ids')
+        # 合并记录列出全部参与合并的规则
+        merged_rules = f"""
+                <div><strong>合并规则:</strong> {', '.join(rule_ids)}</div>""" if rule_ids else ""
+        return f"""
             <div class="result-item {severity_class}">
                 <div class="file-path">{result.get('file_path', '')}:{result.get('line_number', 0)}</div>
                 <div class="message">{result.get('message', '')}</div>
                 <div class="code-snippet">{result.get('code_snippet', '')}</div>
-                <div><strong>规则:</strong> {result.get('rule_id', '')}</div>
+                <div><strong>规则:</strong> {result.get('rule_id', '')}</div>{merged_rules}
                 <div><strong>类别:</strong> {result.get('category', '')}</div>
                 <div><strong>建议:</strong> {result.get('suggestion', '')}</div>
             </div>
 """
-            
-            html += "        </div>\n"
-        
-        html += """
+    
+    @staticmethod
+    def _render_plugin_tail() -> str:
+        """生成插件分组的结尾"""
+        return "        </div>\n"
+    
+    @staticmethod
+    def _render_report_tail() -> str:
+        """生成报告结尾"""
+        return """
     </div>
 </body>
 </html>
 """
-        
-        return html
+    
+    def stream_writer(self, filename: str = "scan_results.html") -> "HTMLStreamWriter":
+        """创建流式写入器，用于边扫描边导出"""
+        return HTMLStreamWriter(self, os.path.join(self.output_dir, filename))
+    
+    def export_stream(self, results: Iterable[Dict[str, Any]], filename: str = "scan_results.html") -> str:
+        """以有界内存导出结果流到HTML文件"""
+        try:
+            writer = self.stream_writer(filename)
+            for result in results:
+                writer.write(result)
+            return writer.close()
+        except Exception as e:
+            logger.error(f"导出HTML报告失败: {e}")
+            raise
     
     def export_summary(self, summary: Dict[str, Any], filename: str = "scan_summary.html") -> str:
         """导出扫描摘要到HTML文件"""
@@ -317,4 +362,55 @@ class HTMLExporter:
 </html>
 """
         
-        return html
\ No newline at end of file
+        return html
+
+
+class HTMLStreamWriter:
+    """
+    HTML流式写入器
+    
+    报告按插件分组且头部包含总数，因此每个插件的结果先写入各自的临时文件，
+    关闭时再按顺序拼接，内存中只保留计数。
+    """
+    
+    def __init__(self, exporter: HTMLExporter, filepath: str):
+        self.exporter = exporter
+        self.filepath = filepath
+        self.count = 0
+        self._spools: Dict[str, Any] = {}
+        self._spool_counts: Dict[str, int] = {}
+    
+    def write(self, result: Dict[str, Any]):
+        """写入一条结果"""
+        plugin_id = result.get("plugin_id", "unknown")
+        spool = self._spools.get(plugin_id)
+        if spool is None:
+            spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+            self._spools[plugin_id] = spool
+            self._spool_counts[plugin_id] = 0
+        spool.write(self.exporter._render_result_item(result))
+        self._spool_counts[plugin_id] += 1
+        self.count += 1
+    
+    def close(self) -> str:
+        """拼接各插件分组并写出文件"""
+        try:
+            with open(self.filepath, 'w', encoding='utf-8') as f:
+                f.write(self.exporter._render_report_head(self.count, len(self._spools)))
+                for plugin_id, spool in self._spools.items():
+                    f.write(self.exporter._render_plugin_head(plugin_id, self._spool_counts[plugin_id]))
+                    spool.seek(0)
+                    while True:
+                        chunk = spool.read(1 << 16)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                    f.write(self.exporter._render_plugin_tail())
+                f.write(self.exporter._render_report_tail())
+        finally:
+            for spool in self._spools.values():
+                spool.close()
+            self._spools.clear()
+        
+        logger.info(f"HTML报告已导出到: {self.filepath}")
+        return self.filepath
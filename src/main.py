@@ -3,10 +3,11 @@ Hello-Scan-Code 主程序入口
 """
 import click
 import logging
+import multiprocessing
 import sys
 import os
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Callable
 
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -36,7 +37,15 @@ logger = logging.getLogger(__name__)
 @click.option('--export-excel', help='导出Excel报告文件路径', default=None)
 @click.option('--export-html', help='导出HTML报告文件路径', default=None)
 @click.option('--export-db', is_flag=True, help='导出结果到数据库')
-def main(path, config, verbose, export_excel, export_html, export_db):
+@click.option('-j', '--jobs', type=int, default=None, help='并行grep分片数，覆盖配置中的scan.jobs')
+@click.option('-w', '--workers', type=int, default=None, help='插件分析进程数，覆盖配置中的scan.analysis_workers')
+@click.option('--incremental', is_flag=True, default=False, help='启用增量扫描，只分析自上次扫描以来变化的文件')
+@click.option('--since', 'since', default=None, help='只扫描自指定git提交以来变更的文件')
+@click.option('--range', 'rev_range', default=None, help='只扫描git提交区间内变更的文件，如 A..B')
+@click.option('--prefilter', type=click.Choice(['auto', 'grep', 'rg', 'git', 'python', 'literal']), default=None,
+              help='预扫描后端，覆盖配置中的scan.prefilter_backend')
+def main(path, config, verbose, export_excel, export_html, export_db, jobs, workers, incremental,
+         since, rev_range, prefilter):
     """Hello-Scan-Code - 高性能代码扫描工具"""
     # 设置日志
     setup_logging(verbose)
@@ -49,6 +58,20 @@ def main(path, config, verbose, export_excel, export_html, export_db):
         logger.debug(f"启用插件列表: {config_manager.get_enabled_plugins()}")
         logger.debug(f"插件目录列表: {config_manager.get_plugin_dirs()}")
         
+        # 命令行参数覆盖配置（仅本次运行生效，不写回配置文件）
+        if jobs is not None:
+            config_manager.config.setdefault("scan", {})["jobs"] = jobs
+        if workers is not None:
+            config_manager.config.setdefault("scan", {})["analysis_workers"] = workers
+        if incremental:
+            config_manager.config.setdefault("scan", {})["incremental"] = True
+        if since:
+            config_manager.config.setdefault("scan", {})["since"] = since
+        if rev_range:
+            config_manager.config.setdefault("scan", {})["range"] = rev_range
+        if prefilter:
+            config_manager.config.setdefault("scan", {})["prefilter_backend"] = prefilter
+        
         # 初始化插件管理器
         plugin_manager = PluginManager(config_manager)
         logger.debug(f"主程序中插件管理器ID: {id(plugin_manager)}")
@@ -89,15 +112,6 @@ def main(path, config, verbose, export_excel, export_html, export_db):
         scan_engine = OptimizedScanEngine(config_manager, plugin_manager)
         logger.info("扫描引擎创建完成")
         
-        # 执行扫描
-        logger.info("开始执行代码扫描...")
-        results = scan_engine.scan(path)
-        stats = scan_engine.get_stats()
-        logger.info("代码扫描完成")
-        
-        # 输出统计信息
-        logger.info(f"扫描统计: {stats}")
-        
         # 导出结果
         # 创建一个类似argparse.Namespace的对象来保持兼容性
         class Args:
@@ -107,7 +121,15 @@ def main(path, config, verbose, export_excel, export_html, export_db):
                 self.export_db = export_db
         
         args = Args(export_excel, export_html, export_db)
-        export_results(results, stats, args, config_manager)
+        
+        # 执行扫描，结果边产出边导出，不在内存中累积
+        logger.info("开始执行代码扫描...")
+        export_results(scan_engine.scan_iter(path), scan_engine.get_stats, args, config_manager)
+        stats = scan_engine.get_stats()
+        logger.info("代码扫描完成")
+        
+        # 输出统计信息
+        logger.info(f"扫描统计: {stats}")
         
         logger.info("程序执行完成")
         return 0
@@ -117,21 +139,32 @@ def main(path, config, verbose, export_excel, export_html, export_db):
         return 1
 
 
-def export_results(results: List[Dict[str, Any]], stats: Dict[str, Any], 
+def export_results(results: Iterable[Dict[str, Any]], get_stats: Callable[[], Dict[str, Any]], 
                   args, config_manager: ConfigManager):
-    """导出扫描结果"""
+    """
+    导出扫描结果
+    
+    结果流只遍历一次，同时分发给所有启用的导出器的流式写入器。
+    
+    Args:
+        results: 扫描结果流
+        get_stats: 返回扫描统计信息的函数，结果流耗尽后调用
+        args: 命令行导出参数
+        config_manager: 配置管理器
+    """
     try:
+        writers = []
+        db_exporter = None
+        
         # Excel导出
         if args.export_excel:
             excel_exporter = ExcelExporter(config_manager.get_report_dir())
-            excel_file = excel_exporter.export(results, args.export_excel)
-            logger.info(f"Excel报告已导出到: {excel_file}")
+            writers.append(excel_exporter.stream_writer(args.export_excel))
         
         # HTML导出
         if args.export_html:
             html_exporter = HTMLExporter(config_manager.get_report_dir())
-            html_file = html_exporter.export(results, args.export_html)
-            logger.info(f"HTML报告已导出到: {html_file}")
+            writers.append(html_exporter.stream_writer(args.export_html))
         
         # 数据库导出
         if args.export_db:
@@ -142,12 +175,18 @@ def export_results(results: List[Dict[str, Any]], stats: Dict[str, Any],
             # 清除之前的结果
             db_exporter = DatabaseExporter(result_repository, summary_repository)
             db_exporter.clear_previous_results()
-            
-            # 导出结果
-            saved_count = db_exporter.export(results)
-            logger.info(f"已将 {saved_count} 条结果保存到数据库")
-            
+            writers.append(db_exporter.stream_writer())
+        
+        for result in results:
+            for writer in writers:
+                writer.write(result)
+        
+        for writer in writers:
+            writer.close()
+        
+        if db_exporter is not None:
             # 导出摘要
+            stats = get_stats()
             summary_data = {
                 "total_files": stats.get("total_files", 0),
                 "total_results": stats.get("results_count", 0),
@@ -170,4 +209,5 @@ def setup_logging(verbose: bool = False):
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
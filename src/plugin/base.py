@@ -2,11 +2,13 @@
 插件系统基础接口定义
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Sequence, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 import os
 
+from src.utils.line_cache import LineCache
+
 class SeverityLevel(Enum):
     """问题严重级别"""
     LOW = "low"
@@ -40,12 +42,38 @@ class ScanContext:
     file_encoding: str = "utf-8"
     config: Dict[str, Any] = None
     extra_context: Dict[str, Any] = None
+    line_cache: Optional[LineCache] = field(default=None, repr=False, compare=False)
     
     def __post_init__(self):
         if self.config is None:
             self.config = {}
         if self.extra_context is None:
             self.extra_context = {}
+    
+    def get_lines(self, file_path: str, start: int, end: int) -> List[str]:
+        """
+        读取文件中行号范围内的行，供插件检查命中行附近的上下文
+        
+        文件在首次访问时映射并建立换行偏移索引，最近访问的文件保留在LRU缓存中，
+        只有确实被访问的文件才会被读取。
+        
+        Args:
+            file_path: 插件收到的文件路径（相对于repo_path）或绝对路径
+            start: 起始行号（1起始，包含）
+            end: 结束行号（包含），超出文件的部分忽略
+            
+        Returns:
+            行内容（不含换行符）
+        """
+        if self.line_cache is None:
+            self.line_cache = LineCache()
+        return self.line_cache.get_lines(os.path.join(self.repo_path, file_path), start, end,
+                                         self.file_encoding)
+    
+    def close(self):
+        """释放get_lines映射的文件"""
+        if self.line_cache is not None:
+            self.line_cache.clear()
 
 class IScanPlugin(ABC):
     """扫描插件基础接口"""
@@ -93,6 +121,15 @@ class IScanPlugin(ABC):
         """
         pass
     
+    def get_grep_flags(self) -> Dict[str, Any]:
+        """
+        返回grep模式的匹配选项（可选实现）
+        
+        - ignore_case: 是否忽略大小写，默认False
+        - syntax: 模式语法，"ere"（默认，字面量交替会自动识别）、"literal"或"pcre"
+        """
+        return {}
+    
     @abstractmethod
     def initialize(self, config: Dict[str, Any]) -> bool:
         """初始化插件"""
@@ -103,9 +140,46 @@ class IScanPlugin(ABC):
                  context: ScanContext) -> List[ScanResult]:
         """
         扫描单行内容（grep匹配后调用）
+        
+        需要相邻行的规则可通过context.get_lines读取，不必改为整文件扫描。
         """
         pass
     
+    def scan_lines(self, file_path: str, hits: Sequence[Tuple[int, str]], 
+                   context: ScanContext) -> List[ScanResult]:
+        """
+        批量扫描同一文件的多个命中行（可选实现，引擎优先调用）
+        
+        默认逐行调用scan_line。需要按文件做准备工作的插件可以重写，
+        每个文件只准备一次，也省去逐行调用的开销。
+        
+        Args:
+            file_path: 文件路径
+            hits: (行号, 行内容) 列表，按行号升序
+            context: 扫描上下文
+        """
+        results = []
+        for line_number, line_content in hits:
+            results.extend(self.scan_line(file_path, line_number, line_content, context))
+        return results
+    
+    def scan_batch(self, batch, context: ScanContext) -> List[ScanResult]:
+        """
+        批量扫描多个文件的命中行（可选实现，引擎启用列式批处理时调用）
+        
+        默认按文件拆分后调用scan_lines。规则可以向量化求值的插件可以重写，
+        对整批行用Series.str.contains等一次计算布尔掩码。
+        
+        Args:
+            batch: 列式批次（src.engine.columnar.LineBatch），file_paths、line_numbers、
+                   lines、extensions为等长的pandas Series，同一文件的行连续排列
+            context: 扫描上下文
+        """
+        results = []
+        for file_path, hits in batch.iter_files():
+            results.extend(self.scan_lines(file_path, hits, context))
+        return results
+    
     def scan_file(self, file_path: str, file_content: str, 
                  context: ScanContext) -> List[ScanResult]:
         """
@@ -120,6 +194,14 @@ class IScanPlugin(ABC):
     def get_config_schema(self) -> Dict[str, Any]:
         """返回插件配置schema"""
         return {}
+    
+    def get_cache_fingerprint(self) -> str:
+        """
+        返回影响扫描结果、但不体现在插件配置中的内容摘要（可选实现）
+        
+        如配置中只给出路径的规则文件，其内容变化时增量缓存需要失效。
+        """
+        return ""
 
 class IAdvancedScanPlugin(IScanPlugin):
     """高级扫描插件接口（支持项目级分析）"""
@@ -59,7 +59,8 @@ class PluginManager:
                 'src.plugins.builtin.keyword_plugin',
                 'src.plugins.builtin.regex_plugin',
                 'src.plugins.builtin.security_plugin',
-                'src.plugins.builtin.todo_plugin'
+                'src.plugins.builtin.todo_plugin',
+                'src.plugins.builtin.rule_pack_plugin'
             ]
             
             for module_name in builtin_plugins:
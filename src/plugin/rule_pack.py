@@ -0,0 +1,382 @@
+"""
+声明式规则包 - JSON规则定义、校验与合并编译
+"""
+import json
+import re
+import warnings
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from src.utils.regex_literals import analyze_prefilter
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 规则包JSON格式
+RULE_PACK_SCHEMA: Dict[str, Any] = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "title": "Hello-Scan-Code Rule Pack",
+    "type": "object",
+    "properties": {
+        "pack_id": {"type": "string", "minLength": 1, "description": "规则包标识"},
+        "version": {"type": "string", "description": "规则包版本"},
+        "description": {"type": "string"},
+        "rules": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string", "minLength": 1, "description": "规则ID"},
+                    "regex": {"type": "string", "minLength": 1, "description": "Python正则表达式"},
+                    "severity": {"type": "string", "enum": ["low", "medium", "high", "critical"]},
+                    "message": {"type": "string", "description": "问题描述"},
+                    "extensions": {
+                        "type": "array",
+                        "items": {"type": "string", "pattern": "^\\.[A-Za-z0-9_+-]+$"},
+                        "description": "适用的文件扩展名，缺省表示插件支持的全部扩展名"
+                    },
+                    "ignore_case": {"type": "boolean", "default": False},
+                    "category": {"type": "string"},
+                    "suggestion": {"type": "string"},
+                    "prefilter": {"type": "string", "description": "可选，显式指定的grep预筛选模式（ERE）"}
+                },
+                "required": ["id", "regex", "severity", "message"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["pack_id", "rules"],
+    "additionalProperties": False
+}
+
+class RulePackError(ValueError):
+    """规则包格式或规则定义错误"""
+
+
+@dataclass(frozen=True)
+class Rule:
+    """单条规则"""
+    rule_id: str
+    regex: str
+    severity: str
+    message: str
+    extensions: Tuple[str, ...] = ()
+    ignore_case: bool = False
+    category: str = "security"
+    suggestion: str = ""
+    prefilter: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Rule":
+        """由规则包中的规则定义创建"""
+        return cls(
+            rule_id=data["id"],
+            regex=data["regex"],
+            severity=data["severity"],
+            message=data["message"],
+            extensions=tuple(data.get("extensions", ())),
+            ignore_case=data.get("ignore_case", False),
+            category=data.get("category", "security"),
+            suggestion=data.get("suggestion", ""),
+            prefilter=data.get("prefilter"),
+        )
+
+    def applies_to(self, file_ext: Optional[str]) -> bool:
+        """规则是否适用于该扩展名"""
+        return not self.extensions or file_ext is None or file_ext in self.extensions
+
+
+@dataclass
+class RulePack:
+    """规则包"""
+    pack_id: str
+    rules: List[Rule]
+    version: str = ""
+    description: str = ""
+
+
+def validate_rule_pack(data: Dict[str, Any]):
+    """
+    按RULE_PACK_SCHEMA校验规则包，并检查规则ID唯一、正则可编译
+
+    Raises:
+        RulePackError: 校验失败
+    """
+    import jsonschema
+
+    try:
+        jsonschema.validate(data, RULE_PACK_SCHEMA)
+    except jsonschema.ValidationError as e:
+        location = "/".join(str(part) for part in e.absolute_path)
+        raise RulePackError(f"规则包格式错误 ({location or '根节点'}): {e.message}") from e
+
+    seen = set()
+    for rule in data["rules"]:
+        if rule["id"] in seen:
+            raise RulePackError(f"规则ID重复: {rule['id']}")
+        seen.add(rule["id"])
+        try:
+            re.compile(rule["regex"])
+        except re.error as e:
+            raise RulePackError(f"规则 {rule['id']} 的正则表达式无效: {e}") from e
+
+
+def load_rule_pack(path: str) -> RulePack:
+    """
+    加载并校验JSON规则包
+
+    Args:
+        path: 规则包文件路径
+
+    Returns:
+        规则包
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    validate_rule_pack(data)
+    pack = RulePack(
+        pack_id=data["pack_id"],
+        rules=[Rule.from_dict(rule) for rule in data["rules"]],
+        version=data.get("version", ""),
+        description=data.get("description", ""),
+    )
+    logger.debug(f"加载规则包 {pack.pack_id}: {len(pack.rules)} 条规则")
+    return pack
+
+
+def derive_prefilter(rule: Rule) -> Optional[Tuple[str, bool]]:
+    """
+    推导规则的grep预筛选模式
+
+    规则显式指定prefilter时直接使用；否则由正则的必需字面量或转换后的ERE生成。
+
+    Returns:
+        (ERE, 是否需要忽略大小写)；None表示该规则无法预筛选
+    """
+    if rule.prefilter:
+        return rule.prefilter, rule.ignore_case
+    return analyze_prefilter(rule.regex, re.IGNORECASE if rule.ignore_case else 0)
+
+
+class _ExtensionMatcher:
+    """某一扩展名下适用规则的合并正则"""
+
+    def __init__(self, rules: List[Rule], indexes: List[int]):
+        # 合并正则中的规则（按规则包顺序）与单独编译的规则
+        self.indexes: List[int] = []
+        self.alternatives: List[str] = []
+        self.standalone: List[Tuple[re.Pattern, int]] = []
+        for index in indexes:
+            rule = rules[index]
+            if CompiledRuleSet.is_standalone(rule):
+                flags = re.IGNORECASE if rule.ignore_case else 0
+                self.standalone.append((re.compile(rule.regex, flags), index))
+                continue
+            if rule.ignore_case:
+                self.alternatives.append(f"(?P<r{index}>(?i:{rule.regex}))")
+            else:
+                self.alternatives.append(f"(?P<r{index}>{rule.regex})")
+            self.indexes.append(index)
+        self.positions = {index: position for position, index in enumerate(self.indexes)}
+        # 从第k条规则开始的合并正则，第0个即完整的合并正则，其余按需编译
+        self._suffixes: Dict[int, re.Pattern] = {}
+        self.combined = self.suffix(0)
+
+    def suffix(self, position: int) -> Optional[re.Pattern]:
+        """合并正则中从position开始的规则组成的正则"""
+        if position >= len(self.alternatives):
+            return None
+        regex = self._suffixes.get(position)
+        if regex is None:
+            regex = re.compile("|".join(self.alternatives[position:]))
+            self._suffixes[position] = regex
+        return regex
+
+    def is_empty(self) -> bool:
+        return self.combined is None and not self.standalone
+
+
+class CompiledRuleSet:
+    """
+    规则集合编译结果
+
+    所有规则合并为一个带命名分组的正则 (?P<r0>...)|(?P<r1>...)|...，
+    未命中的行只需一次匹配，耗时不随规则数量线性增长。
+    含反向引用或自带命名分组的规则无法安全合并，单独编译。
+    按扩展名筛选后的合并正则按需编译并缓存。
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = list(rules)
+        self._matchers: Dict[Optional[str], _ExtensionMatcher] = {}
+        for rule in self.rules:
+            try:
+                re.compile(rule.regex)
+            except re.error as e:
+                raise RulePackError(f"规则 {rule.rule_id} 的正则表达式无效: {e}") from e
+        self.prefilter_ignore_case = False
+        self.prefilter = self._build_prefilter()
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _build_prefilter(self) -> Optional[str]:
+        """
+        合并各规则的预筛选模式，任一规则无法预筛选时返回None
+
+        任一规则需要忽略大小写时整个预筛选忽略大小写，多出的命中行由完整正则排除。
+        """
+        patterns = []
+        ignore_case = False
+        for rule in self.rules:
+            derived = derive_prefilter(rule)
+            if derived is None:
+                return None
+            pattern, rule_ignore_case = derived
+            ignore_case = ignore_case or rule_ignore_case
+            if pattern not in patterns:
+                patterns.append(pattern)
+        self.prefilter_ignore_case = ignore_case and bool(patterns)
+        return "|".join(patterns) if patterns else None
+
+    @staticmethod
+    def is_standalone(rule: Rule) -> bool:
+        """含反向引用、命名分组或全局内联标志的规则无法放入合并正则"""
+        return re.search(r"\\[1-9]|\(\?P[<=]|^\(\?[aiLmsux]+\)", rule.regex) is not None
+
+    def _matcher_for(self, file_ext: Optional[str]) -> _ExtensionMatcher:
+        """获取适用于该扩展名的合并正则"""
+        matcher = self._matchers.get(file_ext)
+        if matcher is None:
+            indexes = [index for index, rule in enumerate(self.rules) if rule.applies_to(file_ext)]
+            matcher = _ExtensionMatcher(self.rules, indexes)
+            self._matchers[file_ext] = matcher
+        return matcher
+
+    def match_line(self, line: str, file_ext: Optional[str] = None) -> List[Rule]:
+        """
+        匹配单行
+
+        合并正则找到最左的匹配起点后，在同一起点上用其后的规则继续匹配，
+        再从下一个字符继续查找，因此与逐条规则匹配的结果一致。
+
+        Args:
+            line: 行内容
+            file_ext: 文件扩展名，用于筛选规则
+
+        Returns:
+            命中的规则（去重），按规则包中的顺序排列
+        """
+        matcher = self._matcher_for(file_ext)
+        matched = set()
+        combined = matcher.combined
+        if combined is not None:
+            pos = 0
+            length = len(line)
+            while pos <= length:
+                match = combined.search(line, pos)
+                if match is None:
+                    break
+                start = match.start()
+                while match is not None:
+                    index = int(match.lastgroup[1:])
+                    matched.add(index)
+                    regex = matcher.suffix(matcher.positions[index] + 1)
+                    match = regex.match(line, start) if regex is not None else None
+                pos = start + 1
+        for regex, index in matcher.standalone:
+            if regex.search(line):
+                matched.add(index)
+        return [self.rules[index] for index in sorted(matched)]
+
+    def match_text(self, text: str, file_ext: Optional[str] = None) -> Iterator[Tuple[int, str, Rule]]:
+        """
+        逐行匹配整个文件
+
+        Yields:
+            (行号, 行内容, 命中的规则)
+        """
+        yield from self.match_lines(enumerate(text.splitlines(), 1), file_ext)
+
+    def match_lines(self, lines: Iterable[Tuple[int, str]],
+                    file_ext: Optional[str] = None) -> Iterator[Tuple[int, str, Rule]]:
+        """
+        匹配同一文件的多行（如一个文件的全部grep命中）
+
+        扩展名对应的合并正则只查找一次，没有适用规则时直接返回。
+
+        Args:
+            lines: (行号, 行内容)
+            file_ext: 文件扩展名，用于筛选规则
+
+        Yields:
+            (行号, 行内容, 命中的规则)
+        """
+        if self._matcher_for(file_ext).is_empty():
+            return
+        for line_no, line in lines:
+            for rule in self.match_line(line, file_ext):
+                yield line_no, line, rule
+
+    def match_batch(self, lines: "pd.Series",
+                    extensions: Optional["pd.Series"] = None) -> List[Tuple[int, Rule]]:
+        """
+        向量化匹配一批行（可来自多个文件）
+
+        先用合并正则筛出至少命中一条规则的行，再对每条规则求一次
+        Series.str.contains掩码，因此逐行的Python调用只剩正则本身。
+        结果与对每行调用match_line一致。
+
+        Args:
+            lines: 行内容（object类型的pandas Series）
+            extensions: 与lines索引对齐的扩展名，为None时不按扩展名筛选规则
+
+        Returns:
+            (行索引, 命中的规则)，按行索引、规则包顺序排列
+        """
+        if not self.rules or len(lines) == 0:
+            return []
+        matcher = self._matcher_for(None)
+        hits: List[Tuple[int, int]] = []
+        with warnings.catch_warnings():
+            # 含捕获分组的正则用于str.contains时pandas会提示，这里只需要掩码
+            warnings.simplefilter("ignore", UserWarning)
+            candidates = lines
+            if not matcher.standalone:
+                candidates = lines[lines.str.contains(matcher.combined.pattern, regex=True).to_numpy(dtype=bool)]
+            for index, rule in enumerate(self.rules):
+                rule_lines = candidates
+                if rule.extensions and extensions is not None:
+                    applies = extensions.loc[candidates.index].isin(rule.extensions).to_numpy(dtype=bool)
+                    rule_lines = candidates[applies]
+                if len(rule_lines) == 0:
+                    continue
+                flags = re.IGNORECASE if rule.ignore_case else 0
+                mask = rule_lines.str.contains(rule.regex, flags=flags, regex=True).to_numpy(dtype=bool)
+                hits.extend((position, index) for position in rule_lines.index[mask].tolist())
+        hits.sort()
+        return [(position, self.rules[index]) for position, index in hits]
+
+
+def compile_rules(rules: List[Rule]) -> CompiledRuleSet:
+    """编译规则列表"""
+    return CompiledRuleSet(rules)
+
+
+def build_finding(plugin_id: str, rule: Rule, file_path: str, line_number: int,
+                  line_content: str, suggestion: str = "") -> Dict[str, Any]:
+    """按规则生成扫描结果字典"""
+    return {
+        "plugin_id": plugin_id,
+        "file_path": file_path,
+        "line_number": line_number,
+        "message": rule.message,
+        "severity": rule.severity,
+        "rule_id": rule.rule_id,
+        "category": rule.category,
+        "suggestion": rule.suggestion or suggestion,
+        "code_snippet": line_content.strip()
+    }
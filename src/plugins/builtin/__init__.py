@@ -6,10 +6,12 @@ from .keyword_plugin import KeywordScanPlugin
 from .security_plugin import SecurityScanPlugin
 from .todo_plugin import TodoScanPlugin
 from .regex_plugin import RegexScanPlugin
+from .rule_pack_plugin import RulePackScanPlugin
 
 __all__ = [
     "KeywordScanPlugin",
     "SecurityScanPlugin",
     "TodoScanPlugin",
-    "RegexScanPlugin"
+    "RegexScanPlugin",
+    "RulePackScanPlugin"
 ]
\ No newline at end of file
@@ -5,6 +5,9 @@ from typing import List, Dict, Any
 import re
 from enum import Enum
 
+from src.plugin.base import IScanPlugin
+from src.utils.aho_corasick import AhoCorasick
+
 # 定义严重级别枚举
 class SeverityLevel(Enum):
     """问题严重级别"""
@@ -13,7 +16,7 @@ class SeverityLevel(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
-class KeywordScanPlugin:
+class KeywordScanPlugin(IScanPlugin):
     """关键字扫描插件"""
     
     @property
@@ -40,6 +43,7 @@ class KeywordScanPlugin:
         self.keywords = []
         self.case_sensitive = False
         self.initialized = False
+        self._matcher = None
     
     def get_supported_extensions(self) -> List[str]:
         return [".py", ".js", ".java", ".cpp", ".c", ".h", ".go", ".rs", ".php"]
@@ -53,11 +57,17 @@ class KeywordScanPlugin:
         pattern = "|".join(re.escape(keyword) for keyword in self.keywords)
         return pattern
     
+    def get_grep_flags(self) -> Dict[str, Any]:
+        """grep的大小写选项与关键字匹配保持一致"""
+        return {"ignore_case": not self.case_sensitive}
+    
     def initialize(self, config: Dict[str, Any]) -> bool:
         """初始化插件"""
         try:
             self.keywords = config.get("keywords", ["TODO", "FIXME", "BUG", "HACK"])
             self.case_sensitive = config.get("case_sensitive", False)
+            # 关键字一次编译为自动机，scan_line单次扫描即可找出全部关键字
+            self._matcher = AhoCorasick(self.keywords, self.case_sensitive)
             self.initialized = True
             return True
         except Exception:
@@ -71,28 +81,23 @@ class KeywordScanPlugin:
         
         results = []
         
-        for keyword in self.keywords:
-            if self.case_sensitive:
-                found = keyword in line_content
-            else:
-                found = keyword.lower() in line_content.lower()
-            
-            if found:
-                # 确定严重级别
-                severity = self._get_severity_for_keyword(keyword)
-                
-                result = {
-                    "plugin_id": self.plugin_id,
-                    "file_path": file_path,
-                    "line_number": line_number,
-                    "message": f"发现关键字: {keyword}",
-                    "severity": severity,
-                    "rule_id": f"KEYWORD_{keyword}",
-                    "category": "code_style",
-                    "suggestion": "考虑处理或移除该标记",
-                    "code_snippet": line_content.strip()
-                }
-                results.append(result)
+        # 命中的关键字按配置顺序排列
+        for keyword in self._matcher.find_literals(line_content):
+            # 确定严重级别
+            severity = self._get_severity_for_keyword(keyword)
+
+            result = {
+                "plugin_id": self.plugin_id,
+                "file_path": file_path,
+                "line_number": line_number,
+                "message": f"发现关键字: {keyword}",
+                "severity": severity,
+                "rule_id": f"KEYWORD_{keyword}",
+                "category": "code_style",
+                "suggestion": "考虑处理或移除该标记",
+                "code_snippet": line_content.strip()
+            }
+            results.append(result)
         
         return results
     
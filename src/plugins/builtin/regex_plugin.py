@@ -1,10 +1,16 @@
 """
 正则表达式插件
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence, Tuple
 import re
+import logging
 from enum import Enum
 
+from src.plugin.base import IScanPlugin
+from src.plugin.rule_pack import Rule, build_finding, compile_rules
+
+logger = logging.getLogger(__name__)
+
 # 定义严重级别枚举
 class SeverityLevel(Enum):
     """问题严重级别"""
@@ -13,7 +19,7 @@ class SeverityLevel(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
-class RegexScanPlugin:
+class RegexScanPlugin(IScanPlugin):
     """正则表达式扫描插件"""
     
     @property
@@ -39,20 +45,28 @@ class RegexScanPlugin:
     def __init__(self):
         self.patterns = []
         self.initialized = False
+        self._rules = None
+        self._syntax_errors = []
     
     def get_supported_extensions(self) -> List[str]:
         return [".py", ".js", ".java", ".cpp", ".c", ".h", ".go", ".rs", ".php", ".cs", ".ts", ".sql", ".xml", ".html"]
     
     def get_grep_pattern(self) -> str:
         """构建grep搜索模式"""
-        # 由于正则表达式可能很复杂，我们不在此处构建grep模式
-        # 而是在插件处理时进行精确匹配
-        return ""
+        # 由规则的必需字面量（或转换后的正则）构成预筛选，scan_line中再用完整正则确认
+        if self._rules is None:
+            return ""
+        return self._rules.prefilter or ""
+    
+    def get_grep_flags(self) -> Dict[str, Any]:
+        """含忽略大小写的规则时整体忽略大小写"""
+        return {"ignore_case": self._rules is not None and self._rules.prefilter_ignore_case}
     
     def initialize(self, config: Dict[str, Any]) -> bool:
         """初始化插件"""
         try:
             self.patterns = config.get("patterns", [])
+            self._compile_patterns()
             self.initialized = True
             return True
         except Exception:
@@ -64,48 +78,84 @@ class RegexScanPlugin:
         if not self.initialized:
             return []
         
-        results = []
+        results = [
+            build_finding(self.plugin_id, rule, file_path, line_number, line_content)
+            for rule in self._rules.match_line(line_content)
+        ]
+        for pattern, error in self._syntax_errors:
+            # 正则表达式语法错误
+            results.append({
+                "plugin_id": self.plugin_id,
+                "file_path": file_path,
+                "line_number": line_number,
+                "message": f"正则表达式语法错误: {error}",
+                "severity": SeverityLevel.HIGH.value,
+                "rule_id": "REGEX_SYNTAX_ERROR",
+                "category": "configuration",
+                "suggestion": "请检查正则表达式语法",
+                "code_snippet": pattern
+            })
         
+        return results
+    
+    def scan_lines(self, file_path: str, hits: Sequence[Tuple[int, str]],
+                   context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """批量扫描同一文件的命中行"""
+        if not self.initialized:
+            return []
+        if self._syntax_errors:
+            # 语法错误随每个命中行报告，沿用逐行扫描
+            return super().scan_lines(file_path, hits, context)
+        return [
+            build_finding(self.plugin_id, rule, file_path, line_number, line_content)
+            for line_number, line_content, rule in self._rules.match_lines(hits)
+        ]
+    
+    def scan_batch(self, batch, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """列式批量扫描多个文件的命中行"""
+        if not self.initialized:
+            return []
+        if self._syntax_errors:
+            return super().scan_batch(batch, context)
+        return [
+            build_finding(self.plugin_id, rule, *batch.row(position))
+            for position, rule in self._rules.match_batch(batch.lines)
+        ]
+    
+    def scan_file(self, file_path: str, file_content: str,
+                 context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """存在无法预筛选的正则时，由引擎整文件扫描"""
+        if not self.initialized:
+            return []
+        if self._syntax_errors:
+            # 整文件扫描时每一行都交给插件，语法错误与逐行扫描一样随每行报告
+            return self.scan_lines(file_path, list(enumerate(file_content.splitlines(), 1)), context)
+        return [
+            build_finding(self.plugin_id, rule, file_path, line_number, line)
+            for line_number, line, rule in self._rules.match_text(file_content)
+        ]
+    
+    def _compile_patterns(self):
+        """将配置的模式合并编译一次，语法错误的模式单独记录"""
+        rules = []
+        self._syntax_errors = []
         for pattern_config in self.patterns:
             pattern = pattern_config.get("pattern", "")
-            rule_id = pattern_config.get("rule_id", "REGEX_PATTERN")
-            message = pattern_config.get("message", "匹配正则表达式")
-            severity = pattern_config.get("severity", SeverityLevel.MEDIUM.value)
-            category = pattern_config.get("category", "custom")
-            suggestion = pattern_config.get("suggestion", "请检查代码")
-            
             try:
-                # 编译正则表达式
-                regex = re.compile(pattern)
-                if regex.search(line_content):
-                    result = {
-                        "plugin_id": self.plugin_id,
-                        "file_path": file_path,
-                        "line_number": line_number,
-                        "message": message,
-                        "severity": severity,
-                        "rule_id": rule_id,
-                        "category": category,
-                        "suggestion": suggestion,
-                        "code_snippet": line_content.strip()
-                    }
-                    results.append(result)
+                re.compile(pattern)
             except re.error as e:
-                # 正则表达式语法错误
-                result = {
-                    "plugin_id": self.plugin_id,
-                    "file_path": file_path,
-                    "line_number": line_number,
-                    "message": f"正则表达式语法错误: {str(e)}",
-                    "severity": SeverityLevel.HIGH.value,
-                    "rule_id": "REGEX_SYNTAX_ERROR",
-                    "category": "configuration",
-                    "suggestion": "请检查正则表达式语法",
-                    "code_snippet": pattern
-                }
-                results.append(result)
-        
-        return results
+                logger.warning(f"正则表达式语法错误 {pattern}: {e}")
+                self._syntax_errors.append((pattern, str(e)))
+                continue
+            rules.append(Rule(
+                rule_id=pattern_config.get("rule_id", "REGEX_PATTERN"),
+                regex=pattern,
+                severity=pattern_config.get("severity", SeverityLevel.MEDIUM.value),
+                message=pattern_config.get("message", "匹配正则表达式"),
+                category=pattern_config.get("category", "custom"),
+                suggestion=pattern_config.get("suggestion", "请检查代码"),
+            ))
+        self._rules = compile_rules(rules)
     
     def get_config_schema(self) -> Dict[str, Any]:
         """返回配置schema"""
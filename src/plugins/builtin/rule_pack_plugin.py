@@ -0,0 +1,132 @@
+"""
+规则包扫描插件
+"""
+from typing import List, Dict, Any, Sequence, Tuple
+import logging
+import os
+
+from src.plugin.base import IScanPlugin
+from src.plugin.rule_pack import build_finding, compile_rules, load_rule_pack
+from src.utils.file_utils import get_file_hash
+
+logger = logging.getLogger(__name__)
+
+
+class RulePackScanPlugin(IScanPlugin):
+    """声明式规则包扫描插件"""
+
+    @property
+    def plugin_id(self) -> str:
+        return "builtin.rule_pack"
+
+    @property
+    def name(self) -> str:
+        return "Rule Pack Scanner"
+
+    @property
+    def version(self) -> str:
+        return "1.0.0"
+
+    @property
+    def description(self) -> str:
+        return "加载JSON规则包，所有规则合并为一个正则匹配"
+
+    @property
+    def author(self) -> str:
+        return "Hello-Scan-Code Team"
+
+    def __init__(self):
+        self.rules = []
+        self.initialized = False
+        self._rule_set = compile_rules([])
+        self._pack_hashes: List[str] = []
+
+    def get_supported_extensions(self) -> List[str]:
+        return [".py", ".js", ".java", ".cpp", ".c", ".h", ".go", ".rs", ".php", ".cs", ".ts",
+                ".sql", ".xml", ".html", ".yaml", ".yml", ".json"]
+
+    def get_grep_pattern(self) -> str:
+        """由规则推导的预筛选模式，存在无法预筛选的规则时返回空串，改为整文件扫描"""
+        return self._rule_set.prefilter or ""
+
+    def get_grep_flags(self) -> Dict[str, Any]:
+        """含忽略大小写的规则时整体忽略大小写"""
+        return {"ignore_case": self._rule_set.prefilter_ignore_case}
+
+    def initialize(self, config: Dict[str, Any]) -> bool:
+        """初始化插件"""
+        try:
+            rules = []
+            pack_hashes = []
+            for pack_path in config.get("packs", []):
+                pack = load_rule_pack(pack_path)
+                logger.info(f"加载规则包 {pack.pack_id}: {len(pack.rules)} 条规则")
+                rules.extend(pack.rules)
+                pack_hashes.append(get_file_hash(pack_path, "sha256"))
+            self._rule_set = compile_rules(rules)
+            self.rules = rules
+            self._pack_hashes = pack_hashes
+            self.initialized = True
+            return True
+        except Exception as e:
+            logger.error(f"加载规则包失败: {e}")
+            return False
+
+    def scan_line(self, file_path: str, line_number: int, line_content: str,
+                 context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """扫描单行内容"""
+        if not self.initialized:
+            return []
+        file_ext = os.path.splitext(file_path)[1]
+        return [
+            build_finding(self.plugin_id, rule, file_path, line_number, line_content)
+            for rule in self._rule_set.match_line(line_content, file_ext)
+        ]
+
+    def scan_lines(self, file_path: str, hits: Sequence[Tuple[int, str]],
+                   context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """批量扫描同一文件的命中行，按扩展名筛选的规则只查找一次"""
+        if not self.initialized:
+            return []
+        file_ext = os.path.splitext(file_path)[1]
+        return [
+            build_finding(self.plugin_id, rule, file_path, line_number, line_content)
+            for line_number, line_content, rule in self._rule_set.match_lines(hits, file_ext)
+        ]
+    
+    def scan_batch(self, batch, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """列式批量扫描多个文件的命中行，规则按各行的扩展名筛选"""
+        if not self.initialized:
+            return []
+        return [
+            build_finding(self.plugin_id, rule, *batch.row(position))
+            for position, rule in self._rule_set.match_batch(batch.lines, batch.extensions)
+        ]
+    
+    def scan_file(self, file_path: str, file_content: str,
+                 context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """规则无法预筛选时整文件扫描"""
+        if not self.initialized:
+            return []
+        file_ext = os.path.splitext(file_path)[1]
+        return [
+            build_finding(self.plugin_id, rule, file_path, line_number, line)
+            for line_number, line, rule in self._rule_set.match_text(file_content, file_ext)
+        ]
+
+    def get_cache_fingerprint(self) -> str:
+        """配置中只有规则包路径，规则包内容变化时增量缓存需要失效"""
+        return ",".join(self._pack_hashes)
+
+    def get_config_schema(self) -> Dict[str, Any]:
+        """返回配置schema"""
+        return {
+            "type": "object",
+            "properties": {
+                "packs": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "JSON规则包文件路径列表"
+                }
+            }
+        }
@@ -1,10 +1,12 @@
 """
 安全检测插件
 """
-from typing import List, Dict, Any
-import re
+from typing import List, Dict, Any, Sequence, Tuple
 from enum import Enum
 
+from src.plugin.base import IScanPlugin
+from src.plugin.rule_pack import Rule, build_finding, compile_rules
+
 # 定义严重级别枚举
 class SeverityLevel(Enum):
     """问题严重级别"""
@@ -13,7 +15,19 @@ class SeverityLevel(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
-class SecurityScanPlugin:
+# 检测规则在模块加载时合并编译一次
+SECURITY_RULES = compile_rules([
+    Rule("PASSWORD_LITERAL", r'password\s*=\s*["\'][^"\']*["\']', SeverityLevel.CRITICAL.value,
+         "硬编码密码", ignore_case=True),
+    Rule("API_KEY_LITERAL", r'api[_-]?key\s*=\s*["\'][^"\']*["\']', SeverityLevel.CRITICAL.value,
+         "硬编码API密钥", ignore_case=True),
+    Rule("SECRET_TOKEN", r'secret[_-]?token\s*=\s*["\'][^"\']*["\']', SeverityLevel.CRITICAL.value,
+         "硬编码密钥", ignore_case=True),
+])
+
+SECURITY_SUGGESTION = "请使用环境变量或密钥管理服务"
+
+class SecurityScanPlugin(IScanPlugin):
     """安全敏感信息检测插件"""
     
     @property
@@ -42,30 +56,30 @@ class SecurityScanPlugin:
     def get_grep_pattern(self) -> str:
         return r"password|passwd|secret|token|key|pwd"
     
+    def get_grep_flags(self) -> Dict[str, Any]:
+        return {"ignore_case": True}
+    
     def initialize(self, config: Dict[str, Any]) -> bool:
         return True
     
     def scan_line(self, file_path: str, line_number: int, line_content: str, 
                  context: Dict[str, Any]) -> List[Dict[str, Any]]:
-        patterns = {
-            r'password\s*=\s*["\'][^"\']*["\']': ("PASSWORD_LITERAL", "硬编码密码"),
-            r'api[_-]?key\s*=\s*["\'][^"\']*["\']': ("API_KEY_LITERAL", "硬编码API密钥"),
-            r'secret[_-]?token\s*=\s*["\'][^"\']*["\']': ("SECRET_TOKEN", "硬编码密钥")
-        }
-        
-        results = []
-        for pattern, (rule_id, desc) in patterns.items():
-            if re.search(pattern, line_content, re.I):
-                results.append({
-                    "plugin_id": self.plugin_id,
-                    "file_path": file_path,
-                    "line_number": line_number,
-                    "message": desc,
-                    "severity": SeverityLevel.CRITICAL.value,
-                    "rule_id": rule_id,
-                    "category": "security",
-                    "suggestion": "请使用环境变量或密钥管理服务",
-                    "code_snippet": line_content.strip()
-                })
-        
-        return results
\ No newline at end of file
+        return [
+            build_finding(self.plugin_id, rule, file_path, line_number, line_content, SECURITY_SUGGESTION)
+            for rule in SECURITY_RULES.match_line(line_content)
+        ]
+    
+    def scan_lines(self, file_path: str, hits: Sequence[Tuple[int, str]],
+                   context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """批量扫描同一文件的命中行"""
+        return [
+            build_finding(self.plugin_id, rule, file_path, line_number, line_content, SECURITY_SUGGESTION)
+            for line_number, line_content, rule in SECURITY_RULES.match_lines(hits)
+        ]
+    
+    def scan_batch(self, batch, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """列式批量扫描多个文件的命中行，每条规则对整批求一次掩码"""
+        return [
+            build_finding(self.plugin_id, rule, *batch.row(position), SECURITY_SUGGESTION)
+            for position, rule in SECURITY_RULES.match_batch(batch.lines)
+        ]
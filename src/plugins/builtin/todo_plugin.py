@@ -2,9 +2,11 @@
 TODO检测插件
 """
 from typing import List, Dict, Any
-import re
 from enum import Enum
 
+from src.plugin.base import IScanPlugin
+from src.utils.aho_corasick import AhoCorasick
+
 # 定义严重级别枚举
 class SeverityLevel(Enum):
     """问题严重级别"""
@@ -13,7 +15,16 @@ class SeverityLevel(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
-class TodoScanPlugin:
+# TODO类关键字及其严重级别
+TODO_KEYWORDS = {
+    "TODO": SeverityLevel.LOW.value,
+    "FIXME": SeverityLevel.MEDIUM.value,
+    "BUG": SeverityLevel.HIGH.value,
+    "HACK": SeverityLevel.MEDIUM.value,
+    "XXX": SeverityLevel.MEDIUM.value,
+}
+
+class TodoScanPlugin(IScanPlugin):
     """TODO检测插件"""
     
     @property
@@ -38,6 +49,7 @@ class TodoScanPlugin:
     
     def __init__(self):
         self.initialized = False
+        self._matcher = None
     
     def get_supported_extensions(self) -> List[str]:
         return [".py", ".js", ".java", ".cpp", ".c", ".h", ".go", ".rs", ".php", ".cs", ".ts"]
@@ -48,6 +60,8 @@ class TodoScanPlugin:
     
     def initialize(self, config: Dict[str, Any]) -> bool:
         """初始化插件"""
+        # 关键字不区分大小写
+        self._matcher = AhoCorasick(TODO_KEYWORDS, case_sensitive=False)
         self.initialized = True
         return True
     
@@ -59,29 +73,20 @@ class TodoScanPlugin:
         
         results = []
         
-        # 检查TODO相关关键字
-        todo_patterns = [
-            (r"TODO[:\s]*.*", "TODO", SeverityLevel.LOW.value),
-            (r"FIXME[:\s]*.*", "FIXME", SeverityLevel.MEDIUM.value),
-            (r"BUG[:\s]*.*", "BUG", SeverityLevel.HIGH.value),
-            (r"HACK[:\s]*.*", "HACK", SeverityLevel.MEDIUM.value),
-            (r"XXX[:\s]*.*", "XXX", SeverityLevel.MEDIUM.value),
-        ]
-        
-        for pattern, keyword, severity in todo_patterns:
-            if re.search(pattern, line_content, re.IGNORECASE):
-                result = {
-                    "plugin_id": self.plugin_id,
-                    "file_path": file_path,
-                    "line_number": line_number,
-                    "message": f"发现{keyword}注释",
-                    "severity": severity,
-                    "rule_id": f"TODO_{keyword}",
-                    "category": "code_style",
-                    "suggestion": "考虑处理或移除该注释",
-                    "code_snippet": line_content.strip()
-                }
-                results.append(result)
+        # 单次扫描找出所有TODO类关键字
+        for keyword in self._matcher.find_literals(line_content):
+            result = {
+                "plugin_id": self.plugin_id,
+                "file_path": file_path,
+                "line_number": line_number,
+                "message": f"发现{keyword}注释",
+                "severity": TODO_KEYWORDS[keyword],
+                "rule_id": f"TODO_{keyword}",
+                "category": "code_style",
+                "suggestion": "考虑处理或移除该注释",
+                "code_snippet": line_content.strip()
+            }
+            results.append(result)
         
         return results
     
@@ -5,6 +5,7 @@
 
 from typing import List, Dict, Any
 from src.plugin.base import IScanPlugin, ScanContext, ScanResult, SeverityLevel
+from src.utils.aho_corasick import AhoCorasick
 import re
 
 
@@ -64,6 +65,10 @@ class HardcodedPasswordRule(IScanPlugin):
 
 class WeakCryptographicAlgorithmRule(IScanPlugin):
     """弱加密算法检测规则"""
+
+    WEAK_ALGORITHMS = ['MD5', 'SHA1', 'DES', 'RC4']
+    # 行中出现这些词时视为说明文字而非实际使用
+    IGNORE_WORDS = ['comment', 'note', 'todo']
     
     @property
     def plugin_id(self) -> str:
@@ -90,25 +95,35 @@ class WeakCryptographicAlgorithmRule(IScanPlugin):
 
     def get_grep_pattern(self) -> str:
         # 使用更简单的grep模式
-        return r"MD5|SHA1|DES|RC4"
+        return "|".join(self.WEAK_ALGORITHMS)
+
+    def __init__(self):
+        self._algorithm_matcher = None
+        self._ignore_matcher = None
 
     def initialize(self, config: Dict[str, Any]) -> bool:
+        self._algorithm_matcher = AhoCorasick(self.WEAK_ALGORITHMS)
+        self._ignore_matcher = AhoCorasick(self.IGNORE_WORDS)
         return True
 
     def scan_line(self, file_path: str, line_number: int, line_content: str, context: ScanContext) -> List[ScanResult]:
         # 检查是否真的在使用弱加密算法
-        weak_algorithms = ['MD5', 'SHA1', 'DES', 'RC4']
+        if self._algorithm_matcher is None:
+            # 未经PluginManager初始化直接使用时按默认配置编译
+            self.initialize({})
         results = []
-        for algorithm in weak_algorithms:
-            if algorithm in line_content and not any(ignore in line_content for ignore in ['comment', 'note', 'todo']):
-                results.append(ScanResult(
-                    plugin_id=self.plugin_id,
-                    file_path=file_path,
-                    line_number=line_number,
-                    code_snippet=line_content.strip(),
-                    rule_id="SECURITY_002",
-                    severity=SeverityLevel.HIGH,
-                    message=f"Weak cryptographic algorithm {algorithm} detected",
-                    category="security"
-                ))
+        algorithms = self._algorithm_matcher.find_literals(line_content)
+        if not algorithms or self._ignore_matcher.search(line_content):
+            return results
+        for algorithm in algorithms:
+            results.append(ScanResult(
+                plugin_id=self.plugin_id,
+                file_path=file_path,
+                line_number=line_number,
+                code_snippet=line_content.strip(),
+                rule_id="SECURITY_002",
+                severity=SeverityLevel.HIGH,
+                message=f"Weak cryptographic algorithm {algorithm} detected",
+                category="security"
+            ))
         return results
\ No newline at end of file
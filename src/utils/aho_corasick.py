@@ -0,0 +1,164 @@
+"""
+Aho–Corasick多字面量匹配
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+Literal = Union[str, bytes]
+
+
+class AhoCorasick:
+    """
+    Aho–Corasick自动机
+
+    构建时把失败链接展开为完整的转移表（DFA），匹配时每个字符只做一次字典查找，
+    一次线性扫描即可找出所有字面量，耗时与字面量数量无关。
+    同时支持str和bytes（字面量与文本类型需一致）。
+    """
+
+    def __init__(self, literals: Iterable[Literal], case_sensitive: bool = True):
+        """
+        Args:
+            literals: 字面量列表，重复和空字面量会被忽略
+            case_sensitive: 是否区分大小写
+        """
+        self.case_sensitive = case_sensitive
+        self.literals: List[Literal] = list(dict.fromkeys(literal for literal in literals if literal))
+        self._order: Dict[Literal, int] = {literal: index for index, literal in enumerate(self.literals)}
+        # 每个状态: 字符 -> 下一状态；输出: (字面量, 匹配长度) 元组
+        self._delta: List[Dict] = [{}]
+        self._outputs: List[Tuple[Tuple[Literal, int], ...]] = [()]
+        self._build()
+
+    def _build(self):
+        """构建字典树、失败链接并展开为DFA"""
+        goto = self._delta
+        outputs = self._outputs
+        for literal in self.literals:
+            key = literal if self.case_sensitive else literal.lower()
+            node = 0
+            for char in key:
+                next_node = goto[node].get(char)
+                if next_node is None:
+                    next_node = len(goto)
+                    goto[node][char] = next_node
+                    goto.append({})
+                    outputs.append(())
+                node = next_node
+            outputs[node] += ((literal, len(key)),)
+
+        # 按层BFS，子状态的转移表继承失败状态的转移
+        fail = [0] * len(goto)
+        queue = deque()
+        for child in goto[0].values():
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            fallback = goto[fail[node]]
+            for char, child in list(goto[node].items()):
+                fail[child] = fallback.get(char, 0)
+                outputs[child] += outputs[fail[child]]
+                queue.append(child)
+            for char, target in fallback.items():
+                goto[node].setdefault(char, target)
+
+    def __len__(self) -> int:
+        return len(self.literals)
+
+    def _prepare(self, text: Literal) -> Literal:
+        return text if self.case_sensitive else text.lower()
+
+    def iter_matches(self, text: Literal, start: int = 0) -> Iterator[Tuple[int, Literal]]:
+        """
+        找出所有匹配（允许重叠）
+
+        Args:
+            text: 文本
+            start: 开始位置
+
+        Yields:
+            (起始偏移, 匹配的字面量)，按结束位置排列
+        """
+        delta = self._delta
+        outputs = self._outputs
+        node = 0
+        # 只处理start之后的部分，不从头遍历
+        for index, char in enumerate(self._prepare(text[start:] if start else text), start):
+            node = delta[node].get(char, 0)
+            if outputs[node]:
+                for literal, length in outputs[node]:
+                    yield index - length + 1, literal
+
+    def find_first(self, text: Literal, start: int = 0) -> Optional[Tuple[int, Literal]]:
+        """
+        返回第一个结束的匹配 (起始偏移, 字面量)，没有匹配时返回None
+
+        每次调用都要复制并转换start之后的文本，需要多个匹配时应使用iter_matches一次遍历。
+        """
+        for match in self.iter_matches(text, start):
+            return match
+        return None
+
+    def search(self, text: Literal) -> bool:
+        """文本中是否包含任一字面量"""
+        return self.find_first(text) is not None
+
+    def find_literals(self, text: Literal) -> List[Literal]:
+        """返回文本中出现的字面量（去重），按构建时的顺序排列"""
+        found = {literal for _, literal in self.iter_matches(text)}
+        return sorted(found, key=self._order.__getitem__)
+
+
+def parse_literal_alternation(pattern: str) -> Optional[List[str]]:
+    """
+    解析只由字面量组成的正则交替，如 "TODO|FIXME|foo\\.bar"
+
+    Args:
+        pattern: 正则表达式
+
+    Returns:
+        字面量列表；包含任何正则元字符或字符类转义时返回None
+    """
+    literals: List[str] = []
+    current: List[str] = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            if index + 1 >= len(pattern):
+                return None
+            escaped = pattern[index + 1]
+            # \d、\w、\b等是字符类或断言，不是字面量
+            if escaped.isalnum():
+                return None
+            current.append(escaped)
+            index += 2
+            continue
+        if char == '|':
+            if not current:
+                return None
+            literals.append(''.join(current))
+            current = []
+        elif char in '.^$*+?{}[]()':
+            return None
+        else:
+            current.append(char)
+        index += 1
+    if not current:
+        return None
+    literals.append(''.join(current))
+    return literals
+
+
+def literals_for_patterns(patterns: Sequence[str]) -> Optional[List[str]]:
+    """所有模式都是字面量交替时返回合并后的字面量列表，否则返回None"""
+    literals: List[str] = []
+    for pattern in patterns:
+        parsed = parse_literal_alternation(pattern)
+        if parsed is None:
+            return None
+        literals.extend(parsed)
+    return literals
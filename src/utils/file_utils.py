@@ -7,6 +7,8 @@ from pathlib import Path
 from typing import List, Generator, Optional
 import logging
 
+from .file_walker import FileWalker
+
 logger = logging.getLogger(__name__)
 
 def get_file_hash(file_path: str, algorithm: str = "md5") -> str:
@@ -67,32 +69,22 @@ def get_file_size(file_path: str) -> int:
         return 0
 
 def walk_files(directory: str, extensions: Optional[List[str]] = None, 
-               ignore_dirs: Optional[List[str]] = None) -> Generator[str, None, None]:
+               ignore_dirs: Optional[List[str]] = None, **walker_options) -> Generator[str, None, None]:
     """
     遍历目录中的文件
     
     Args:
         directory: 目录路径
         extensions: 文件扩展名列表（可选）
-        ignore_dirs: 忽略的目录列表（可选）
+        ignore_dirs: 忽略的目录名列表（可选），按目录名精确匹配并在进入前剪枝
+        **walker_options: 传给FileWalker的其他选项（include、exclude、respect_gitignore等）
         
     Yields:
         文件路径
     """
-    ignore_dirs = ignore_dirs or []
-    directory_path = Path(directory)
-    
-    for item in directory_path.rglob('*'):
-        if item.is_file():
-            # 检查是否在忽略目录中
-            if any(ignore_dir in str(item) for ignore_dir in ignore_dirs):
-                continue
-            
-            # 检查文件扩展名
-            if extensions and item.suffix not in extensions:
-                continue
-            
-            yield str(item)
+    walker = FileWalker(directory, ignore_dirs, extensions, **walker_options)
+    for entry in walker.walk():
+        yield os.path.join(directory, entry.rel_path)
 
 def ensure_directory_exists(directory: str):
     """
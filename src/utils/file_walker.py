@@ -0,0 +1,366 @@
+"""
+文件遍历器 - 基于os.scandir，进入目录前剪枝，支持忽略文件与通配规则
+"""
+import os
+import re
+from stat import S_ISREG
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 按目录逐级读取的忽略文件，语义与.gitignore一致
+GITIGNORE_FILE = ".gitignore"
+SCANIGNORE_FILE = ".scanignore"
+
+
+class WalkEntry(NamedTuple):
+    """遍历得到的文件"""
+    rel_path: str
+    size: int
+    mtime_ns: int
+    ext: str
+
+
+class IgnoreRule(NamedTuple):
+    """单条忽略规则"""
+    regex: "re.Pattern"
+    base: str          # 规则所在目录（相对根目录，posix格式，根目录为空串）
+    negate: bool       # 以!开头，重新包含
+    dir_only: bool     # 以/结尾，只匹配目录
+    anchored: bool     # 含/，相对规则所在目录匹配完整路径；否则只匹配文件名
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    将gitignore风格的通配模式转换为正则表达式
+
+    *和?不跨越目录分隔符，**匹配任意层目录，[...]为字符类。
+
+    Args:
+        pattern: 通配模式（posix路径分隔符）
+
+    Returns:
+        正则表达式（不含首尾锚点）
+    """
+    parts = []
+    i = 0
+    length = len(pattern)
+    while i < length:
+        char = pattern[i]
+        if char == '*':
+            if pattern.startswith('**', i):
+                at_start = i == 0 or pattern[i - 1] == '/'
+                if at_start and pattern.startswith('**/', i):
+                    # 前导或中间的 **/ 匹配零个或多个目录
+                    parts.append('(?:.*/)?')
+                    i += 3
+                    continue
+                if at_start and i + 2 == length:
+                    # 末尾的 /** 匹配其下所有内容
+                    parts.append('.*')
+                    i += 2
+                    continue
+                parts.append('[^/]*')
+                i += 2
+                continue
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 2 if pattern.startswith('[!', i) or pattern.startswith('[^', i) else i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif char == '\\' and i + 1 < length:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return ''.join(parts)
+
+
+def parse_ignore_lines(lines: Sequence[str], base: str = "") -> List[IgnoreRule]:
+    """
+    解析gitignore格式的规则
+
+    Args:
+        lines: 忽略文件的各行
+        base: 忽略文件所在目录（相对根目录，posix格式）
+
+    Returns:
+        规则列表，保持文件中的先后顺序
+    """
+    rules = []
+    for raw_line in lines:
+        line = raw_line.rstrip('\n').rstrip('\r')
+        # 行尾未转义的空格会被忽略
+        while line.endswith(' ') and not line.endswith('\\ '):
+            line = line[:-1]
+        if not line or line.startswith('#'):
+            continue
+
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        elif line.startswith('\\'):
+            line = line[1:] if line[1:2] in ('#', '!') else line
+
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+
+        anchored = '/' in line
+        line = line.lstrip('/')
+        try:
+            regex = re.compile(glob_to_regex(line) + r'\Z')
+        except re.error as e:
+            logger.debug(f"忽略无效的规则 '{raw_line.strip()}': {e}")
+            continue
+        rules.append(IgnoreRule(regex, base, negate, dir_only, anchored))
+    return rules
+
+
+def compile_globs(patterns: Optional[Sequence[str]]) -> Optional["re.Pattern"]:
+    """
+    将多个通配模式合并编译为一个正则
+
+    不含/的模式匹配任意层级的文件名，含/的模式匹配相对根目录的完整路径。
+
+    Args:
+        patterns: 通配模式列表
+
+    Returns:
+        编译后的正则，模式为空时返回None
+    """
+    if not patterns:
+        return None
+    alternatives = []
+    for pattern in patterns:
+        pattern = pattern.replace(os.sep, '/')
+        if '/' in pattern.rstrip('/'):
+            alternatives.append(glob_to_regex(pattern.strip('/')))
+        else:
+            alternatives.append('(?:.*/)?' + glob_to_regex(pattern.rstrip('/')))
+    return re.compile('(?:' + '|'.join(alternatives) + r')\Z')
+
+
+def is_ignored(rules: Sequence[IgnoreRule], rel_path: str, is_dir: bool) -> bool:
+    """
+    按gitignore语义判断路径是否被忽略，最后一条匹配的规则生效
+
+    Args:
+        rules: 由浅到深排列的规则
+        rel_path: 相对根目录的posix路径
+        is_dir: 是否为目录
+
+    Returns:
+        是否被忽略
+    """
+    name = rel_path.rsplit('/', 1)[-1]
+    for rule in reversed(rules):
+        if rule.dir_only and not is_dir:
+            continue
+        if rule.anchored:
+            if rule.base:
+                if not rel_path.startswith(rule.base + '/'):
+                    continue
+                target = rel_path[len(rule.base) + 1:]
+            else:
+                target = rel_path
+        else:
+            target = name
+        if rule.regex.match(target):
+            return not rule.negate
+    return False
+
+
+class FileWalker:
+    """
+    基于os.scandir的文件遍历器
+
+    - 忽略目录按目录名（或相对路径）精确匹配，进入前即剪枝
+    - 逐级读取.gitignore/.scanignore，语义与git一致
+    - include/exclude通配规则预先合并编译
+    - 跟随符号链接时按(设备号, inode)检测目录环
+    """
+
+    def __init__(self, root: str, ignore_dirs: Optional[Sequence[str]] = None,
+                 extensions: Optional[Sequence[str]] = None,
+                 include: Optional[Sequence[str]] = None,
+                 exclude: Optional[Sequence[str]] = None,
+                 respect_gitignore: bool = True,
+                 follow_symlinks: bool = False):
+        self.root = root
+        self.ignore_dirs = frozenset(ignore_dirs or [])
+        self.extensions = frozenset(extensions or [])
+        self.include = compile_globs(include)
+        self.exclude = compile_globs(exclude)
+        self.follow_symlinks = follow_symlinks
+        self.ignore_files: Tuple[str, ...] = (
+            (GITIGNORE_FILE, SCANIGNORE_FILE) if respect_gitignore else (SCANIGNORE_FILE,)
+        )
+
+    def walk(self) -> Iterator[WalkEntry]:
+        """
+        深度优先遍历，同一目录内按名称排序，结果顺序确定
+
+        Yields:
+            WalkEntry
+        """
+        visited: Set[Tuple[int, int]] = set()
+        try:
+            root_stat = os.stat(self.root)
+        except OSError as e:
+            logger.warning(f"无法访问目录 {self.root}: {e}")
+            return
+        visited.add((root_stat.st_dev, root_stat.st_ino))
+        yield from self._walk_dir(self.root, "", self._load_rules(self.root, "", []), visited)
+
+    def _walk_dir(self, dir_path: str, rel_dir: str, rules: List[IgnoreRule],
+                  visited: Set[Tuple[int, int]]) -> Iterator[WalkEntry]:
+        """遍历单个目录"""
+        try:
+            with os.scandir(dir_path) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.debug(f"读取目录失败 {dir_path}: {e}")
+            return
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=self.follow_symlinks)
+            except OSError:
+                continue
+
+            if is_dir:
+                if not self._dir_excluded(entry.name, rel_path, rules):
+                    subdirs.append((entry, rel_path))
+                continue
+
+            yield from self._file_entry(entry, rel_path, rules)
+
+        for entry, rel_path in subdirs:
+            if self.follow_symlinks:
+                # 跟随符号链接时同一目录可能经由多条路径到达，按inode只遍历一次
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                key = (stat.st_dev, stat.st_ino)
+                if key in visited:
+                    logger.debug(f"目录已遍历或存在符号链接环，跳过: {rel_path}")
+                    continue
+                visited.add(key)
+            yield from self._walk_dir(entry.path, rel_path, self._load_rules(entry.path, rel_path, rules), visited)
+
+    def filter_paths(self, rel_paths: Iterable[str]) -> Iterator[WalkEntry]:
+        """
+        对已知的相对路径列表（如git索引）应用与walk相同的过滤规则
+
+        不遍历目录；每个目录的忽略文件只读取一次。
+
+        Args:
+            rel_paths: 相对根目录的文件路径
+
+        Yields:
+            WalkEntry，保持输入顺序
+        """
+        # 目录 -> 该目录下生效的规则，目录被排除时为None
+        dir_rules: Dict[str, Optional[List[IgnoreRule]]] = {"": self._load_rules(self.root, "", [])}
+
+        def rules_for(rel_dir: str) -> Optional[List[IgnoreRule]]:
+            if rel_dir in dir_rules:
+                return dir_rules[rel_dir]
+            parent, _, name = rel_dir.rpartition('/')
+            parent_rules = rules_for(parent)
+            if parent_rules is None or self._dir_excluded(name, rel_dir, parent_rules):
+                rules = None
+            else:
+                rules = self._load_rules(os.path.join(self.root, rel_dir), rel_dir, parent_rules)
+            dir_rules[rel_dir] = rules
+            return rules
+
+        for rel_path in rel_paths:
+            rel_path = rel_path.replace(os.sep, '/')
+            rel_dir, _, name = rel_path.rpartition('/')
+            rules = rules_for(rel_dir)
+            if rules is None:
+                continue
+            ext = self._file_accepted(name, rel_path, rules)
+            if ext is None:
+                continue
+            try:
+                stat = os.stat(os.path.join(self.root, rel_path))
+            except OSError:
+                # 索引中已删除但未提交的文件
+                continue
+            if not S_ISREG(stat.st_mode):
+                continue
+            yield self._make_entry(rel_path, stat, ext)
+
+    def _dir_excluded(self, name: str, rel_path: str, rules: List[IgnoreRule]) -> bool:
+        """目录是否需要剪枝"""
+        if name in self.ignore_dirs or rel_path in self.ignore_dirs:
+            return True
+        if rules and is_ignored(rules, rel_path, True):
+            return True
+        return self.exclude is not None and self.exclude.match(rel_path) is not None
+
+    def _file_accepted(self, name: str, rel_path: str, rules: List[IgnoreRule]) -> Optional[str]:
+        """对文件应用过滤规则，通过时返回扩展名，否则返回None"""
+        ext = os.path.splitext(name)[1]
+        if self.extensions and ext not in self.extensions:
+            return None
+        if rules and is_ignored(rules, rel_path, False):
+            return None
+        if self.include is not None and not self.include.match(rel_path):
+            return None
+        if self.exclude is not None and self.exclude.match(rel_path):
+            return None
+        return ext
+
+    def _file_entry(self, entry: "os.DirEntry", rel_path: str,
+                    rules: List[IgnoreRule]) -> Iterator[WalkEntry]:
+        """对文件应用过滤规则，通过时产出"""
+        ext = self._file_accepted(entry.name, rel_path, rules)
+        if ext is None:
+            return
+        try:
+            if not entry.is_file():
+                return
+            stat = entry.stat()
+        except OSError:
+            return
+        yield self._make_entry(rel_path, stat, ext)
+
+    @staticmethod
+    def _make_entry(rel_path: str, stat: os.stat_result, ext: str) -> WalkEntry:
+        """构造WalkEntry，路径转换为本地分隔符"""
+        if os.sep != '/':
+            rel_path = rel_path.replace('/', os.sep)
+        return WalkEntry(rel_path, stat.st_size, stat.st_mtime_ns, ext)
+
+    def _load_rules(self, dir_path: str, rel_dir: str, inherited: List[IgnoreRule]) -> List[IgnoreRule]:
+        """读取目录下的忽略文件，追加到上级规则之后"""
+        rules = inherited
+        for ignore_file in self.ignore_files:
+            ignore_path = os.path.join(dir_path, ignore_file)
+            try:
+                with open(ignore_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    lines = f.readlines()
+            except OSError:
+                continue
+            parsed = parse_ignore_lines(lines, rel_dir)
+            if parsed:
+                rules = rules + parsed
+        return rules
@@ -0,0 +1,112 @@
+"""
+Git工具函数
+"""
+import os
+import subprocess
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _run_git(args: List[str], cwd: str, timeout: int = 60) -> bytes:
+    """
+    执行git命令并返回标准输出
+
+    Args:
+        args: git子命令及参数
+        cwd: 工作目录
+        timeout: 超时时间（秒）
+
+    Returns:
+        标准输出（字节）
+    """
+    try:
+        result = subprocess.run(
+            ["git"] + args,
+            cwd=cwd,
+            capture_output=True,
+            timeout=timeout
+        )
+    except FileNotFoundError:
+        raise RuntimeError("git command not found. Please install git.")
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"git {' '.join(args)} timed out")
+
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"git {' '.join(args)} failed: {message}")
+    return result.stdout
+
+def _split_null_paths(output: bytes) -> List[str]:
+    """解析以\\0分隔的路径列表"""
+    return [os.path.normpath(os.fsdecode(item)) for item in output.split(b"\0") if item]
+
+def is_git_work_tree(path: str) -> bool:
+    """
+    检查路径是否位于git工作区内
+
+    Args:
+        path: 目录路径
+
+    Returns:
+        如果位于git工作区内返回True，否则返回False
+    """
+    try:
+        output = _run_git(["rev-parse", "--is-inside-work-tree"], cwd=path, timeout=10)
+        return output.strip() == b"true"
+    except RuntimeError as e:
+        logger.debug(f"检查git工作区失败: {e}")
+        return False
+
+def get_changed_files(repo_path: str, since: Optional[str] = None,
+                      rev_range: Optional[str] = None) -> List[str]:
+    """
+    获取变更文件列表（相对repo_path的路径，不含已删除文件）
+
+    Args:
+        repo_path: 仓库路径（可以是git工作区的子目录）
+        since: 起始提交，返回该提交到当前工作区的变更（含未跟踪文件）
+        rev_range: 提交区间，如 A..B 或 A...B
+
+    Returns:
+        变更文件的相对路径列表
+    """
+    if not since and not rev_range:
+        raise ValueError("since 和 rev_range 至少需要指定一个")
+
+    # --relative 使路径相对于当前目录，并排除目录外的变更
+    args = ["diff", "--name-only", "-z", "--relative", "--diff-filter=d"]
+    args.append(rev_range if rev_range else since)
+    changed = _split_null_paths(_run_git(args, cwd=repo_path))
+
+    if since and not rev_range:
+        # 工作区中新增但尚未提交的文件同样属于变更
+        untracked = _split_null_paths(
+            _run_git(["ls-files", "-z", "--others", "--exclude-standard"], cwd=repo_path)
+        )
+        known = set(changed)
+        changed.extend(path for path in untracked if path not in known)
+
+    logger.debug(f"git变更文件数: {len(changed)}")
+    return changed
+
+def list_files(repo_path: str, include_untracked: bool = False) -> List[str]:
+    """
+    从git索引列出文件（相对repo_path的路径）
+
+    Args:
+        repo_path: 仓库路径（可以是git工作区的子目录）
+        include_untracked: 是否包含未跟踪且未被忽略的文件
+
+    Returns:
+        文件的相对路径列表，已跟踪文件在前
+    """
+    output = _run_git(["ls-files", "-z", "--cached"], cwd=repo_path)
+    # 存在冲突时同一路径会按暂存阶段出现多次
+    files = list(dict.fromkeys(_split_null_paths(output)))
+    if include_untracked:
+        files.extend(_split_null_paths(
+            _run_git(["ls-files", "-z", "--others", "--exclude-standard"], cwd=repo_path)
+        ))
+    logger.debug(f"git索引文件数: {len(files)}")
+    return files
@@ -0,0 +1,120 @@
+"""
+文件行缓存 - 按需映射文件并建立换行偏移索引，支持按行号范围读取
+"""
+import mmap
+import os
+from collections import OrderedDict
+from typing import List, Optional
+import logging
+
+from .text_utils import LineIndex
+
+logger = logging.getLogger(__name__)
+
+# 默认同时保持映射的文件数
+DEFAULT_MAX_FILES = 32
+
+
+class MappedFile:
+    """
+    只读映射的文件及其行起始偏移
+
+    偏移索引在首次访问时建立一次，之后按行号读取只需切片映射区，
+    不需要把整个文件解码为字符串。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mmap: Optional[mmap.mmap] = None
+        with open(path, "rb") as f:
+            self.size = os.fstat(f.fileno()).st_size
+            if self.size:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index: Optional[LineIndex] = None
+
+    @property
+    def index(self) -> LineIndex:
+        """换行偏移索引"""
+        if self._index is None:
+            self._index = LineIndex(b"" if self._mmap is None else self._mmap)
+        return self._index
+
+    @property
+    def line_count(self) -> int:
+        return self.index.line_count
+
+    def read_lines(self, start: int, end: int) -> List[bytes]:
+        """
+        读取行号范围内的行（1起始，包含两端，超出文件的部分忽略）
+
+        Returns:
+            去掉行尾换行符的原始字节
+        """
+        index = self.index
+        return [index.line_bytes(line_number).rstrip(b"\r")
+                for line_number in range(max(start, 1), min(end, index.line_count) + 1)]
+
+    def close(self):
+        # 先释放索引，其中可能持有映射区的引用
+        self._index = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+class LineCache:
+    """
+    最近使用文件的LRU缓存
+
+    插件在命中行附近读取上下文时，只有确实被访问的文件才会被映射，
+    同一文件的多次访问共用映射和偏移索引；超出容量时关闭最久未用的文件。
+    """
+
+    def __init__(self, max_files: int = DEFAULT_MAX_FILES):
+        self.max_files = max(1, max_files)
+        self._files: "OrderedDict[str, Optional[MappedFile]]" = OrderedDict()
+
+    def get(self, path: str) -> Optional[MappedFile]:
+        """获取文件映射，文件无法读取时返回None（结果同样缓存）"""
+        if path in self._files:
+            self._files.move_to_end(path)
+            return self._files[path]
+        try:
+            mapped = MappedFile(path)
+        except (OSError, ValueError) as e:
+            logger.debug(f"映射文件 {path} 失败: {e}")
+            mapped = None
+        self._files[path] = mapped
+        while len(self._files) > self.max_files:
+            _, evicted = self._files.popitem(last=False)
+            if evicted is not None:
+                evicted.close()
+        return mapped
+
+    def get_lines(self, path: str, start: int, end: int, encoding: str = "utf-8") -> List[str]:
+        """
+        读取文件中行号范围内的行（1起始，包含两端）
+
+        Args:
+            path: 文件路径
+            start: 起始行号
+            end: 结束行号
+            encoding: 文件编码，无法解码的字节以替换字符表示
+
+        Returns:
+            行内容（不含换行符），文件无法读取或范围为空时返回空列表
+        """
+        mapped = self.get(path)
+        if mapped is None:
+            return []
+        return [line.decode(encoding, errors="replace") for line in mapped.read_lines(start, end)]
+
+    def clear(self):
+        """关闭所有文件映射"""
+        for mapped in self._files.values():
+            if mapped is not None:
+                mapped.close()
+        self._files.clear()
+
+    def __len__(self) -> int:
+        return len(self._files)
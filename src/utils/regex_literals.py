@@ -0,0 +1,348 @@
+"""
+正则表达式分析 - 提取必需字面量并转换为grep可用的预筛选模式
+"""
+import re
+from typing import List, Optional, Tuple
+import logging
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python 3.10
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+# 字面量短于该长度时预筛选效果很差，不使用字面量预筛选
+MIN_LITERAL_LENGTH = 3
+# 字面量交替过多时，grep的代价接近直接匹配正则
+MAX_LITERAL_ALTERNATIVES = 64
+
+# ERE中需要转义的字符
+_ERE_SPECIAL = set('.[]()*+?{}|^$\\')
+
+# 分类转义在方括号表达式中的写法，只与re.ASCII下的语义一致；
+# str模式默认按Unicode解释\d、\s、\w（如全角数字、汉字），方括号表达式会更严格
+_CATEGORY_CLASSES = {
+    sre_parse.CATEGORY_DIGIT: "0-9",
+    sre_parse.CATEGORY_SPACE: "[:space:]",
+    sre_parse.CATEGORY_WORD: "[:alnum:]_",
+}
+_NEGATED_CATEGORIES = {
+    sre_parse.CATEGORY_NOT_DIGIT: "0-9",
+    sre_parse.CATEGORY_NOT_SPACE: "[:space:]",
+    sre_parse.CATEGORY_NOT_WORD: "[:alnum:]_",
+}
+
+# 转换结果为单个ERE原子的节点，量词可以直接跟在后面
+_ATOMS = (sre_parse.LITERAL, sre_parse.NOT_LITERAL, sre_parse.ANY, sre_parse.IN,
+          sre_parse.SUBPATTERN, sre_parse.BRANCH)
+
+# 必需字面量集合：匹配的文本一定包含其中至少一个
+LiteralSet = Optional[Tuple[str, ...]]
+
+
+class _Unsupported(Exception):
+    """模式无法安全转换"""
+
+
+def _parse(pattern: str, flags: int = 0, allow_ignore_case: bool = False):
+    """
+    解析正则表达式
+
+    Args:
+        pattern: Python正则表达式
+        flags: 编译标志
+        allow_ignore_case: 调用方会以忽略大小写方式使用结果（如grep -i）时为True
+
+    Returns:
+        (解析树, 是否忽略大小写)；解析失败，或忽略大小写但调用方不接受时返回None
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, RecursionError):
+        return None
+    state = getattr(parsed, "state", None) or getattr(parsed, "pattern", None)
+    global_flags = state.flags if state is not None else flags
+    ignore_case = bool(global_flags & re.IGNORECASE)
+    if ignore_case and not allow_ignore_case:
+        return None
+    return parsed, ignore_case
+
+
+def escape_ere(literal: str) -> str:
+    """转义字面量，使其可以作为ERE使用"""
+    return "".join("\\" + char if char in _ERE_SPECIAL else char for char in literal)
+
+
+def _better(current: LiteralSet, candidate: LiteralSet) -> LiteralSet:
+    """在两个必需字面量集合中选择筛选效果更好的一个：最短字面量更长、交替更少"""
+    if candidate is None:
+        return current
+    if current is None:
+        return candidate
+    current_key = (min(map(len, current)), -len(current))
+    candidate_key = (min(map(len, candidate)), -len(candidate))
+    return candidate if candidate_key > current_key else current
+
+
+def _sequence_literals(items) -> LiteralSet:
+    """序列中的任一必需字面量集合都是整个序列必需的，选择最好的一个"""
+    best: LiteralSet = None
+    run: List[str] = []
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if run:
+            best = _better(best, ("".join(run),))
+            run = []
+        if op is sre_parse.SUBPATTERN:
+            add_flags = av[1]
+            if add_flags & re.IGNORECASE:
+                continue
+            best = _better(best, _sequence_literals(av[-1]))
+        elif op is sre_parse.BRANCH:
+            best = _better(best, _branch_literals(av[1]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            min_count, _, item = av
+            if min_count >= 1:
+                best = _better(best, _sequence_literals(item))
+    if run:
+        best = _better(best, ("".join(run),))
+    return best
+
+
+def _branch_literals(alternatives) -> LiteralSet:
+    """交替的必需字面量是各分支必需字面量的并集，任一分支没有时整体没有"""
+    literals: List[str] = []
+    for alternative in alternatives:
+        branch = _sequence_literals(alternative)
+        if branch is None:
+            return None
+        literals.extend(branch)
+    return tuple(dict.fromkeys(literals))
+
+
+def required_literals(pattern: str, flags: int = 0) -> Optional[List[str]]:
+    """
+    提取正则表达式的必需字面量
+
+    任何匹配的文本都至少包含返回列表中的一个字面量，因此可以用这些字面量做预筛选，
+    再由完整的正则确认。
+
+    Args:
+        pattern: Python正则表达式
+        flags: 编译标志
+
+    Returns:
+        字面量列表；无法提取足够长的字面量、模式无效或忽略大小写时返回None
+    """
+    parsed = _parse(pattern, flags)
+    if parsed is None:
+        return None
+    return _literals_of(parsed[0])
+
+
+def _literals_of(parsed) -> Optional[List[str]]:
+    """从解析树提取足够长的必需字面量"""
+    literals = _sequence_literals(list(parsed))
+    if not literals or min(map(len, literals)) < MIN_LITERAL_LENGTH:
+        return None
+    if len(literals) > MAX_LITERAL_ALTERNATIVES or any("\n" in literal for literal in literals):
+        return None
+    return list(literals)
+
+
+def _bracket(items, negate: bool = False, ascii_only: bool = False) -> str:
+    """转换字符集合为ERE方括号表达式，分类转义只在ascii_only时转换"""
+    parts = []
+    closing = ""
+    has_caret = has_dash = False
+    for op, av in items:
+        if op is sre_parse.NEGATE:
+            negate = not negate
+        elif op is sre_parse.LITERAL:
+            char = chr(av)
+            # ]、^、-在方括号中有特殊含义，放在固定位置而不是转义
+            if char == "]":
+                closing = "]"
+            elif char == "^":
+                has_caret = True
+            elif char == "-":
+                has_dash = True
+            elif char == "\n":
+                continue
+            else:
+                parts.append(char)
+        elif op is sre_parse.RANGE:
+            low, high = chr(av[0]), chr(av[1])
+            if "]" in (low, high) or "^" in (low, high) or "-" in (low, high) or "\\" in (low, high):
+                raise _Unsupported("range")
+            parts.append(f"{low}-{high}")
+        elif op is sre_parse.CATEGORY:
+            if not ascii_only:
+                raise _Unsupported("unicode category")
+            if av in _CATEGORY_CLASSES:
+                parts.append(_CATEGORY_CLASSES[av])
+            elif av in _NEGATED_CATEGORIES and len(items) == 1:
+                negate = not negate
+                parts.append(_NEGATED_CATEGORIES[av])
+            else:
+                raise _Unsupported("category")
+        else:
+            raise _Unsupported(str(op))
+    if "[" in parts and any(char in parts for char in ":.="):
+        # [:、[.、[=在方括号中会被解释为字符类
+        raise _Unsupported("bracket class")
+    body = closing + "".join(parts) + ("^" if has_caret else "") + ("-" if has_dash else "")
+    if not body:
+        raise _Unsupported("empty set")
+    if body == "^" and not negate:
+        return "\\^"
+    return "[" + ("^" if negate else "") + body + "]"
+
+
+def _to_ere(items, ascii_only: bool = False) -> str:
+    """
+    转换解析树为ERE
+
+    结果可以比原模式宽松（断言被省略、反向引用放宽为.*），但不会更严格，
+    因此作为预筛选总是安全的。\\d、\\s、\\w只在模式使用re.ASCII时转换，
+    否则无法写出不比Unicode语义更严格的方括号表达式，放弃转换。
+    """
+    parts = []
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            char = chr(av)
+            if char == "\n":
+                raise _Unsupported("newline")
+            parts.append(escape_ere(char))
+        elif op is sre_parse.NOT_LITERAL:
+            if av == ord("\n"):
+                parts.append(".")
+            else:
+                parts.append(_bracket([(sre_parse.LITERAL, av)], negate=True))
+        elif op is sre_parse.ANY:
+            parts.append(".")
+        elif op is sre_parse.IN:
+            parts.append(_bracket(av, ascii_only=ascii_only))
+        elif op is sre_parse.AT:
+            if av in (sre_parse.AT_BEGINNING, sre_parse.AT_BEGINNING_STRING):
+                parts.append("^")
+            elif av in (sre_parse.AT_END, sre_parse.AT_END_STRING):
+                parts.append("$")
+            # 单词边界在ERE中没有可移植的写法，省略后只会放宽
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            # 环视断言省略
+            continue
+        elif op is sre_parse.GROUPREF:
+            parts.append(".*")
+        elif op is sre_parse.SUBPATTERN:
+            add_flags = av[1]
+            if add_flags & re.IGNORECASE:
+                raise _Unsupported("inline ignorecase")
+            inner = _to_ere(av[-1], ascii_only)
+            if inner:
+                parts.append(f"({inner})")
+        elif op is sre_parse.BRANCH:
+            alternatives = [_to_ere(alternative, ascii_only) for alternative in av[1]]
+            non_empty = [alternative for alternative in alternatives if alternative]
+            if not non_empty:
+                continue
+            # 可移植的ERE不支持空分支，有分支只含断言时整个交替改为可选
+            optional = "?" if len(non_empty) < len(alternatives) else ""
+            parts.append("(" + "|".join(non_empty) + ")" + optional)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            # 贪婪与否不影响一行中是否存在匹配
+            min_count, max_count, item = av
+            inner = _to_ere(item, ascii_only)
+            if not inner:
+                continue
+            if len(item) != 1 or item[0][0] not in _ATOMS:
+                inner = f"({inner})"
+            if max_count is sre_parse.MAXREPEAT:
+                suffix = {0: "*", 1: "+"}.get(min_count, f"{{{min_count},}}")
+            elif (min_count, max_count) == (0, 1):
+                suffix = "?"
+            elif min_count == max_count:
+                suffix = f"{{{min_count}}}"
+            else:
+                suffix = f"{{{min_count},{max_count}}}"
+            parts.append(inner + suffix)
+        else:
+            # 原子分组、占有量词、条件分组等会改变匹配是否存在
+            raise _Unsupported(str(op))
+    return "".join(parts)
+
+
+def translate_to_ere(pattern: str, flags: int = 0) -> Optional[str]:
+    """
+    将Python正则表达式转换为等价或更宽松的ERE
+
+    \\d、\\s、\\w只在re.ASCII模式下转换为方括号表达式，环视和单词边界被省略，
+    非贪婪量词按贪婪处理。
+
+    Args:
+        pattern: Python正则表达式
+        flags: 编译标志
+
+    Returns:
+        ERE；无法转换（如忽略大小写、占有量词）或结果匹配任意行时返回None
+    """
+    parsed = _parse(pattern, flags)
+    if parsed is None:
+        return None
+    return _ere_of(pattern, flags, parsed[0])
+
+
+def _ere_of(pattern: str, flags: int, parsed) -> Optional[str]:
+    """由解析树生成ERE"""
+    if re.search(pattern, "", flags) is not None:
+        # 能匹配空串的模式匹配任意行，没有预筛选价值
+        return None
+    ascii_only = bool(re.compile(pattern, flags).flags & re.ASCII)
+    try:
+        ere = _to_ere(list(parsed), ascii_only)
+    except _Unsupported as e:
+        logger.debug(f"正则无法转换为ERE ({e}): {pattern}")
+        return None
+    if not ere or ere in ("^", "$", "^$"):
+        return None
+    return ere
+
+
+def regex_prefilter(pattern: str, flags: int = 0) -> Optional[str]:
+    """
+    为Python正则表达式生成grep预筛选模式（ERE）
+
+    优先使用必需字面量的交替，其次使用转换后的完整正则。
+
+    Returns:
+        ERE；无法安全预筛选时返回None
+    """
+    analyzed = analyze_prefilter(pattern, flags)
+    if analyzed is None or analyzed[1]:
+        return None
+    return analyzed[0]
+
+
+def analyze_prefilter(pattern: str, flags: int = 0) -> Optional[Tuple[str, bool]]:
+    """
+    为Python正则表达式生成预筛选模式，允许忽略大小写
+
+    忽略大小写的模式提取出的字面量和ERE需要以grep -i方式使用。
+
+    Returns:
+        (ERE, 是否需要忽略大小写)；无法安全预筛选时返回None
+    """
+    parsed = _parse(pattern, flags, allow_ignore_case=True)
+    if parsed is None:
+        return None
+    tree, ignore_case = parsed
+    literals = _literals_of(tree)
+    if literals:
+        return "|".join(escape_ere(literal) for literal in literals), ignore_case
+    ere = _ere_of(pattern, flags, tree)
+    if ere is None:
+        return None
+    return ere, ignore_case
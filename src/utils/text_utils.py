@@ -2,35 +2,120 @@
 文本工具函数
 """
 import re
-from typing import List, Dict, Optional
+from bisect import bisect_right
+from typing import List, Dict, Optional, Tuple, Union
 import logging
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
 logger = logging.getLogger(__name__)
 
-def extract_code_snippets(text: str, line_numbers: List[int], 
+_NEWLINE = re.compile(b"\n")
+
+
+class LineIndex:
+    """
+    文本的换行偏移索引
+    
+    对原始字节（bytes或mmap）计算一次所有行的起始偏移，之后偏移到行号、
+    行号到字节范围的查询都是O(log n)或O(1)，取任意多行都不需要重新拆分文本。
+    安装了NumPy时在整个缓冲区上向量化查找换行，否则用bytes正则查找。
+    
+    行号从1开始，按换行符拆分（与str.split('\\n')一致），以换行结尾时最后一行为空行。
+    """
+    
+    def __init__(self, data):
+        """
+        Args:
+            data: 原始字节，bytes、bytearray、memoryview或mmap
+        """
+        self.data = data
+        self.size = len(data)
+        if HAS_NUMPY and self.size:
+            newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 0x0A)
+            self._starts = np.concatenate((np.zeros(1, dtype=np.int64), newlines + 1))
+            self._find = self._starts.searchsorted
+        else:
+            self._starts = [0]
+            self._starts.extend(match.end() for match in _NEWLINE.finditer(data))
+            self._find = None
+    
+    @classmethod
+    def from_text(cls, text: str, encoding: str = "utf-8") -> "LineIndex":
+        """由字符串创建（编码一次后建立索引）"""
+        return cls(text.encode(encoding, errors="surrogatepass"))
+    
+    @property
+    def newline_count(self) -> int:
+        """换行符个数"""
+        return len(self._starts) - 1
+    
+    @property
+    def line_count(self) -> int:
+        """非空文本的行数，末尾的换行不产生新行（与str.splitlines一致）"""
+        if not self.size:
+            return 0
+        return self.newline_count + (0 if self._starts[-1] == self.size else 1)
+    
+    def line_of(self, offset: int) -> int:
+        """字节偏移所在的行号"""
+        if self._find is not None:
+            return int(self._find(offset, side="right"))
+        return bisect_right(self._starts, offset)
+    
+    def span(self, line_number: int) -> Tuple[int, int]:
+        """
+        行的字节范围 [start, end)，不含换行符
+        
+        Raises:
+            IndexError: 行号超出范围
+        """
+        if not 1 <= line_number <= len(self._starts):
+            raise IndexError(f"行号超出范围: {line_number}")
+        start = int(self._starts[line_number - 1])
+        end = int(self._starts[line_number]) - 1 if line_number < len(self._starts) else self.size
+        return start, end
+    
+    def line_bytes(self, line_number: int) -> bytes:
+        """行的原始字节，不含换行符"""
+        start, end = self.span(line_number)
+        return self.data[start:end]
+    
+    def line(self, line_number: int, encoding: str = "utf-8") -> str:
+        """行内容，不含换行符，无法解码的字节以替换字符表示"""
+        return self.line_bytes(line_number).decode(encoding, errors="replace")
+
+
+def extract_code_snippets(text: Union[str, LineIndex], line_numbers: List[int], 
                          context_lines: int = 2) -> List[Dict[str, str]]:
     """
     从文本中提取代码片段
     
     Args:
-        text: 文本内容
+        text: 文本内容，或已建立的行索引（多次提取时复用）
         line_numbers: 行号列表
         context_lines: 上下文行数
         
     Returns:
         代码片段列表
     """
-    lines = text.split('\n')
+    index = LineIndex.from_text(text) if isinstance(text, str) else text
+    total_lines = index.newline_count + 1
     snippets = []
     
     for line_num in line_numbers:
         start_line = max(0, line_num - context_lines - 1)
-        end_line = min(len(lines), line_num + context_lines)
+        end_line = min(total_lines, line_num + context_lines)
         
         snippet_lines = []
         for i in range(start_line, end_line):
             line_prefix = f"{i+1:4d} | " if i == line_num - 1 else f"     | "
-            snippet_lines.append(f"{line_prefix}{lines[i]}")
+            snippet_lines.append(f"{line_prefix}{index.line(i + 1)}")
         
         snippets.append({
             "line_number": line_num,
@@ -88,17 +173,19 @@ def normalize_whitespace(text: str) -> str:
     # 将多个空白字符替换为单个空格
     return re.sub(r'\s+', ' ', text).strip()
 
-def count_lines(text: str) -> int:
+def count_lines(text: Union[str, LineIndex]) -> int:
     """
     计算文本行数
     
     Args:
-        text: 文本内容
+        text: 文本内容，或已建立的行索引
         
     Returns:
         行数
     """
-    return len(text.split('\n'))
+    if isinstance(text, LineIndex):
+        return text.newline_count + 1
+    return text.count('\n') + 1
 
 def find_pattern_positions(text: str, pattern: str) -> List[Dict[str, int]]:
     """
@@ -7,12 +7,15 @@
 import unittest
 import sys
 import os
+import tempfile
 from unittest.mock import Mock, patch
 
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
 
+from src.database.models import ScanResultModel
 from src.database.repositories import ScanResultRepository, ScanSummaryRepository
+from src.database.session_manager import DatabaseSessionManager
 
 
 class TestDatabaseRepositories(unittest.TestCase):
@@ -113,5 +116,39 @@ class TestDatabaseRepositories(unittest.TestCase):
         self.assertEqual(self.mock_session_manager.execute_non_query.call_count, 2)
 
 
+    def test_scan_result_rule_ids_column_added_to_old_table(self):
+        """测试旧版本创建的结果表补充rule_ids列，合并记录的规则ID可以读回"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            session_manager = DatabaseSessionManager(os.path.join(temp_dir, "results.db"))
+            session_manager.execute_non_query("""
+            CREATE TABLE scan_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                plugin_id TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                line_number INTEGER NOT NULL,
+                column INTEGER DEFAULT 0,
+                message TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                rule_id TEXT NOT NULL,
+                category TEXT NOT NULL,
+                suggestion TEXT,
+                code_snippet TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """)
+
+            repository = ScanResultRepository(session_manager)
+            saved = repository.save_batch([ScanResultModel(
+                plugin_id="builtin.todo", file_path="a.py", line_number=1, message="TODO",
+                rule_id="TODO_TODO", rule_ids="TODO_TODO,KEYWORD_TODO")])
+
+            self.assertEqual(saved, 1)
+            self.assertEqual([r.rule_ids for r in repository.get_all()], ["TODO_TODO,KEYWORD_TODO"])
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+插件分析进程池测试
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+from unittest.mock import patch
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.config.config_manager import ConfigManager
+from src.engine import analysis_pool
+from src.engine.analysis_pool import AnalysisPool
+from src.plugins.builtin.todo_plugin import TodoScanPlugin
+
+
+class TestAnalysisPool(unittest.TestCase):
+    """插件分析进程池测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        config_file = os.path.join(self.temp_dir, "config.json")
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump({"plugins": {"enabled": ["builtin.todo"], "dirs": []}}, f)
+        self.config_manager = ConfigManager(config_file)
+
+    def tearDown(self):
+        """测试后清理"""
+        import shutil
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_pool_results_match_inline_order(self):
+        """测试进程池结果与主进程逐行分析一致且顺序确定"""
+        batches = []
+        for index in range(30):
+            hits = [(line_no, f"# TODO item {index}-{line_no}", ("builtin.todo",))
+                    for line_no in range(1, 80)]
+            batches.append((f"mod_{index}.py", hits))
+
+        plugin = TodoScanPlugin()
+        plugin.initialize({})
+        expected = []
+        for file_path, hits in batches:
+            for line_no, line_content, _ in hits:
+                expected.extend(plugin.scan_line(file_path, line_no, line_content, {}))
+
+        with AnalysisPool(self.config_manager, self.temp_dir, workers=2) as pool:
+            actual = [result for task in pool.analyze(batches) for result in task]
+
+        self.assertEqual(actual, expected)
+
+    def test_workers_are_not_forked(self):
+        """测试工作进程不通过fork创建，不继承预扫描线程持有的锁"""
+        self.assertIn(analysis_pool._mp_context().get_start_method(), ("forkserver", "spawn"))
+
+    def test_unknown_plugin_is_skipped(self):
+        """测试未启用的插件ID被忽略"""
+        batches = [("app.py", [(1, "# TODO", ("builtin.missing",))])]
+
+        with AnalysisPool(self.config_manager, self.temp_dir, workers=1) as pool:
+            actual = [result for task in pool.analyze(batches) for result in task]
+
+        self.assertEqual(actual, [])
+
+
+    def test_unknown_plugin_is_logged(self):
+        """测试工作进程中无法解析的插件ID记录警告（每个ID一次）"""
+        task = [("app.py", [(1, "# TODO", ("builtin.missing",))]),
+                ("lib.py", [(2, "# TODO", ("builtin.missing",))])]
+
+        with patch.object(analysis_pool, "_worker_scan_lines", {}), \
+                patch.object(analysis_pool, "_worker_missing", set()):
+            with self.assertLogs("src.engine.analysis_pool", level="WARNING") as logs:
+                self.assertEqual(analysis_pool._analyze_task(task), [])
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("builtin.missing", logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式批处理测试
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import Mock
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.engine.columnar import HAS_PANDAS, group_by_plugin, iter_line_batches
+from src.engine.dispatch import DispatchTable, plugin_entry
+from src.plugins.builtin.todo_plugin import TodoScanPlugin
+
+
+def make_plugin(plugin_id, extensions):
+    plugin = Mock(spec=["plugin_id", "scan_line", "get_supported_extensions"])
+    plugin.plugin_id = plugin_id
+    plugin.get_supported_extensions.return_value = extensions
+    plugin.scan_line.side_effect = lambda path, line_no, content, context: [(plugin_id, path, line_no)]
+    return plugin
+
+
+@unittest.skipUnless(HAS_PANDAS, "pandas not installed")
+class TestLineBatch(unittest.TestCase):
+    """列式批次测试类"""
+
+    def setUp(self):
+        self.hits = [
+            ("a.py", 1, "x = 1"),
+            ("a.py", 4, "y = 2"),
+            ("b.js", 2, "z = 3"),
+            ("dir/c.py", 7, "w = 4"),
+        ]
+
+    def test_batches_keep_order_and_size(self):
+        """按行数切分批次，文件可跨批次，列与路由信息一一对应"""
+        routed = [hit + (index,) for index, hit in enumerate(self.hits)]
+        batches = list(iter_line_batches(routed, batch_lines=3))
+
+        self.assertEqual([len(batch) for batch, _ in batches], [3, 1])
+        batch, routes = batches[0]
+        self.assertEqual(routes, [0, 1, 2])
+        self.assertEqual(batch.lines.dtype, object)
+        self.assertEqual(batch.extensions.tolist(), [".py", ".py", ".js"])
+        self.assertEqual(batch.row(2), ("b.js", 2, "z = 3"))
+        self.assertEqual(list(batch.iter_files()), [
+            ("a.py", [(1, "x = 1"), (4, "y = 2")]),
+            ("b.js", [(2, "z = 3")]),
+        ])
+
+    def test_take_renumbers_rows(self):
+        """取子集后行位置重新编号"""
+        batch, _ = next(iter_line_batches([hit + (None,) for hit in self.hits]))
+        subset = batch.take([1, 3])
+
+        self.assertEqual(len(subset), 2)
+        self.assertEqual(subset.row(1), ("dir/c.py", 7, "w = 4"))
+        self.assertEqual(subset.lines.index.tolist(), [0, 1])
+
+    def test_group_by_plugin(self):
+        """按各行的扩展名和分派表收集每个插件的行位置"""
+        py = make_plugin("py", [".py"])
+        js = make_plugin("js", [".js"])
+        both = DispatchTable([py, js])
+        only_js = DispatchTable([js])
+
+        groups = group_by_plugin([".py", ".js", ".py", ".js"], [both, both, only_js, only_js])
+
+        self.assertEqual({plugin_id: (plugin, positions) for plugin_id, (plugin, positions) in groups.items()},
+                         {"py": (py, [0]), "js": (js, [1, 3])})
+
+    def test_scan_batch_entries(self):
+        """未实现scan_batch的插件按文件逐行扫描，IScanPlugin默认按文件调用scan_lines"""
+        batch, _ = next(iter_line_batches([hit + (None,) for hit in self.hits]))
+        plugin = make_plugin("plain", [".py"])
+        self.assertEqual(list(plugin_entry(plugin, "scan_batch")(batch, None)), [
+            ("plain", "a.py", 1), ("plain", "a.py", 4), ("plain", "b.js", 2), ("plain", "dir/c.py", 7),
+        ])
+
+        todo = TodoScanPlugin()
+        todo.initialize({})
+        batch, _ = next(iter_line_batches([("a.py", 3, "# TODO: x", None), ("b.py", 9, "# FIXME y", None)]))
+        results = todo.scan_batch(batch, None)
+        self.assertEqual([(r["file_path"], r["line_number"]) for r in results], [("a.py", 3), ("b.py", 9)])
+
+
+if __name__ == '__main__':
+    unittest.main()
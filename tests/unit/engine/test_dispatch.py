@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+插件分派表测试
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import Mock
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.engine.dispatch import DispatchTable, batch_by_plugin, file_extension, iter_file_batches
+from src.plugins.builtin.todo_plugin import TodoScanPlugin
+
+
+def make_plugin(plugin_id, extensions=None):
+    spec = ["plugin_id", "scan_line", "scan_file"]
+    if extensions is not None:
+        spec.append("get_supported_extensions")
+    plugin = Mock(spec=spec)
+    plugin.plugin_id = plugin_id
+    if extensions is not None:
+        plugin.get_supported_extensions.return_value = extensions
+    return plugin
+
+
+class TestDispatchTable(unittest.TestCase):
+    """插件分派表测试类"""
+
+    def test_entries_by_extension(self):
+        """按扩展名分派，保持插件顺序，未声明扩展名的插件对所有文件生效"""
+        py_js = make_plugin("py_js", [".py", ".js"])
+        any_file = make_plugin("any")
+        js = make_plugin("js", [".js"])
+        table = DispatchTable([py_js, any_file, js])
+
+        self.assertEqual([plugin_id for plugin_id, _ in table.get(".js")], ["py_js", "any", "js"])
+        self.assertEqual(table.plugin_ids_for(".py"), ("py_js", "any"))
+        self.assertEqual(table.plugin_ids_for(".md"), ("any",))
+        py_js.scan_line.return_value = ["finding"]
+        scan_lines = table.get(".js")[0][1]
+        self.assertEqual(list(scan_lines("a.js", [(1, "x"), (2, "y")], None)), ["finding", "finding"])
+        self.assertEqual(py_js.scan_line.call_count, 2)
+
+    def test_scan_lines_preferred(self):
+        """继承IScanPlugin的插件分派到scan_lines"""
+        plugin = TodoScanPlugin()
+        plugin.initialize({})
+        table = DispatchTable([plugin])
+        plugin_id, scan_lines = table.get(".py")[0]
+        self.assertEqual(plugin_id, "builtin.todo")
+        self.assertEqual(scan_lines, plugin.scan_lines)
+        results = scan_lines("a.py", [(1, "# TODO a"), (3, "# FIXME b")], None)
+        self.assertEqual([result["line_number"] for result in results], [1, 3])
+
+    def test_extensions_read_once(self):
+        """构建后查找不再调用get_supported_extensions"""
+        plugin = make_plugin("py", [".py"])
+        table = DispatchTable([plugin])
+        for _ in range(100):
+            table.get(".py")
+            table.get(".js")
+        self.assertEqual(plugin.get_supported_extensions.call_count, 1)
+        self.assertEqual(table.get(".js"), ())
+
+    def test_method_filter(self):
+        """只分派实现了该方法的插件"""
+        line_only = Mock(spec=["plugin_id", "scan_line", "get_supported_extensions"])
+        line_only.plugin_id = "line_only"
+        line_only.get_supported_extensions.return_value = [".py"]
+        table = DispatchTable([line_only, make_plugin("both", [".py"])], method="scan_file")
+        self.assertEqual(table.plugin_ids, ("both",))
+        calls = table.get(".py")
+        calls[0][1]("a.py", "", None)
+        table.plugins[0].scan_file.assert_called_once_with("a.py", "", None)
+
+    def test_batches(self):
+        """按文件分批，再按插件分组"""
+        py = make_plugin("py", [".py"])
+        any_file = make_plugin("any")
+        narrow = DispatchTable([py])
+        wide = DispatchTable([py, any_file])
+        routed = [("a.py", 1, "x", narrow), ("a.py", 2, "y", wide), ("b.md", 1, "z", wide),
+                  ("b.md", 2, "w", wide), ("b.md", 3, "v", wide)]
+
+        file_batches = list(iter_file_batches(routed, max_lines=2))
+        self.assertEqual([(path, len(hits)) for path, hits in file_batches],
+                         [("a.py", 2), ("b.md", 2), ("b.md", 1)])
+
+        batches = batch_by_plugin(file_batches[0][1], ".py")
+        self.assertEqual({plugin_id: hits for plugin_id, (_, hits) in batches.items()},
+                         {"py": [(1, "x"), (2, "y")], "any": [(2, "y")]})
+        self.assertEqual(list(batch_by_plugin(file_batches[1][1], ".md")), ["any"])
+
+    def test_file_extension(self):
+        """扩展名与文件清单一致"""
+        self.assertEqual(file_extension("src/a.b/c.py"), ".py")
+        self.assertEqual(file_extension("Makefile"), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件清单测试
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.engine.file_inventory import FileInventory
+
+
+class TestFileInventory(unittest.TestCase):
+    """文件清单测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self._write("a.py", "print('a')\n")
+        self._write("b.js", "var b;\n")
+        self._write("notes.txt", "text\n")
+        self._write("src/c.py", "c = 1\n")
+        self._write("node_modules/d.js", "var d;\n")
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, rel_path, content):
+        full_path = os.path.join(self.temp_dir, rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def test_build_filters_and_prunes(self):
+        """测试建立清单时按扩展名过滤并剪枝忽略目录"""
+        inventory = FileInventory.build(self.temp_dir, ["node_modules"], [".py", ".js"])
+
+        self.assertEqual(list(inventory), ["a.py", "b.js", os.path.join("src", "c.py")])
+        self.assertEqual(inventory.sizes[0], os.path.getsize(os.path.join(self.temp_dir, "a.py")))
+        self.assertEqual(inventory.extension(1), ".js")
+        self.assertGreater(inventory.mtimes_ns[0], 0)
+
+    def test_restrict_keeps_order_and_metadata(self):
+        """测试取子集保持顺序和元数据"""
+        inventory = FileInventory.build(self.temp_dir, ["node_modules"], [".py", ".js"])
+
+        subset = inventory.restrict([os.path.join("src", "c.py"), "a.py", "missing.py"])
+
+        self.assertEqual(list(subset), ["a.py", os.path.join("src", "c.py")])
+        self.assertEqual(list(subset.entries()), [("a.py", ".py"), (os.path.join("src", "c.py"), ".py")])
+        self.assertEqual(subset.sizes[1], inventory.sizes[2])
+
+    def test_sized_filters_extensions(self):
+        """测试按扩展名产出文件大小"""
+        inventory = FileInventory.build(self.temp_dir, ["node_modules"])
+
+        sized = dict(inventory.sized([".js"]))
+
+        self.assertEqual(sized, {"b.js": os.path.getsize(os.path.join(self.temp_dir, "b.js"))})
+
+    def test_from_paths_applies_filters(self):
+        """测试由已知路径建立清单时应用相同的过滤规则并跳过缺失文件"""
+        self._write(".scanignore", "c.py\n")
+        paths = ["a.py", "b.js", "notes.txt", "src/c.py", "node_modules/d.js", "deleted.py"]
+
+        inventory = FileInventory.from_paths(self.temp_dir, paths, ["node_modules"], [".py", ".js"])
+
+        self.assertEqual(list(inventory.entries()), [("a.py", ".py"), ("b.js", ".js")])
+        self.assertEqual(inventory.sizes[1], os.path.getsize(os.path.join(self.temp_dir, "b.js")))
+
+
+if __name__ == '__main__':
+    unittest.main()
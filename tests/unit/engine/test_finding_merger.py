@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结果合并测试
+"""
+
+import unittest
+import sys
+import os
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.engine.finding_merger import FindingMerger, combine_findings, order_findings
+
+
+def finding(file_path, line_number, rule_id, severity="low", message=None, plugin_id="p"):
+    return {
+        "plugin_id": plugin_id,
+        "file_path": file_path,
+        "line_number": line_number,
+        "rule_id": rule_id,
+        "severity": severity,
+        "message": message or rule_id,
+    }
+
+
+FAMILIES = {
+    "marker_todo": ["KEYWORD_TODO", "TODO_TODO"],
+    "credential": ["PASSWORD_LITERAL", "SECURITY_001"],
+}
+
+
+class TestFindingMerger(unittest.TestCase):
+    """结果合并测试类"""
+
+    def merge(self, stages, file_order=None):
+        merger = FindingMerger(FAMILIES)
+        return list(merger.merge(order_findings(stages, file_order or {}))), merger
+
+    def test_merges_same_line_and_family(self):
+        """同一文件同一行同一规则族的结果合并，不同行、不同规则族或不同文件的结果保留"""
+        results, merger = self.merge([[
+            finding("a.py", 1, "KEYWORD_TODO", plugin_id="builtin.keyword"),
+            finding("a.py", 2, "PASSWORD_LITERAL", "critical", plugin_id="builtin.security"),
+            finding("a.py", 1, "TODO_TODO", plugin_id="builtin.todo"),
+            finding("a.py", 2, "SECURITY_001", "critical", plugin_id="security.hardcoded_password"),
+            finding("a.py", 2, "KEYWORD_TODO"),
+            finding("b.py", 1, "TODO_TODO"),
+        ]], {"a.py": 0, "b.py": 1})
+
+        self.assertEqual([(r["file_path"], r["line_number"], r["rule_id"]) for r in results], [
+            ("a.py", 1, "KEYWORD_TODO"),
+            ("a.py", 2, "PASSWORD_LITERAL"),
+            ("a.py", 2, "KEYWORD_TODO"),
+            ("b.py", 1, "TODO_TODO"),
+        ])
+        self.assertEqual(results[0]["rule_ids"], ["KEYWORD_TODO", "TODO_TODO"])
+        self.assertEqual(results[0]["plugin_id"], "builtin.keyword")
+        self.assertEqual(results[1]["rule_ids"], ["PASSWORD_LITERAL", "SECURITY_001"])
+        self.assertNotIn("rule_ids", results[2])
+        self.assertEqual(merger.merged_count, 2)
+
+    def test_same_rule_keeps_messages(self):
+        """同一规则在一行上的多次报告合并为一条，保留各自的说明"""
+        results, _ = self.merge([[
+            finding("c.py", 3, "SECURITY_002", "high", "Weak cryptographic algorithm MD5 detected"),
+            finding("c.py", 3, "SECURITY_002", "high", "Weak cryptographic algorithm SHA1 detected"),
+        ]])
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["rule_ids"], ["SECURITY_002"])
+        self.assertEqual(results[0]["message"],
+                         "Weak cryptographic algorithm MD5 detected; Weak cryptographic algorithm SHA1 detected")
+
+    def test_primary_is_most_severe(self):
+        """主记录取严重级别最高的结果"""
+        merged = combine_findings([
+            finding("a.py", 1, "KEYWORD_TODO", "low"),
+            finding("a.py", 1, "TODO_TODO", "medium", plugin_id="builtin.todo"),
+        ])
+        self.assertEqual((merged["rule_id"], merged["plugin_id"]), ("TODO_TODO", "builtin.todo"))
+        self.assertEqual(merged["rule_ids"], ["TODO_TODO", "KEYWORD_TODO"])
+
+    def test_tie_break_independent_of_arrival(self):
+        """严重级别相同时按插件ID、规则ID选择主记录，与到达顺序无关"""
+        findings = [
+            finding("a.py", 2, "SECURITY_001", "critical", plugin_id="security.hardcoded_password"),
+            finding("a.py", 2, "PASSWORD_LITERAL", "critical", plugin_id="builtin.security"),
+        ]
+        merged = combine_findings(findings)
+        self.assertEqual(combine_findings(findings[::-1]), merged)
+        self.assertEqual((merged["plugin_id"], merged["rule_id"]), ("builtin.security", "PASSWORD_LITERAL"))
+        self.assertEqual(merged["rule_ids"], ["PASSWORD_LITERAL", "SECURITY_001"])
+
+    def test_results_of_different_stages_merged(self):
+        """不同扫描阶段报告的同一文件的结果按文件归并后合并"""
+        first_stage = [finding(f"f{index}.py", 1, "KEYWORD_TODO") for index in range(200)]
+        fallback_stage = [finding(f"f{index}.py", 1, "TODO_TODO") for index in range(200)]
+        file_order = {f"f{index}.py": index for index in range(200)}
+
+        results, merger = self.merge([first_stage, fallback_stage], file_order)
+
+        self.assertEqual(len(results), 200)
+        self.assertEqual(merger.merged_count, 200)
+        self.assertEqual([r["file_path"] for r in results], [f"f{index}.py" for index in range(200)])
+        self.assertTrue(all(r["rule_ids"] == ["KEYWORD_TODO", "TODO_TODO"] for r in results))
+
+    def test_order_and_passthrough(self):
+        """文件按清单顺序输出，不在清单中的文件排在前一个清单文件之后，缺少定位信息的结果原样输出"""
+        results, _ = self.merge([
+            [
+                finding("b.py", 1, "KEYWORD_TODO"),
+                finding("a.py", 3, "KEYWORD_TODO"),
+                finding("c.py", 1, "TODO_TODO"),
+                {"line": 1},
+            ],
+            [finding("a.py", 1, "TODO_TODO")],
+        ], {"b.py": 0, "a.py": 1})
+
+        self.assertEqual([(r.get("file_path"), r.get("line_number")) for r in results], [
+            ("b.py", 1),
+            ("a.py", 1),
+            ("a.py", 3),
+            ("c.py", 1),
+            (None, None),
+        ])
+
+    def test_ordering_is_bounded_per_file(self):
+        """按文件归并时只预读到下一个文件，不收集整次扫描的结果"""
+        consumed = []
+
+        def stage(prefix):
+            for index in range(1000):
+                consumed.append(prefix)
+                yield finding(f"f{index:04d}.py", 1, f"{prefix}_RULE")
+
+        file_order = {f"f{index:04d}.py": index for index in range(1000)}
+        results = order_findings([stage("A"), stage("B")], file_order)
+        first = [next(results), next(results)]
+
+        self.assertEqual([r["rule_id"] for r in first], ["A_RULE", "B_RULE"])
+        self.assertLessEqual(len(consumed), 4)
+        results.close()
+
+if __name__ == '__main__':
+    unittest.main()
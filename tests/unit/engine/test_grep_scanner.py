@@ -6,13 +6,14 @@ Grep扫描器测试
 
 import unittest
 import sys
+import io
 import os
 import tempfile
 
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
 
-from src.engine.grep_scanner import GrepScanner
+from src.engine.grep_scanner import GrepScanner, iter_null_delimited
 
 
 class TestGrepScanner(unittest.TestCase):
@@ -60,6 +61,76 @@ class TestGrepScanner(unittest.TestCase):
         # 应该找到至少一个匹配项
         self.assertGreater(len(results), 0)
 
+    def test_grep_scanner_scan_multi(self):
+        """测试多模式单次扫描"""
+        if os.name == 'nt':  # Windows
+            self.skipTest("Windows系统可能没有grep命令")
+
+        results = list(self.scanner.scan_multi(["TODO", "FIXME"]))
+
+        line_numbers = sorted(line_no for _, line_no, _ in results)
+        self.assertEqual(line_numbers, [1, 3])
+
+    def test_parallel_scan_matches_serial(self):
+        """测试并行分片扫描与串行扫描结果一致"""
+        if os.name == 'nt':  # Windows
+            self.skipTest("Windows系统可能没有grep命令")
+
+        import shutil
+        repo_dir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(repo_dir, "pkg", "sub"))
+            for index in range(12):
+                sub_dir = "pkg/sub" if index % 2 else "pkg"
+                with open(os.path.join(repo_dir, sub_dir, f"mod_{index}.py"), 'w', encoding='utf-8') as f:
+                    f.write("x = 1\n" * index)
+                    f.write(f"# TODO item {index}\n")
+
+            serial = list(GrepScanner(repo_dir).scan("TODO", [".py"]))
+            parallel = list(GrepScanner(repo_dir, jobs=4).scan("TODO", [".py"]))
+
+            self.assertEqual(len(serial), 12)
+            self.assertEqual(sorted(serial), sorted(parallel))
+        finally:
+            shutil.rmtree(repo_dir)
+
+    def test_colon_in_file_name(self):
+        """文件名含':'时串行与分片扫描都返回正确的相对路径"""
+        if os.name == 'nt':  # Windows
+            self.skipTest("Windows文件名不能包含':'")
+
+        import shutil
+        repo_dir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(repo_dir, "a:b"))
+            with open(os.path.join(repo_dir, "a:b", "c:1:d.py"), 'w', encoding='utf-8') as f:
+                f.write("x = 1\n# TODO: 12:34  \r\n")
+
+            expected = [("a:b/c:1:d.py", 2, "# TODO: 12:34")]
+            self.assertEqual(list(GrepScanner(repo_dir).scan("TODO", [".py"])), expected)
+            self.assertEqual(list(GrepScanner(repo_dir, jobs=2).scan("TODO", [".py"])), expected)
+        finally:
+            shutil.rmtree(repo_dir)
+
+
+class TestNullDelimitedParser(unittest.TestCase):
+    """以\\0分隔文件名的输出解析测试"""
+
+    def test_parse_across_chunks(self):
+        """记录跨越读取块边界时正确拼接"""
+        output = b"a:b.py\x001:x: TODO\nsub/c.py\x0012:\xe4\xb8\xad TODO\nbad line\nlast.py\x003:end"
+        hits = list(iter_null_delimited(io.BytesIO(output), chunk_size=5))
+        self.assertEqual(hits, [
+            (b"a:b.py", 1, b"x: TODO"),
+            (b"sub/c.py", 12, "中 TODO".encode("utf-8")),
+            (b"last.py", 3, b"end"),
+        ])
+
+    def test_git_separator(self):
+        """git grep -z在行号后同样输出\\0"""
+        hits = list(iter_null_delimited(io.BytesIO(b"a.py\x007\x00k: v\n"), b"\x00"))
+        self.assertEqual(hits, [(b"a.py", 7, b"k: v")])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
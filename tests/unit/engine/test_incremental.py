@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量扫描缓存测试
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+from types import SimpleNamespace
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.database.session_manager import DatabaseSessionManager
+from src.database.repositories import FileStateRepository
+from src.engine.incremental import IncrementalCache
+from src.plugins.builtin.rule_pack_plugin import RulePackScanPlugin
+
+try:
+    import jsonschema  # noqa: F401
+    HAS_JSONSCHEMA = True
+except ImportError:
+    HAS_JSONSCHEMA = False
+
+
+class TestIncrementalCache(unittest.TestCase):
+    """增量扫描缓存测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_dir = os.path.join(self.temp_dir, "repo")
+        os.makedirs(self.repo_dir)
+        for name in ("a.py", "b.py"):
+            with open(os.path.join(self.repo_dir, name), 'w', encoding='utf-8') as f:
+                f.write(f"# TODO {name}\n")
+        session_manager = DatabaseSessionManager(os.path.join(self.temp_dir, "state.db"))
+        self.repository = FileStateRepository(session_manager)
+        self.plugins = [SimpleNamespace(plugin_id="builtin.todo", version="1.0.0")]
+
+    def tearDown(self):
+        """测试后清理"""
+        import shutil
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def _open_cache(self, plugin_configs=None, scan_settings=None):
+        cache = IncrementalCache(self.repository, self.repo_dir)
+        fingerprint = IncrementalCache.compute_fingerprint(self.plugins, plugin_configs or {}, self.repo_dir,
+                                                           scan_settings)
+        cache.load(fingerprint)
+        return cache
+
+    def _first_scan(self, scan_settings=None):
+        cache = self._open_cache(scan_settings=scan_settings)
+        changed, unchanged = cache.classify(["a.py", "b.py"])
+        self.assertEqual(sorted(changed), ["a.py", "b.py"])
+        self.assertEqual(unchanged, [])
+        cache.record({"file_path": "a.py", "line_number": 1, "rule_id": "TODO_TODO"})
+        cache.commit()
+
+    def test_unchanged_files_replay_findings(self):
+        """测试未变化的文件复用缓存结果"""
+        self._first_scan()
+
+        cache = self._open_cache()
+        changed, unchanged = cache.classify(["a.py", "b.py"])
+
+        self.assertEqual(changed, [])
+        replayed = list(IncrementalCache.replay(unchanged))
+        self.assertEqual(replayed, [{"file_path": "a.py", "line_number": 1, "rule_id": "TODO_TODO"}])
+
+    def test_modified_file_is_rescanned(self):
+        """测试内容变化的文件需要重新扫描"""
+        self._first_scan()
+        with open(os.path.join(self.repo_dir, "b.py"), 'a', encoding='utf-8') as f:
+            f.write("# FIXME\n")
+
+        cache = self._open_cache()
+        changed, unchanged = cache.classify(["a.py", "b.py"])
+
+        self.assertEqual(changed, ["b.py"])
+        self.assertEqual([state.path for state in unchanged], ["a.py"])
+
+    def test_plugin_config_change_invalidates_cache(self):
+        """测试插件配置变化时缓存失效"""
+        self._first_scan()
+
+        cache = self._open_cache({"builtin.todo": {"include_patterns": ["TODO"]}})
+        changed, _ = cache.classify(["a.py", "b.py"])
+
+        self.assertEqual(sorted(changed), ["a.py", "b.py"])
+
+    def test_scan_settings_change_invalidates_cache(self):
+        """测试结果合并等扫描设置变化时缓存失效"""
+        self._first_scan({"merge_findings": True, "rule_families": {}})
+
+        cache = self._open_cache(scan_settings={"merge_findings": False, "rule_families": {}})
+        changed, _ = cache.classify(["a.py", "b.py"])
+
+        self.assertEqual(sorted(changed), ["a.py", "b.py"])
+
+    @unittest.skipUnless(HAS_JSONSCHEMA, "jsonschema not installed")
+    def test_rule_pack_edit_invalidates_cache(self):
+        """测试规则包内容变化时缓存失效（配置中的路径不变）"""
+        pack_path = os.path.join(self.temp_dir, "pack.json")
+
+        def write_pack(regex):
+            with open(pack_path, 'w', encoding='utf-8') as f:
+                json.dump({"pack_id": "p", "rules": [
+                    {"id": "R1", "regex": regex, "severity": "high", "message": "m"}]}, f)
+            plugin = RulePackScanPlugin()
+            self.assertTrue(plugin.initialize({"packs": [pack_path]}))
+            self.plugins = [plugin]
+
+        plugin_configs = {"builtin.rule_pack": {"packs": [pack_path]}}
+        write_pack("TODO")
+        cache = self._open_cache(plugin_configs)
+        cache.classify(["a.py", "b.py"])
+        cache.commit()
+
+        write_pack("FIXME")
+        cache = self._open_cache(plugin_configs)
+        changed, _ = cache.classify(["a.py", "b.py"])
+
+        self.assertEqual(sorted(changed), ["a.py", "b.py"])
+
+    def test_deleted_file_is_dropped(self):
+        """测试已删除的文件从缓存中移除"""
+        self._first_scan()
+
+        cache = self._open_cache()
+        cache.classify(["b.py"])
+        cache.commit()
+
+        self.assertEqual(sorted(self.repository.get_all()), ["b.py"])
+
+
+if __name__ == '__main__':
+    unittest.main()
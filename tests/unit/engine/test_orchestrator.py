@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预扫描编排测试
+"""
+
+import unittest
+import sys
+import os
+import time
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.engine.orchestrator import PrefilterOrchestrator
+
+
+def slow_stream(name, count, delay):
+    for index in range(count):
+        time.sleep(delay)
+        yield f"{name}{index}"
+
+
+class TestPrefilterOrchestrator(unittest.TestCase):
+    """预扫描编排测试类"""
+
+    def test_streams_run_concurrently(self):
+        """总耗时接近最慢的流，且每个流内顺序不变"""
+        orchestrator = PrefilterOrchestrator(batch_size=1)
+        start = time.monotonic()
+        results = list(orchestrator.run([
+            ("a", slow_stream("a", 5, 0.1)),
+            ("b", slow_stream("b", 5, 0.1)),
+            ("c", slow_stream("c", 5, 0.1)),
+        ]))
+        elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, 1.2)
+        for key in "abc":
+            self.assertEqual([item for k, item in results if k == key], [f"{key}{i}" for i in range(5)])
+
+    def test_backpressure(self):
+        """消费方停下时生产方只能领先有限的数量"""
+        produced = []
+
+        def counting_stream(name):
+            for index in range(10000):
+                produced.append(name)
+                yield index
+
+        orchestrator = PrefilterOrchestrator(queue_size=2, batch_size=10)
+        results = orchestrator.run([("a", counting_stream("a")), ("b", counting_stream("b"))])
+        next(results)
+        time.sleep(0.3)
+        # 队列中2批 + 每个生产线程手中各1批 + 已取出的1批
+        self.assertLessEqual(len(produced), 10 * 6 + 2)
+        results.close()
+
+    def test_early_exit_closes_streams(self):
+        """消费方提前结束时关闭所有流"""
+        closed = []
+
+        def endless(name):
+            try:
+                while True:
+                    yield name
+            finally:
+                closed.append(name)
+
+        orchestrator = PrefilterOrchestrator(queue_size=1, batch_size=1)
+        results = orchestrator.run([("a", endless("a")), ("b", endless("b"))])
+        next(results)
+        results.close()
+
+        self.assertEqual(sorted(closed), ["a", "b"])
+
+    def test_failing_stream_does_not_stop_others(self):
+        """某个流出错时其他流照常完成"""
+        def failing():
+            yield "x0"
+            raise RuntimeError("boom")
+
+        with self.assertLogs("src.engine.orchestrator", level="ERROR"):
+            results = list(PrefilterOrchestrator().run([("x", failing()), ("y", iter(["y0", "y1"]))]))
+        self.assertEqual(sorted(item for _, item in results), ["x0", "y0", "y1"])
+
+    def test_ordered_merge_independent_of_timing(self):
+        """按key归并时输出顺序与各流的快慢无关，并发与单线程归并一致"""
+        def timed_stream(values, delay):
+            for value in values:
+                time.sleep(delay)
+                yield value
+
+        expected = [("a", 1), ("b", 1), ("a", 2), ("b", 3), ("a", 4), ("b", 4)]
+        for delays in ((0.02, 0), (0, 0.02)):
+            with self.subTest(delays=delays):
+                streams = [("a", timed_stream([1, 2, 4], delays[0])), ("b", timed_stream([1, 3, 4], delays[1]))]
+                results = list(PrefilterOrchestrator(batch_size=1).run(streams, key=lambda value: value))
+                self.assertEqual(results, expected)
+        merged = PrefilterOrchestrator().merge([("a", iter([1, 2, 4])), ("b", iter([1, 3, 4]))],
+                                               key=lambda value: value)
+        self.assertEqual(list(merged), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
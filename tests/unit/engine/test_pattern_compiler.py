@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预筛选模式编译测试
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import Mock
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.engine.pattern_compiler import (
+    PatternSyntax, build_grep_args, compile_pattern, ere_to_python, plugin_pattern,
+)
+
+
+class TestPatternCompiler(unittest.TestCase):
+    """预筛选模式编译测试类"""
+
+    def test_classification(self):
+        """字面量交替、ERE、PCRE按模式内容识别"""
+        literal = compile_pattern(r"TODO|FIXME|eval\(")
+        self.assertIs(literal.syntax, PatternSyntax.LITERAL)
+        self.assertEqual(literal.literals, ("TODO", "FIXME", "eval("))
+        self.assertIs(compile_pattern(r"password\s*=").syntax, PatternSyntax.ERE)
+        self.assertIs(compile_pattern(r"\d{3}-\d{4}").syntax, PatternSyntax.PCRE)
+        self.assertIs(compile_pattern(r"(?:a|b)c").syntax, PatternSyntax.PCRE)
+
+    def test_declared_syntax(self):
+        """插件声明的语法优先"""
+        literal = compile_pattern("a.b", {"syntax": "literal"})
+        self.assertEqual(literal.literals, ("a.b",))
+        self.assertIs(compile_pattern("TODO", {"syntax": "pcre"}).syntax, PatternSyntax.PCRE)
+
+    def test_literals_use_fixed_strings_in_c_locale(self):
+        """字面量使用grep -F，ASCII或区分大小写时使用C locale"""
+        grep_args = build_grep_args([compile_pattern("TODO|FIXME"), compile_pattern("password")])
+        self.assertEqual(grep_args.args, ["-F", "-e", "TODO", "-e", "FIXME", "-e", "password"])
+        self.assertTrue(grep_args.c_locale)
+
+        grep_args = build_grep_args([compile_pattern("待办", {"ignore_case": True})])
+        self.assertEqual(grep_args.args, ["-F", "-i", "-e", "待办"])
+        self.assertFalse(grep_args.c_locale)
+        self.assertTrue(build_grep_args([compile_pattern("待办")]).c_locale)
+
+    def test_ignore_case_applies_to_whole_invocation(self):
+        """任一模式忽略大小写时整体使用-i"""
+        grep_args = build_grep_args([
+            compile_pattern("TODO", {"ignore_case": True}),
+            compile_pattern("pass(word|wd)"),
+        ])
+        self.assertEqual(grep_args.args, ["-E", "-i", "-e", "TODO", "-e", "pass(word|wd)"])
+        self.assertTrue(grep_args.c_locale)
+
+    def test_ere_locale_safety(self):
+        """可能匹配单个多字节字符的ERE不使用C locale"""
+        self.assertFalse(build_grep_args([compile_pattern("a.b")]).c_locale)
+        self.assertFalse(build_grep_args([compile_pattern("[a-z]+x")]).c_locale)
+        self.assertFalse(build_grep_args([compile_pattern(r"\w+x")]).c_locale)
+        self.assertTrue(build_grep_args([compile_pattern("a.*b")]).c_locale)
+
+    def test_pcre_translated_or_passed_through(self):
+        """PCRE模式优先转换为ERE，否则在支持时使用-P"""
+        grep_args = build_grep_args([compile_pattern(r"\d{3}-\d{4}")])
+        self.assertEqual(grep_args.args, ["-E", "-e", "[0-9]{3}-[0-9]{4}"])
+
+        conditional = compile_pattern(r"(#)?(?(1)x|y)z")
+        self.assertIsNone(build_grep_args([conditional]))
+        grep_args = build_grep_args([conditional, compile_pattern("TODO")], pcre_supported=True)
+        self.assertEqual(grep_args.args, ["-P", "-e", "(?:(#)?(?(1)x|y)z)|(?:TODO)"])
+
+    def test_inline_ignore_case(self):
+        """PCRE模式开头的(?i)转换为ERE时以-i执行，Python正则中改写为局部标志"""
+        pattern = compile_pattern(r"(?i)password\s*=")
+        self.assertTrue(pattern.ignore_case)
+        self.assertEqual(build_grep_args([pattern]).args, ["-E", "-i", "-e", "password"])
+        self.assertIsNotNone(pattern.python_regex().search("PASSWORD = 1"))
+        self.assertEqual(pattern.scoped_python(), r"(?i:(?i:password\s*=))")
+        self.assertFalse(compile_pattern(r"password\s*=", {"syntax": "pcre"}).ignore_case)
+
+    def test_python_regex(self):
+        """路由用的Python正则遵循大小写选项并转换POSIX字符类"""
+        self.assertEqual(ere_to_python("a[[:space:]]+[^[:alnum:]_]"), r"a[ \t\n\r\f\v]+[^0-9A-Za-z_]")
+        regex = compile_pattern("todo", {"ignore_case": True}).python_regex()
+        self.assertIsNotNone(regex.search("# TODO"))
+        self.assertIsNone(compile_pattern("todo").python_regex().search("# TODO"))
+
+    def test_negated_posix_class(self):
+        """取反的POSIX字符类与grep一致，不会因展开过宽而漏掉grep命中的行"""
+        regex = compile_pattern("x[^[:alpha:]]").python_regex()
+        self.assertIsNotNone(regex.search("x1"))
+        self.assertIsNotNone(regex.search("x_"))
+        self.assertIsNone(regex.search("xa"))
+        self.assertIsNotNone(compile_pattern("[^[:upper:]]z").python_regex().search("az"))
+        self.assertIsNotNone(compile_pattern("[^[:lower:]]z").python_regex().search("Az"))
+        self.assertIsNotNone(compile_pattern("[^[:print:]]").python_regex().search("\t"))
+        self.assertIsNone(compile_pattern("[^[:print:]]").python_regex().search("a b"))
+
+    def test_plugin_pattern(self):
+        """读取插件声明的选项，未声明时使用默认值"""
+        plugin = Mock()
+        plugin.get_grep_pattern.return_value = "TODO"
+        plugin.get_grep_flags.return_value = {"ignore_case": True}
+        self.assertTrue(plugin_pattern(plugin).ignore_case)
+
+        legacy = Mock(spec=["get_grep_pattern"])
+        legacy.get_grep_pattern.return_value = "TODO"
+        self.assertFalse(plugin_pattern(legacy).ignore_case)
+
+        plugin.get_grep_pattern.return_value = ""
+        self.assertIsNone(plugin_pattern(plugin))
+
+
+if __name__ == '__main__':
+    unittest.main()
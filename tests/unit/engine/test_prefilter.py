@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预扫描后端测试
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.engine.prefilter import PythonPrefilter, LiteralPrefilter
+from src.engine.pattern_compiler import compile_pattern
+from src.engine.grep_scanner import GrepScanner, RipgrepScanner, GitGrepScanner
+
+
+class TestPrefilterBackends(unittest.TestCase):
+    """预扫描后端测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self._write("app.py", "def run():\n    # TODO: 实现\n    password = 'x'   \n")
+        self._write("pkg/util.py", "x = 1\n# FIXME later\n")
+        self._write("pkg/skip.txt", "TODO not scanned\n")
+        self.files = ["app.py", os.path.join("pkg", "util.py")]
+        self.expected = [
+            ("app.py", 2, "    # TODO: 实现"),
+            ("app.py", 3, "    password = 'x'"),
+            (os.path.join("pkg", "util.py"), 2, "# FIXME later"),
+        ]
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, rel_path, content):
+        full_path = os.path.join(self.temp_dir, rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def _scan(self, backend_cls, files=None):
+        backend = backend_cls(self.temp_dir)
+        return list(backend.scan_multi(["TODO|FIXME", "password"], [".py"], files))
+
+    def test_python_backend(self):
+        """测试纯Python后端的规范化命中"""
+        self.assertEqual(self._scan(PythonPrefilter, self.files), self.expected)
+        self.assertEqual(sorted(self._scan(PythonPrefilter)), self.expected)
+
+    def test_python_backend_single_pattern(self):
+        """测试单模式扫描"""
+        hits = list(PythonPrefilter(self.temp_dir).scan("FIXME", [".py"], self.files))
+        self.assertEqual(hits, [self.expected[2]])
+
+    def test_python_backend_line_semantics(self):
+        """测试跨行匹配按行语义确认、同一行只报告一次"""
+        self._write("multi.py", "password\n= 1\nTODO TODO\n")
+
+        hits = list(PythonPrefilter(self.temp_dir).scan_multi([r"password\s*=", "TODO"], [".py"], ["multi.py"]))
+
+        self.assertEqual(hits, [("multi.py", 3, "TODO TODO")])
+
+    def test_python_backend_large_and_binary_files(self):
+        """测试大文件使用mmap时行号正确，并跳过二进制文件"""
+        from src.engine import prefilter
+        line_count = prefilter.MMAP_THRESHOLD // 10 + 100
+        self._write("big.py", "x = 1 # pad\n" * line_count + "# TODO end\n")
+        with open(os.path.join(self.temp_dir, "blob.py"), 'wb') as f:
+            f.write(b"\0\1TODO\n")
+
+        hits = list(PythonPrefilter(self.temp_dir).scan("TODO", [".py"], ["big.py", "blob.py"]))
+
+        self.assertEqual(hits, [("big.py", line_count + 1, "# TODO end")])
+
+    def test_literal_backend(self):
+        """测试Aho–Corasick后端处理字面量模式，遇到正则时回退"""
+        self.assertEqual(
+            list(LiteralPrefilter(self.temp_dir).scan_multi(["TODO|FIXME", "password"], [".py"], self.files)),
+            self.expected
+        )
+        self.assertEqual(self._scan(LiteralPrefilter, self.files), self._scan(PythonPrefilter, self.files))
+        self.assertEqual(
+            list(LiteralPrefilter(self.temp_dir).scan("pass\\w+", [".py"], self.files)),
+            [self.expected[1]]
+        )
+
+    def test_literal_backend_dense_hits(self):
+        """每行多次命中时每行只报告一次，与纯Python后端一致"""
+        self._write("dense.py", "".join(f"x = {index}  # TODO: TODO FIXME\n" for index in range(2000)) + "done\n")
+        hits = list(LiteralPrefilter(self.temp_dir).scan_multi(["TODO|FIXME"], [".py"], ["dense.py"]))
+        self.assertEqual(len(hits), 2000)
+        self.assertEqual(hits, list(PythonPrefilter(self.temp_dir).scan_multi(["TODO|FIXME"], [".py"], ["dense.py"])))
+
+    def test_tool_backends_match_python(self):
+        """测试各命令行后端与纯Python后端产出相同的命中流"""
+        if os.name == 'nt':  # Windows
+            self.skipTest("Windows系统可能没有grep命令")
+        if shutil.which("git"):
+            subprocess.run(["git", "init", "-q"], cwd=self.temp_dir, check=True)
+
+        for backend_cls in (GrepScanner, RipgrepScanner, GitGrepScanner):
+            if not backend_cls.is_available(self.temp_dir):
+                continue
+            with self.subTest(backend=backend_cls.name):
+                self.assertEqual(self._scan(backend_cls, self.files), self.expected)
+
+    def test_backends_honor_pattern_flags(self):
+        """忽略大小写与POSIX字符类在所有后端中语义一致"""
+        self._write("case.py", "# todo lower\nPASSWORD = 1\nnothing\nSECRET = 2\n")
+        patterns = [
+            compile_pattern("TODO|FIXME", {"ignore_case": True}),
+            compile_pattern("PASSW[[:alnum:]]+ ="),
+            # 内联(?i)转换为ERE后需要以-i执行
+            compile_pattern(r"(?i)secret\s*="),
+        ]
+        expected = [("case.py", 1, "# todo lower"), ("case.py", 2, "PASSWORD = 1"), ("case.py", 4, "SECRET = 2")]
+        if os.name != 'nt' and shutil.which("git"):
+            subprocess.run(["git", "init", "-q"], cwd=self.temp_dir, check=True)
+
+        for backend_cls in (PythonPrefilter, LiteralPrefilter, GrepScanner, RipgrepScanner, GitGrepScanner):
+            if not backend_cls.is_available(self.temp_dir):
+                continue
+            with self.subTest(backend=backend_cls.name):
+                hits = list(backend_cls(self.temp_dir).scan_multi(patterns, [".py"], ["case.py"]))
+                self.assertEqual(hits, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
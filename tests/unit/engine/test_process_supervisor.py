@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+子进程监管测试
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import time
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.engine.process_supervisor import ProcessSupervisor
+
+
+@unittest.skipIf(os.name == 'nt', "测试依赖POSIX shell")
+class TestProcessSupervisor(unittest.TestCase):
+    """子进程监管测试类"""
+
+    def spawn_modes(self):
+        modes = [False]
+        if hasattr(os, "posix_spawn"):
+            modes.append(True)
+        return modes
+
+    def test_output_cwd_and_record(self):
+        """读取输出、切换工作目录并记录退出码与耗时"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for use_posix_spawn in self.spawn_modes():
+                with self.subTest(posix_spawn=use_posix_spawn):
+                    supervisor = ProcessSupervisor(timeout=30, use_posix_spawn=use_posix_spawn)
+                    with supervisor.spawn(["sh", "-c", "pwd; exit 3"], cwd=temp_dir,
+                                          expected_returncodes=(3,)) as process:
+                        output = process.stdout.read()
+                        self.assertEqual(process.wait(), 3)
+                    self.assertEqual(os.path.realpath(output.decode().strip()), os.path.realpath(temp_dir))
+                    record = supervisor.records[0]
+                    self.assertEqual(record.returncode, 3)
+                    self.assertEqual(record.spawn_method, "posix_spawn" if use_posix_spawn else "popen")
+                    self.assertGreaterEqual(record.duration, 0)
+
+    def test_stdin(self):
+        """向标准输入写入数据"""
+        for use_posix_spawn in self.spawn_modes():
+            with self.subTest(posix_spawn=use_posix_spawn):
+                supervisor = ProcessSupervisor(use_posix_spawn=use_posix_spawn)
+                with supervisor.spawn(["cat"], stdin=True) as process:
+                    process.stdin.write(b"a\0b")
+                    process.stdin.close()
+                    self.assertEqual(process.stdout.read(), b"a\0b")
+                    self.assertEqual(process.wait(), 0)
+
+    def test_stderr_drained(self):
+        """大量stderr输出不会阻塞进程"""
+        for use_posix_spawn in self.spawn_modes():
+            with self.subTest(posix_spawn=use_posix_spawn):
+                supervisor = ProcessSupervisor(timeout=30, use_posix_spawn=use_posix_spawn)
+                script = "i=0; while [ $i -lt 5000 ]; do echo \"error line $i\" >&2; i=$((i+1)); done; echo done"
+                with supervisor.spawn(["sh", "-c", script]) as process:
+                    self.assertEqual(process.stdout.read(), b"done\n")
+                    process.wait()
+                record = supervisor.records[0]
+                self.assertEqual(record.stderr_lines, 5000)
+                self.assertEqual(record.stderr_tail[-1], "error line 4999")
+                self.assertFalse(record.timed_out)
+
+    def test_deadline_kills_process_group(self):
+        """超过期限时终止整个进程组，包括子进程"""
+        for use_posix_spawn in self.spawn_modes():
+            with self.subTest(posix_spawn=use_posix_spawn):
+                supervisor = ProcessSupervisor(timeout=0.5, use_posix_spawn=use_posix_spawn)
+                start = time.monotonic()
+                # 子进程继承stdout，只有整个进程组被终止后读取才会结束
+                with supervisor.spawn(["sh", "-c", "sleep 30 & sleep 30"]) as process:
+                    self.assertEqual(process.stdout.read(), b"")
+                    process.wait()
+                self.assertLess(time.monotonic() - start, 10)
+                self.assertTrue(supervisor.records[0].timed_out)
+
+    def test_close_kills_running_process(self):
+        """提前结束时终止进程并标记"""
+        supervisor = ProcessSupervisor()
+        with supervisor.spawn(["sleep", "30"]):
+            pass
+        record = supervisor.records[0]
+        self.assertTrue(record.killed)
+        self.assertIsNotNone(record.returncode)
+
+    def test_missing_command(self):
+        """命令不存在时抛出FileNotFoundError"""
+        for use_posix_spawn in self.spawn_modes():
+            with self.subTest(posix_spawn=use_posix_spawn):
+                with self.assertRaises(FileNotFoundError):
+                    ProcessSupervisor(use_posix_spawn=use_posix_spawn).spawn(["no-such-command-xyz"])
+
+
+if __name__ == '__main__':
+    unittest.main()
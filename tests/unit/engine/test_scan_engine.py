@@ -13,7 +13,12 @@ from unittest.mock import Mock, patch
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
 
+from src.engine.columnar import HAS_PANDAS
+from src.engine.process_supervisor import ProcessSupervisor
 from src.engine.scan_engine import OptimizedScanEngine
+from src.plugins.builtin.keyword_plugin import KeywordScanPlugin
+from src.plugins.builtin.security_plugin import SecurityScanPlugin
+from src.plugins.builtin.todo_plugin import TodoScanPlugin
 
 
 class TestScanEngine(unittest.TestCase):
@@ -29,6 +34,24 @@ class TestScanEngine(unittest.TestCase):
         self.mock_config_manager.get_repo_path.return_value = "."
         self.mock_config_manager.get_ignore_dirs.return_value = [".git", "__pycache__"]
         self.mock_config_manager.get_file_extensions.return_value = [".py", ".js"]
+        self.mock_config_manager.get_unified_prefilter.return_value = True
+        self.mock_config_manager.get_concurrent_prefilter.return_value = True
+        self.mock_config_manager.get_columnar_batch_lines.return_value = 0
+        self.mock_config_manager.get_merge_findings.return_value = True
+        self.mock_config_manager.get_rule_families.return_value = {}
+        self.mock_config_manager.get_prefilter_backend.return_value = "grep"
+        self.mock_config_manager.get_scan_timeout.return_value = 300
+        self.mock_config_manager.get_scan_jobs.return_value = 1
+        self.mock_config_manager.get_analysis_workers.return_value = 0
+        self.mock_config_manager.get_incremental.return_value = False
+        self.mock_config_manager.get_since_revision.return_value = None
+        self.mock_config_manager.get_revision_range.return_value = None
+        self.mock_config_manager.get_include_globs.return_value = []
+        self.mock_config_manager.get_exclude_globs.return_value = []
+        self.mock_config_manager.get_respect_gitignore.return_value = True
+        self.mock_config_manager.get_follow_symlinks.return_value = False
+        self.mock_config_manager.get_file_source.return_value = "auto"
+        self.mock_config_manager.get_include_untracked.return_value = True
         
         # 创建扫描引擎实例
         self.engine = OptimizedScanEngine(self.mock_config_manager, self.mock_plugin_manager)
@@ -70,6 +93,363 @@ class TestScanEngine(unittest.TestCase):
         # 验证插件管理器的方法被调用
         self.mock_plugin_manager.get_enabled_plugins.assert_called_once()
 
+    @patch('src.engine.scan_engine.GrepScanner')
+    def test_scan_iter_streams_results(self, mock_grep_scanner):
+        """测试流式扫描逐条产出结果并在结束后更新统计"""
+        from src.plugin.base import ScanResult, SeverityLevel
+
+        mock_grep_scanner.return_value.scan.side_effect = lambda *args, **kwargs: iter([
+            (file_path, line_no, f"# TODO {line_no}") for file_path in ("a.py", "b.py", "c.py") for line_no in (1, 2)
+        ])
+        mock_plugin = Mock(plugin_id="todo")
+        mock_plugin.get_grep_pattern.return_value = "TODO"
+        mock_plugin.get_supported_extensions.return_value = [".py"]
+        mock_plugin.scan_line.side_effect = lambda path, line_no, content, context: [
+            ScanResult(plugin_id="todo", file_path=path, line_number=line_no,
+                       severity=SeverityLevel.LOW)
+        ]
+        self.mock_plugin_manager.get_enabled_plugins.return_value = [mock_plugin]
+
+        # 合并与否都逐个文件输出，只需预读到下一个文件
+        for merge in (True, False):
+            with self.subTest(merge=merge):
+                self.mock_config_manager.get_merge_findings.return_value = merge
+                mock_plugin.scan_line.reset_mock()
+                stream = self.engine.scan_iter()
+                first = next(stream)
+
+                self.assertEqual((first["file_path"], first["line_number"]), ("a.py", 1))
+                self.assertEqual(first["severity"], "low")
+                scanned = [call.args[0] for call in mock_plugin.scan_line.call_args_list]
+                self.assertNotIn("c.py", scanned)
+                remaining = list(stream)
+                self.assertEqual(len(remaining), 5)
+                self.assertEqual(self.engine.get_stats()['results_count'], 6)
+
+    def test_create_prefilter_backend(self):
+        """测试按配置选择预扫描后端"""
+        from src.engine.prefilter import PythonPrefilter
+
+        self.mock_config_manager.get_prefilter_backend.return_value = "python"
+        backend = self.engine._create_prefilter(".", [])
+        self.assertIsInstance(backend, PythonPrefilter)
+
+        with patch('src.engine.scan_engine.RipgrepScanner') as mock_rg, \
+                patch('src.engine.scan_engine.GrepScanner') as mock_grep:
+            mock_rg.is_available.return_value = False
+            mock_grep.is_available.return_value = False
+            self.mock_config_manager.get_prefilter_backend.return_value = "auto"
+            backend = self.engine._create_prefilter(".", [])
+        self.assertIsInstance(backend, PythonPrefilter)
+
+    def test_unified_prefilter_routes_hits(self):
+        """测试统一预扫描只遍历一次并按子模式路由"""
+        if os.name == 'nt':  # Windows
+            self.skipTest("Windows系统可能没有grep命令")
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(temp_dir, "app.py"), 'w', encoding='utf-8') as f:
+                f.write("# TODO: later\n")
+                f.write("password = 'x'\n")
+
+            todo_plugin = Mock(plugin_id="todo")
+            todo_plugin.get_grep_pattern.return_value = "TODO"
+            todo_plugin.get_supported_extensions.return_value = [".py"]
+            todo_plugin.scan_line.return_value = [{"rule_id": "TODO"}]
+            secret_plugin = Mock(plugin_id="secret")
+            secret_plugin.get_grep_pattern.return_value = "password"
+            secret_plugin.get_supported_extensions.return_value = [".py"]
+            secret_plugin.scan_line.return_value = [{"rule_id": "SECRET"}]
+            self.mock_plugin_manager.get_enabled_plugins.return_value = [todo_plugin, secret_plugin]
+
+            results = self.engine.scan(temp_dir)
+
+            self.assertEqual(self.engine.get_stats()['prefilter_passes'], 1)
+            self.assertEqual(len(results), 2)
+            todo_lines = [call.args[1] for call in todo_plugin.scan_line.call_args_list]
+            secret_lines = [call.args[1] for call in secret_plugin.scan_line.call_args_list]
+            self.assertEqual(todo_lines, [1])
+            self.assertEqual(secret_lines, [2])
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir)
+
+    def test_prefilter_extensions(self):
+        """预扫描只读取插件支持且已配置的扩展名"""
+        py_plugin = Mock()
+        py_plugin.get_supported_extensions.return_value = [".py", ".html"]
+        js_plugin = Mock()
+        js_plugin.get_supported_extensions.return_value = [".js", ".py"]
+        legacy_plugin = Mock(spec=["get_grep_pattern", "scan_line"])
+
+        extensions = OptimizedScanEngine._prefilter_extensions
+        self.assertEqual(extensions([py_plugin], [".js", ".py"]), [".py"])
+        self.assertEqual(extensions([py_plugin, js_plugin], [".js", ".py", ".css"]), [".js", ".py"])
+        self.assertEqual(extensions([js_plugin], [".html"]), [])
+        self.assertEqual(extensions([py_plugin, js_plugin], []), [".py", ".html", ".js"])
+        self.assertEqual(extensions([legacy_plugin, py_plugin], [".css"]), [".css"])
+        self.assertIsNone(extensions([legacy_plugin], []))
+
+    @patch('src.engine.scan_engine.GrepScanner')
+    def test_prefilter_uses_group_extensions(self, mock_grep_scanner):
+        """每个模式组只扫描其插件支持的扩展名，没有可扫描扩展名的组不执行"""
+        mock_grep_scanner.return_value.scan.return_value = iter([])
+        self.mock_config_manager.get_unified_prefilter.return_value = False
+
+        js_plugin = Mock(plugin_id="js")
+        js_plugin.get_grep_pattern.return_value = "eval"
+        js_plugin.get_supported_extensions.return_value = [".js", ".ts"]
+        css_plugin = Mock(plugin_id="css")
+        css_plugin.get_grep_pattern.return_value = "important"
+        css_plugin.get_supported_extensions.return_value = [".css"]
+        self.mock_plugin_manager.get_enabled_plugins.return_value = [js_plugin, css_plugin]
+
+        self.engine.scan(".")
+
+        scan = mock_grep_scanner.return_value.scan
+        self.assertEqual(scan.call_count, 1)
+        self.assertEqual(str(scan.call_args.args[0]), "eval")
+        self.assertEqual(scan.call_args.args[1], [".js"])
+
+    def test_concurrent_prefilter(self):
+        """测试不合并模式时各模式组并发预扫描，命中交给各自的插件"""
+        if os.name == 'nt':  # Windows
+            self.skipTest("Windows系统可能没有grep命令")
+
+        self.mock_config_manager.get_unified_prefilter.return_value = False
+        temp_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(temp_dir, "app.py"), 'w', encoding='utf-8') as f:
+                for index in range(300):
+                    f.write(f"# TODO: item {index}\n")
+                    f.write(f"password_{index} = 'x'\n")
+
+            todo_plugin = Mock(plugin_id="todo")
+            todo_plugin.get_grep_pattern.return_value = "TODO"
+            todo_plugin.get_supported_extensions.return_value = [".py"]
+            todo_plugin.scan_line.side_effect = lambda path, line_no, content, context: [{"line": line_no}]
+            secret_plugin = Mock(plugin_id="secret")
+            secret_plugin.get_grep_pattern.return_value = "password"
+            secret_plugin.get_supported_extensions.return_value = [".py"]
+            secret_plugin.scan_line.side_effect = lambda path, line_no, content, context: [{"line": line_no}]
+            self.mock_plugin_manager.get_enabled_plugins.return_value = [todo_plugin, secret_plugin]
+
+            results = self.engine.scan(temp_dir)
+
+            self.assertEqual(self.engine.get_stats()['prefilter_passes'], 2)
+            self.assertEqual(len(results), 600)
+            todo_lines = [call.args[1] for call in todo_plugin.scan_line.call_args_list]
+            secret_lines = [call.args[1] for call in secret_plugin.scan_line.call_args_list]
+            self.assertEqual(todo_lines, list(range(1, 601, 2)))
+            self.assertEqual(secret_lines, list(range(2, 601, 2)))
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir)
+
+
+    @unittest.skipUnless(HAS_PANDAS, "pandas not installed")
+    def test_columnar_batches(self):
+        """列式批处理与按文件分批的结果相同，插件每批只调用一次scan_batch"""
+        if os.name == 'nt':  # Windows
+            self.skipTest("Windows系统可能没有grep命令")
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for name in ("a.py", "b.py", "c.js"):
+                with open(os.path.join(temp_dir, name), 'w', encoding='utf-8') as f:
+                    f.write("password = 'x'\nprint(1)\napi_key = \"k\"\n# TODO later\n")
+
+            security = SecurityScanPlugin()
+            todo = Mock(plugin_id="todo")
+            todo.get_grep_pattern.return_value = "TODO"
+            todo.get_supported_extensions.return_value = [".py"]
+            todo.scan_line.side_effect = lambda path, line_no, content, context: [
+                {"file_path": path, "line_number": line_no, "rule_id": "TODO"}]
+            self.mock_plugin_manager.get_enabled_plugins.return_value = [security, todo]
+
+            def findings():
+                return sorted((r["file_path"], r["line_number"], r["rule_id"]) for r in self.engine.scan(temp_dir))
+
+            expected = findings()
+            self.mock_config_manager.get_columnar_batch_lines.return_value = 3
+            with patch.object(SecurityScanPlugin, "scan_batch", autospec=True,
+                              side_effect=SecurityScanPlugin.scan_batch) as scan_batch:
+                self.assertEqual(findings(), expected)
+            self.assertEqual(len(expected), 8)
+            # 每个文件3行命中（password、api_key、TODO），每批3行
+            self.assertEqual(scan_batch.call_count, 3)
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir)
+
+
+    def test_merge_findings(self):
+        """不同插件在同一行上报告的同一问题合并为一条"""
+        if os.name == 'nt':  # Windows
+            self.skipTest("Windows系统可能没有grep命令")
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(temp_dir, "app.py"), 'w', encoding='utf-8') as f:
+                f.write("# TODO: fix\npassword = '123'\n")
+
+            keyword = KeywordScanPlugin()
+            keyword.initialize({})
+            todo = TodoScanPlugin()
+            todo.initialize({})
+            self.mock_plugin_manager.get_enabled_plugins.return_value = [keyword, todo, SecurityScanPlugin()]
+            self.mock_config_manager.get_rule_families.return_value = {"marker_todo": ["KEYWORD_TODO", "TODO_TODO"]}
+
+            results = self.engine.scan(temp_dir)
+
+            self.assertEqual([(r["line_number"], r.get("rule_ids", [r["rule_id"]])) for r in results],
+                             [(1, ["KEYWORD_TODO", "TODO_TODO"]), (2, ["PASSWORD_LITERAL"])])
+            self.assertEqual(self.engine.get_stats()['merged_findings'], 1)
+
+            self.mock_config_manager.get_merge_findings.return_value = False
+            self.assertEqual(len(self.engine.scan(temp_dir)), 3)
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir)
+
+
+    def test_merge_findings_in_every_mode(self):
+        """各模式组分阶段、并发执行或由全量扫描报告的重复结果同样合并"""
+        if os.name == 'nt':  # Windows
+            self.skipTest("Windows系统可能没有grep命令")
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for index in range(200):
+                with open(os.path.join(temp_dir, f"m{index:03d}.py"), 'w', encoding='utf-8') as f:
+                    f.write("# TODO: fix\npassword = '123'\n")
+
+            keyword = KeywordScanPlugin()
+            keyword.initialize({})
+            # 没有grep模式的插件在最后的全量扫描阶段报告同一行
+            fallback = Mock(plugin_id="fallback.todo")
+            fallback.get_grep_pattern.return_value = None
+            fallback.get_supported_extensions.return_value = [".py"]
+            fallback.scan_file.side_effect = lambda path, content, context: [
+                {"plugin_id": "fallback.todo", "file_path": path, "line_number": 1,
+                 "rule_id": "TODO_TODO", "severity": "low", "message": "TODO"}]
+            self.mock_plugin_manager.get_enabled_plugins.return_value = [keyword, SecurityScanPlugin(), fallback]
+            self.mock_config_manager.get_rule_families.return_value = {"marker_todo": ["KEYWORD_TODO", "TODO_TODO"]}
+
+            for unified, concurrent in ((True, False), (False, True), (False, False)):
+                with self.subTest(unified=unified, concurrent=concurrent):
+                    self.mock_config_manager.get_unified_prefilter.return_value = unified
+                    self.mock_config_manager.get_concurrent_prefilter.return_value = concurrent
+                    results = self.engine.scan(temp_dir)
+
+                    self.assertEqual(len(results), 400)
+                    self.assertEqual(self.engine.get_stats()['merged_findings'], 200)
+                    todo = [r for r in results if r["line_number"] == 1]
+                    self.assertTrue(all(r["rule_ids"] == ["KEYWORD_TODO", "TODO_TODO"] for r in todo))
+                    self.assertEqual([r["file_path"] for r in todo], sorted(r["file_path"] for r in todo))
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir)
+
+    def test_output_independent_of_prefilter_mode(self):
+        """并发、逐组和统一预扫描以及列式分析输出相同的结果与顺序"""
+        if os.name == 'nt':  # Windows
+            self.skipTest("Windows系统可能没有grep命令")
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for index in range(50):
+                with open(os.path.join(temp_dir, f"m{index:02d}.py"), 'w', encoding='utf-8') as f:
+                    f.write("password = 'x'  # TODO rotate\nprint(1)\n# FIXME later\napi_key = 'k'\n")
+
+            keyword = KeywordScanPlugin()
+            keyword.initialize({})
+            todo = TodoScanPlugin()
+            todo.initialize({})
+            self.mock_plugin_manager.get_enabled_plugins.return_value = [keyword, todo, SecurityScanPlugin()]
+
+            for merge in (True, False):
+                self.mock_config_manager.get_merge_findings.return_value = merge
+                outputs = []
+                # 列式批次跨越多个文件，同样按文件顺序输出
+                for unified, concurrent, batch_lines in ((False, True, 0), (False, False, 0), (True, False, 0),
+                                                         (False, True, 7), (True, False, 7)):
+                    self.mock_config_manager.get_unified_prefilter.return_value = unified
+                    self.mock_config_manager.get_concurrent_prefilter.return_value = concurrent
+                    self.mock_config_manager.get_columnar_batch_lines.return_value = batch_lines
+                    outputs.append(self.engine.scan(temp_dir))
+                with self.subTest(merge=merge):
+                    self.assertTrue(outputs[0])
+                    for output in outputs[1:]:
+                        self.assertEqual(output, outputs[0])
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir)
+
+    def _incremental_repo(self, temp_dir):
+        """创建增量扫描用的仓库，返回仓库路径与TODO插件"""
+        repo_dir = os.path.join(temp_dir, "repo")
+        os.makedirs(repo_dir)
+        for index in range(5):
+            with open(os.path.join(repo_dir, f"m{index}.py"), 'w', encoding='utf-8') as f:
+                f.write(f"# TODO: item {index}\n")
+        self.mock_config_manager.get_incremental.return_value = True
+        self.mock_config_manager.get_state_db_path.return_value = os.path.join(temp_dir, "state.db")
+        self.mock_config_manager.get_plugin_configs.return_value = {}
+        todo = TodoScanPlugin()
+        todo.initialize({})
+        self.mock_plugin_manager.get_enabled_plugins.return_value = [todo]
+        return repo_dir
+
+    def test_incremental_not_committed_after_prefilter_timeout(self):
+        """预扫描超时的结果不写入增量缓存，下次扫描重新扫描变更文件"""
+        if os.name == 'nt':  # Windows
+            self.skipTest("Windows系统可能没有grep命令")
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            repo_dir = self._incremental_repo(temp_dir)
+            spawn = ProcessSupervisor.spawn
+
+            def spawn_timed_out(supervisor, *args, **kwargs):
+                process = spawn(supervisor, *args, **kwargs)
+                process.record.timed_out = True
+                return process
+
+            with patch.object(ProcessSupervisor, "spawn", spawn_timed_out):
+                self.engine.scan(repo_dir)
+            self.assertGreater(self.engine.get_stats()['prefilter_timeouts'], 0)
+
+            results = self.engine.scan(repo_dir)
+            self.assertEqual(self.engine.get_stats()['cached_files'], 0)
+            self.assertEqual(len(results), 5)
+
+            # 完整的扫描正常写入缓存
+            self.assertEqual(len(self.engine.scan(repo_dir)), 5)
+            self.assertEqual(self.engine.get_stats()['cached_files'], 5)
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir)
+
+    def test_incremental_not_committed_after_prefilter_error(self):
+        """预扫描出错时不写入增量缓存"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            repo_dir = self._incremental_repo(temp_dir)
+            broken = Mock(errors=0)
+            broken.scan.side_effect = RuntimeError("grep crashed")
+            with patch.object(OptimizedScanEngine, "_create_prefilter", return_value=broken):
+                self.assertEqual(self.engine.scan(repo_dir), [])
+            self.assertEqual(self.engine.get_stats()['prefilter_errors'], 1)
+
+            if os.name != 'nt':
+                self.assertEqual(len(self.engine.scan(repo_dir)), 5)
+                self.assertEqual(self.engine.get_stats()['cached_files'], 0)
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
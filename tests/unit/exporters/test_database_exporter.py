@@ -58,6 +58,25 @@ class TestDatabaseExporter(unittest.TestCase):
         self.assertEqual(saved_count, 5)
         self.mock_result_repository.save_batch.assert_called_once()
 
+    def test_database_exporter_rule_ids(self):
+        """测试合并记录的规则ID列表写入rule_ids列"""
+        merged = self.exporter._to_model({"rule_id": "TODO_TODO", "rule_ids": ["TODO_TODO", "KEYWORD_TODO"]})
+        self.assertEqual(merged.rule_ids, "TODO_TODO,KEYWORD_TODO")
+        self.assertEqual(self.exporter._to_model({"rule_id": "TODO_TODO"}).rule_ids, "")
+
+    def test_database_exporter_export_stream(self):
+        """测试流式导出按批次提交"""
+        self.mock_result_repository.save_batch.side_effect = lambda batch: len(batch)
+
+        results = ({"plugin_id": "keyword", "file_path": f"{index}.py", "line_number": index}
+                   for index in range(5))
+
+        saved_count = self.exporter.export_stream(results, batch_size=2)
+
+        self.assertEqual(saved_count, 5)
+        batch_sizes = [len(call.args[0]) for call in self.mock_result_repository.save_batch.call_args_list]
+        self.assertEqual(batch_sizes, [2, 2, 1])
+
     def test_database_exporter_export_summary(self):
         """测试数据库摘要导出功能"""
         # 配置模拟对象
@@ -58,6 +58,21 @@ class TestExcelExporter(unittest.TestCase):
         # 验证结果
         self.assertTrue(os.path.exists(output_file))
 
+    def test_excel_exporter_rule_ids(self):
+        """测试合并记录的规则ID列表写入rule_ids列"""
+        import pandas as pd
+
+        results = [
+            {"plugin_id": "builtin.todo", "file_path": "a.py", "line_number": 1,
+             "rule_id": "TODO_TODO", "rule_ids": ["TODO_TODO", "KEYWORD_TODO"]},
+            {"plugin_id": "builtin.todo", "file_path": "b.py", "line_number": 1, "rule_id": "TODO_TODO"},
+        ]
+
+        for output_file in (self.exporter.export(results, "batch.xlsx"),
+                            self.exporter.export_stream(iter(results), "stream.xlsx")):
+            df = pd.read_excel(output_file, keep_default_na=False)
+            self.assertEqual(df["rule_ids"].tolist(), ["TODO_TODO, KEYWORD_TODO", ""])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
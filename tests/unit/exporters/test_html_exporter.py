@@ -62,6 +62,30 @@ class TestHTMLExporter(unittest.TestCase):
             self.assertIn("代码扫描报告", content)
             self.assertIn("test.py", content)
 
+    def test_html_exporter_export_stream(self):
+        """测试流式导出与一次性导出内容一致"""
+        results = [
+            {"plugin_id": "keyword", "file_path": "a.py", "line_number": 1, "severity": "low"},
+            {"plugin_id": "security", "file_path": "b.py", "line_number": 2, "severity": "high"},
+            {"plugin_id": "keyword", "file_path": "c.py", "line_number": 3, "severity": "low"},
+        ]
+
+        batch_file = self.exporter.export(results, "batch.html")
+        stream_file = self.exporter.export_stream(iter(results), "stream.html")
+
+        def body(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return [line for line in f if "生成时间" not in line]
+
+        self.assertEqual(body(batch_file), body(stream_file))
+
+    def test_html_exporter_rule_ids(self):
+        """测试合并记录列出全部参与合并的规则"""
+        item = self.exporter._render_result_item(
+            {"file_path": "a.py", "line_number": 1, "rule_id": "TODO_TODO", "rule_ids": ["TODO_TODO", "KEYWORD_TODO"]})
+        self.assertIn("TODO_TODO, KEYWORD_TODO", item)
+        self.assertNotIn("合并规则", self.exporter._render_result_item({"rule_id": "TODO_TODO"}))
+
     def test_html_exporter_export_summary(self):
         """测试HTML摘要导出功能"""
         # 创建测试数据
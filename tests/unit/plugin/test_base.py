@@ -7,11 +7,12 @@
 import unittest
 import sys
 import os
+import tempfile
 
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
 
-from src.plugin.base import IScanPlugin
+from src.plugin.base import IScanPlugin, ScanContext
 
 
 class TestPluginBase(unittest.TestCase):
@@ -23,6 +24,21 @@ class TestPluginBase(unittest.TestCase):
         # 这里只是测试导入是否成功
         self.assertTrue(IScanPlugin.__name__, "IScanPlugin")
 
+    def test_context_get_lines(self):
+        """扫描上下文按相对仓库的路径读取命中行附近的行"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, "pkg"))
+            with open(os.path.join(temp_dir, "pkg", "app.py"), "w", encoding="utf-8") as f:
+                f.write("user = 'admin'\npassword = get()\n")
+            context = ScanContext(repo_path=temp_dir)
+            try:
+                self.assertEqual(context.get_lines(os.path.join("pkg", "app.py"), 1, 2),
+                                 ["user = 'admin'", "password = get()"])
+                self.assertEqual(len(context.line_cache), 1)
+            finally:
+                context.close()
+            self.assertEqual(len(context.line_cache), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -24,6 +24,7 @@ class TestPluginManager(unittest.TestCase):
         self.mock_config_manager = Mock()
         self.mock_config_manager.get_plugin_dirs.return_value = []
         self.mock_config_manager.get_plugin_configs.return_value = {}
+        self.mock_config_manager.get_enabled_plugins.return_value = []
         
         # 创建插件管理器实例
         self.plugin_manager = PluginManager(self.mock_config_manager)
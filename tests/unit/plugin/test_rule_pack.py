@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+声明式规则包测试
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.plugin.rule_pack import (
+    CompiledRuleSet, Rule, RulePackError, compile_rules, derive_prefilter, load_rule_pack,
+    validate_rule_pack,
+)
+
+try:
+    import jsonschema  # noqa: F401
+    HAS_JSONSCHEMA = True
+except ImportError:
+    HAS_JSONSCHEMA = False
+
+try:
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
+
+def make_rule(rule_id, regex, **kwargs):
+    return Rule(rule_id, regex, kwargs.pop("severity", "high"), f"{rule_id} message", **kwargs)
+
+
+class TestCompiledRuleSet(unittest.TestCase):
+    """规则合并编译测试"""
+
+    def rule_ids(self, rule_set, line, file_ext=None):
+        return [rule.rule_id for rule in rule_set.match_line(line, file_ext)]
+
+    def test_matches_same_rules_as_individual_regexes(self):
+        """合并匹配的结果与逐条规则匹配一致，包括重叠和同一起点的匹配"""
+        rules = [
+            make_rule("FOO", r"foo"),
+            make_rule("FOO_PLUS", r"fo+"),
+            make_rule("BAR", r"bar\d", ignore_case=True),
+            make_rule("FOOBAR", r"foobar"),
+            make_rule("REPEAT", r"(ab)\1"),
+            make_rule("EMPTY_CALL", r"\w+\(\)"),
+        ]
+        rule_set = compile_rules(rules)
+        lines = ["foobar1", "xx FOO BAR2", "abab foo()", "f", "", "BAR9 foobar"]
+        for line in lines:
+            expected = [rule.rule_id for rule in rules
+                        if re.search(rule.regex, line, re.I if rule.ignore_case else 0)]
+            self.assertEqual(self.rule_ids(rule_set, line), expected, line)
+
+    def test_extensions_filter_rules(self):
+        """规则只在声明的扩展名上生效"""
+        rule_set = compile_rules([
+            make_rule("ANY", r"secret"),
+            make_rule("YAML_ONLY", r"secret", extensions=(".yaml",)),
+        ])
+        self.assertEqual(self.rule_ids(rule_set, "secret", ".py"), ["ANY"])
+        self.assertEqual(self.rule_ids(rule_set, "secret", ".yaml"), ["ANY", "YAML_ONLY"])
+
+    def test_match_text_reports_line_numbers(self):
+        """整文件匹配返回行号"""
+        rule_set = compile_rules([make_rule("TOKEN", r"token")])
+        hits = [(line_no, rule.rule_id) for line_no, _, rule in rule_set.match_text("a\ntoken\nb\ntoken x\n")]
+        self.assertEqual(hits, [(2, "TOKEN"), (4, "TOKEN")])
+
+    @unittest.skipUnless(HAS_PANDAS, "pandas not installed")
+    def test_match_batch_matches_match_line(self):
+        """向量化匹配与逐行匹配结果一致，包括单独编译的规则和扩展名筛选"""
+        rule_set = compile_rules([
+            make_rule("FOO", r"foo"),
+            make_rule("BAR", r"bar(\d)", ignore_case=True),
+            make_rule("REPEAT", r"(ab)\1"),
+            make_rule("YAML_ONLY", r"foo", extensions=(".yaml",)),
+        ])
+        rows = [("foobar1", ".py"), ("nothing", ".py"), ("abab BAR2", ".yaml"), ("foo", ".yaml"), ("", ".py")]
+        lines = pd.Series([line for line, _ in rows], dtype=object)
+        extensions = pd.Series([ext for _, ext in rows])
+        expected = [(position, rule.rule_id) for position, (line, ext) in enumerate(rows)
+                    for rule in rule_set.match_line(line, ext)]
+        self.assertEqual([(position, rule.rule_id) for position, rule in rule_set.match_batch(lines, extensions)],
+                         expected)
+        self.assertEqual(compile_rules([make_rule("FOO", r"foo")]).match_batch(pd.Series([], dtype=object)), [])
+
+    def test_invalid_regex_names_rule(self):
+        """无效正则的错误信息包含规则ID"""
+        with self.assertRaises(RulePackError) as cm:
+            CompiledRuleSet([make_rule("BROKEN", r"[")])
+        self.assertIn("BROKEN", str(cm.exception))
+
+    def test_prefilter(self):
+        """ERE兼容的规则合并为预筛选模式，否则无法预筛选"""
+        self.assertEqual(compile_rules([make_rule("A", r"foo"), make_rule("B", r"ba[rz]")]).prefilter,
+                         "foo|ba[rz]")
+        self.assertEqual(compile_rules([make_rule("A", r"api_key\s*="), make_rule("B", r"(?a)\d+")]).prefilter,
+                         "api_key|[0-9]+")
+        # Unicode语义的\d无法表达为不更严格的ERE
+        self.assertIsNone(compile_rules([make_rule("A", r"api_key"), make_rule("B", r"\d+")]).prefilter)
+        self.assertIsNone(compile_rules([make_rule("A", r"foo"), make_rule("B", r"(a)?(?(1)b|c)")]).prefilter)
+        self.assertEqual(derive_prefilter(make_rule("A", r"foo", ignore_case=True)), ("foo", True))
+        self.assertEqual(derive_prefilter(make_rule("A", r"\d+", prefilter="[0-9]")), ("[0-9]", False))
+        self.assertIsNone(compile_rules([]).prefilter)
+
+    def test_prefilter_ignore_case(self):
+        """任一规则忽略大小写时整个预筛选忽略大小写"""
+        rule_set = compile_rules([make_rule("A", r"foo"), make_rule("B", r"(?i)bar")])
+        self.assertEqual(rule_set.prefilter, "foo|bar")
+        self.assertTrue(rule_set.prefilter_ignore_case)
+        self.assertFalse(compile_rules([make_rule("A", r"foo")]).prefilter_ignore_case)
+
+
+class TestRulePackLoading(unittest.TestCase):
+    """规则包加载与校验测试"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pack = {
+            "pack_id": "test",
+            "rules": [
+                {"id": "AWS_KEY", "regex": "AKIA[0-9A-Z]{16}", "severity": "critical",
+                 "message": "AWS key", "extensions": [".py"]},
+            ],
+        }
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_pack(self, data):
+        path = os.path.join(self.temp_dir.name, "pack.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        return path
+
+    @unittest.skipUnless(HAS_JSONSCHEMA, "jsonschema not installed")
+    def test_load_rule_pack(self):
+        """加载规则包"""
+        pack = load_rule_pack(self.write_pack(self.pack))
+        self.assertEqual(pack.pack_id, "test")
+        self.assertEqual(pack.rules[0].rule_id, "AWS_KEY")
+        self.assertEqual(pack.rules[0].extensions, (".py",))
+
+    @unittest.skipUnless(HAS_JSONSCHEMA, "jsonschema not installed")
+    def test_schema_errors(self):
+        """缺少字段、非法级别、重复ID、无效正则均被拒绝"""
+        rule = self.pack["rules"][0]
+        invalid_rules = [
+            {k: v for k, v in rule.items() if k != "message"},
+            dict(rule, severity="fatal"),
+            dict(rule, regex="("),
+            dict(rule, unknown=True),
+        ]
+        for invalid in invalid_rules:
+            with self.assertRaises(RulePackError):
+                validate_rule_pack({"pack_id": "test", "rules": [invalid]})
+        with self.assertRaises(RulePackError):
+            validate_rule_pack({"pack_id": "test", "rules": [rule, rule]})
+
+    @unittest.skipUnless(HAS_JSONSCHEMA, "jsonschema not installed")
+    def test_sample_pack_is_valid(self):
+        """仓库自带的示例规则包通过校验"""
+        sample = os.path.join(os.path.dirname(__file__), '../../../config/rule_packs/secrets.json')
+        pack = load_rule_pack(sample)
+        self.assertTrue(pack.rules)
+        self.assertIsNotNone(compile_rules(pack.rules).prefilter)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -147,6 +147,69 @@ class TestRegexPlugin(unittest.TestCase):
         self.assertIsInstance(results, list)
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]["rule_id"], "REGEX_SYNTAX_ERROR")
+        results = self.plugin.scan_lines("test.py", [(10, "a"), (11, "b")], context)
+        self.assertEqual([(r["line_number"], r["rule_id"]) for r in results],
+                         [(10, "REGEX_SYNTAX_ERROR"), (11, "REGEX_SYNTAX_ERROR")])
+
+    def test_scan_file_reports_invalid_regex(self):
+        """整文件扫描与逐行扫描同样报告正则表达式语法错误"""
+        self.plugin.initialize({"patterns": [
+            {"pattern": r"[", "rule_id": "INVALID_REGEX"},
+            {"pattern": r"eval\(", "rule_id": "EVAL"},
+        ]})
+        content = "eval(x)\nok\n"
+        expected = self.plugin.scan_lines("a.py", [(1, "eval(x)"), (2, "ok")], {})
+
+        self.assertEqual(self.plugin.scan_file("a.py", content, {}), expected)
+        self.assertEqual([(r["line_number"], r["rule_id"]) for r in expected],
+                         [(1, "EVAL"), (1, "REGEX_SYNTAX_ERROR"), (2, "REGEX_SYNTAX_ERROR")])
+
+    def test_scan_lines_matches_scan_line(self):
+        """批量扫描与逐行扫描结果一致"""
+        self.plugin.initialize({"patterns": [
+            {"pattern": r"eval\(", "rule_id": "EVAL"},
+            {"pattern": r"exec\(", "rule_id": "EXEC"},
+        ]})
+        hits = [(1, "eval(x)"), (2, "ok"), (3, "exec(eval(y))")]
+        expected = [result for line_no, line in hits
+                    for result in self.plugin.scan_line("a.py", line_no, line, {})]
+        self.assertEqual(self.plugin.scan_lines("a.py", hits, {}), expected)
+        self.assertEqual(len(expected), 3)
+
+    def test_grep_pattern_from_required_literals(self):
+        """初始化后由正则的必需字面量生成预筛选模式"""
+        self.plugin.initialize({
+            "patterns": [
+                {"pattern": r"eval\(", "rule_id": "EVAL_USAGE"},
+                {"pattern": r"os\.system\s*\(", "rule_id": "OS_SYSTEM"},
+            ]
+        })
+        self.assertEqual(self.plugin.get_grep_pattern(), r"eval\(|os\.system")
+
+    def test_grep_pattern_ignore_case(self):
+        """含忽略大小写的规则时grep整体忽略大小写"""
+        self.plugin.initialize({
+            "patterns": [
+                {"pattern": r"eval\(", "rule_id": "EVAL_USAGE"},
+                {"pattern": r"(?i)select \*", "rule_id": "SELECT_STAR"},
+            ]
+        })
+        self.assertEqual(self.plugin.get_grep_pattern(), r"eval\(|select \*")
+        self.assertEqual(self.plugin.get_grep_flags(), {"ignore_case": True})
+
+    def test_grep_pattern_empty_when_not_prefilterable(self):
+        """存在无法预筛选的正则时返回空串，由scan_file整文件扫描"""
+        self.plugin.initialize({
+            "patterns": [
+                {"pattern": r"eval\(", "rule_id": "EVAL_USAGE"},
+                {"pattern": r"(#)?(?(1)x|y)z", "rule_id": "CONDITIONAL"},
+            ]
+        })
+        self.assertEqual(self.plugin.get_grep_pattern(), "")
+
+        results = self.plugin.scan_file("test.py", "x = 1\nq = 'yz'\neval(s)\n", {})
+        self.assertEqual([(r["line_number"], r["rule_id"]) for r in results],
+                         [(2, "CONDITIONAL"), (3, "EVAL_USAGE")])
 
     def test_get_config_schema(self):
         """测试获取配置schema"""
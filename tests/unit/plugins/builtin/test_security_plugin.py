@@ -11,6 +11,7 @@ import os
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../../..'))
 
+from src.engine.columnar import HAS_PANDAS, iter_line_batches
 from src.plugins.builtin.security_plugin import SecurityScanPlugin
 
 
@@ -77,6 +78,28 @@ class TestSecurityPlugin(unittest.TestCase):
         self.assertIsInstance(results, list)
         self.assertEqual(len(results), 0)
 
+    def test_scan_lines_matches_scan_line(self):
+        """批量扫描与逐行扫描结果一致"""
+        hits = [(1, 'password = "secret1"'), (2, "print('x')"), (5, 'API_KEY = "abc"  # secret_token = "t"')]
+        expected = [result for line_no, line in hits
+                    for result in self.plugin.scan_line("app.py", line_no, line, {})]
+        self.assertEqual(self.plugin.scan_lines("app.py", hits, {}), expected)
+        self.assertEqual([(r["line_number"], r["rule_id"]) for r in expected],
+                         [(1, "PASSWORD_LITERAL"), (5, "API_KEY_LITERAL"), (5, "SECRET_TOKEN")])
+
+
+    @unittest.skipUnless(HAS_PANDAS, "pandas not installed")
+    def test_scan_batch_matches_scan_lines(self):
+        """列式批量扫描与按文件扫描结果一致"""
+        files = {
+            "app.py": [(1, 'password = "secret1"'), (2, "print('x')")],
+            "conf.js": [(5, 'API_KEY = "abc"  # secret_token = "t"')],
+        }
+        batch, _ = next(iter_line_batches([(path, line_no, line, None)
+                                           for path, hits in files.items() for line_no, line in hits]))
+        expected = [result for path, hits in files.items() for result in self.plugin.scan_lines(path, hits, {})]
+        self.assertEqual(self.plugin.scan_batch(batch, {}), expected)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
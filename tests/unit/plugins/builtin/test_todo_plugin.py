@@ -11,6 +11,7 @@ import os
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../../..'))
 
+from src.engine.pattern_compiler import plugin_pattern
 from src.plugins.builtin.todo_plugin import TodoScanPlugin
 
 
@@ -45,6 +46,12 @@ class TestTodoPlugin(unittest.TestCase):
         self.assertIn("FIXME", pattern)
         self.assertIn("BUG", pattern)
 
+    def test_grep_pattern_is_case_sensitive(self):
+        """预扫描区分大小写，小写的debug、todo等标识符不进入分析阶段"""
+        regex = plugin_pattern(self.plugin).python_regex()
+        self.assertIsNotNone(regex.search("# BUG: off by one"))
+        self.assertIsNone(regex.search("logger.debug(todo_list)"))
+
     def test_initialize(self):
         """测试插件初始化"""
         config = {}
@@ -37,6 +37,15 @@ class TestCustomSecurityRules(unittest.TestCase):
         except ImportError:
             self.skipTest("安全规则模块不存在或有导入问题")
 
+    def test_hardcoded_password_prefilter(self):
+        """预扫描只匹配password关键字（区分大小写）"""
+        from src.engine.pattern_compiler import plugin_pattern
+        from src.plugins.custom.security_rules import HardcodedPasswordRule
+        regex = plugin_pattern(HardcodedPasswordRule()).python_regex()
+        self.assertIsNotNone(regex.search('password = "123"'))
+        self.assertIsNone(regex.search('token = "abc"'))
+        self.assertIsNone(regex.search('PASSWORD = "123"'))
+
     def test_weak_crypto_rule(self):
         """测试弱加密算法规则"""
         try:
@@ -49,6 +58,19 @@ class TestCustomSecurityRules(unittest.TestCase):
         except ImportError:
             self.skipTest("安全规则模块不存在或有导入问题")
 
+    def test_weak_crypto_scan_line(self):
+        """测试弱加密算法规则按算法逐个报告并忽略说明文字"""
+        from src.plugins.custom.security_rules import WeakCryptographicAlgorithmRule
+        rule = WeakCryptographicAlgorithmRule()
+        rule.initialize({})
+
+        results = rule.scan_line("a.py", 3, "h = MD5(data) if legacy else SHA1(data)", None)
+        self.assertEqual([r.message for r in results],
+                         ["Weak cryptographic algorithm MD5 detected",
+                          "Weak cryptographic algorithm SHA1 detected"])
+        self.assertEqual(rule.scan_line("a.py", 4, "# note: MD5 is weak", None), [])
+        self.assertEqual(rule.scan_line("a.py", 5, "h = sha256(data)", None), [])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
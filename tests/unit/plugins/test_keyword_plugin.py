@@ -59,6 +59,16 @@ class TestKeywordPlugin(unittest.TestCase):
         self.assertEqual(results[0]["line_number"], 10)
         self.assertEqual(results[0]["message"], "发现关键字: TODO")
 
+    def test_scan_line_multiple_keywords(self):
+        """测试单行多个关键字按配置顺序报告，大小写设置生效"""
+        self.plugin.initialize({"keywords": ["TODO", "FIXME", "BUG"], "case_sensitive": False})
+        results = self.plugin.scan_line("test.py", 1, "# fixme: bug in todo list", {})
+        self.assertEqual([r["rule_id"] for r in results], ["KEYWORD_TODO", "KEYWORD_FIXME", "KEYWORD_BUG"])
+
+        self.plugin.initialize({"keywords": ["TODO", "FIXME", "BUG"], "case_sensitive": True})
+        results = self.plugin.scan_line("test.py", 1, "# fixme: BUG in todo list", {})
+        self.assertEqual([r["rule_id"] for r in results], ["KEYWORD_BUG"])
+
     def test_get_grep_pattern(self):
         """测试获取grep模式"""
         # 初始化插件
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aho–Corasick匹配测试
+"""
+
+import unittest
+import sys
+import os
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.utils.aho_corasick import AhoCorasick, parse_literal_alternation, literals_for_patterns
+
+
+class TestAhoCorasick(unittest.TestCase):
+    """Aho–Corasick匹配测试类"""
+
+    def test_overlapping_matches_with_offsets(self):
+        """测试重叠匹配与偏移量"""
+        matcher = AhoCorasick(["he", "she", "his", "hers"])
+
+        matches = sorted(matcher.iter_matches("ushers"))
+
+        self.assertEqual(matches, [(1, "she"), (2, "he"), (2, "hers")])
+
+    def test_case_insensitive_and_order(self):
+        """测试不区分大小写，结果按构建顺序去重"""
+        matcher = AhoCorasick(["FIXME", "TODO", "BUG"], case_sensitive=False)
+
+        self.assertEqual(matcher.find_literals("todo: fix bug, then TODO fixme"), ["FIXME", "TODO", "BUG"])
+        self.assertFalse(matcher.search("nothing here"))
+
+    def test_find_first_from_offset(self):
+        """测试从指定位置开始查找"""
+        matcher = AhoCorasick([b"MD5", b"DES"])
+        text = b"use MD5\nuse DES\n"
+
+        self.assertEqual(matcher.find_first(text), (4, b"MD5"))
+        self.assertEqual(matcher.find_first(text, 8), (12, b"DES"))
+        self.assertIsNone(matcher.find_first(text, 15))
+        self.assertEqual(list(matcher.iter_matches(text, 5)), [(12, b"DES")])
+
+    def test_matches_regex_reference(self):
+        """测试与逐个关键字查找的结果一致"""
+        keywords = [f"kw{i}" for i in range(300)] + ["k", "w1"]
+        matcher = AhoCorasick(keywords)
+        text = "x kw12 y kw299 z kw3w1"
+
+        expected = [keyword for keyword in keywords if keyword in text]
+        self.assertEqual(matcher.find_literals(text), expected)
+
+    def test_parse_literal_alternation(self):
+        """测试识别字面量交替"""
+        self.assertEqual(parse_literal_alternation(r"TODO|FIXME|a\.b"), ["TODO", "FIXME", "a.b"])
+        self.assertIsNone(parse_literal_alternation(r"pass\w+"))
+        self.assertIsNone(parse_literal_alternation("eval("))
+        self.assertEqual(parse_literal_alternation(r"eval\("), ["eval("])
+        self.assertIsNone(parse_literal_alternation("a||b"))
+        self.assertEqual(literals_for_patterns(["MD5|SHA1", "password"]), ["MD5", "SHA1", "password"])
+        self.assertIsNone(literals_for_patterns(["MD5", "eval.*"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
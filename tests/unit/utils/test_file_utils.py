@@ -12,7 +12,7 @@ import tempfile
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
 
-from src.utils.file_utils import is_binary_file
+from src.utils.file_utils import is_binary_file, walk_files
 
 
 class TestFileUtils(unittest.TestCase):
@@ -48,6 +48,18 @@ class TestFileUtils(unittest.TestCase):
         result = is_binary_file(binary_file)
         self.assertTrue(result)
 
+    def test_walk_files_prunes_ignored_dirs(self):
+        """测试遍历文件时按目录名精确剪枝"""
+        for rel_path in ("build/a.py", "rebuild/b.py", "c.js"):
+            full_path = os.path.join(self.temp_dir, rel_path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'w', encoding='utf-8') as f:
+                f.write("x = 1\n")
+
+        result = list(walk_files(self.temp_dir, [".py"], ["build"]))
+
+        self.assertEqual(result, [os.path.join(self.temp_dir, "rebuild", "b.py")])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
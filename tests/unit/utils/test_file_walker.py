@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件遍历器测试
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.utils.file_walker import FileWalker, glob_to_regex, parse_ignore_lines, is_ignored
+
+
+class TestFileWalker(unittest.TestCase):
+    """文件遍历器测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, rel_path, content="x\n"):
+        full_path = os.path.join(self.temp_dir, rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def _walk(self, **options):
+        return [entry.rel_path.replace(os.sep, '/') for entry in FileWalker(self.temp_dir, **options).walk()]
+
+    def test_ignore_dirs_match_exact_names(self):
+        """测试忽略目录按名称精确匹配，不误伤包含该子串的目录"""
+        self._write("build/out.py")
+        self._write("src/rebuild_tool/main.py")
+        self._write("src/app.py")
+
+        files = self._walk(ignore_dirs=["build"])
+
+        self.assertEqual(files, ["src/app.py", "src/rebuild_tool/main.py"])
+
+    def test_extension_filter_and_metadata(self):
+        """测试扩展名过滤与文件元数据"""
+        self._write("a.py", "print(1)\n")
+        self._write("b.txt")
+
+        entries = list(FileWalker(self.temp_dir, extensions=[".py"]).walk())
+
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].rel_path, "a.py")
+        self.assertEqual(entries[0].ext, ".py")
+        self.assertEqual(entries[0].size, 9)
+
+    def test_gitignore_semantics(self):
+        """测试.gitignore的通配、目录规则、取反与逐级继承"""
+        self._write(".gitignore", "*.log.py\n/generated/\n!keep.log.py\n")
+        self._write("a.log.py")
+        self._write("keep.log.py")
+        self._write("generated/g.py")
+        self._write("pkg/generated/g.py")
+        self._write("pkg/.gitignore", "local.py\n")
+        self._write("pkg/local.py")
+        self._write("local.py")
+
+        files = self._walk(extensions=[".py"])
+
+        self.assertEqual(files, ["keep.log.py", "local.py", "pkg/generated/g.py"])
+
+    def test_gitignore_can_be_disabled_but_scanignore_applies(self):
+        """测试关闭.gitignore时.scanignore仍然生效"""
+        self._write(".gitignore", "a.py\n")
+        self._write(".scanignore", "b.py\n")
+        self._write("a.py")
+        self._write("b.py")
+
+        self.assertEqual(self._walk(extensions=[".py"]), [])
+        self.assertEqual(self._walk(extensions=[".py"], respect_gitignore=False), ["a.py"])
+
+    def test_include_exclude_globs(self):
+        """测试include/exclude通配规则"""
+        self._write("src/a.py")
+        self._write("src/a_test.py")
+        self._write("tests/b.py")
+        self._write("vendor/lib/c.py")
+
+        files = self._walk(include=["src/**", "*.py"], exclude=["*_test.py", "vendor"])
+
+        self.assertEqual(files, ["src/a.py", "tests/b.py"])
+        self.assertEqual(self._walk(include=["src/*.py"]), ["src/a.py", "src/a_test.py"])
+
+    @unittest.skipIf(os.name == 'nt', "Windows创建符号链接需要额外权限")
+    def test_symlink_loop_detected(self):
+        """测试跟随符号链接时检测目录环"""
+        self._write("pkg/a.py")
+        os.symlink(os.path.join(self.temp_dir, "pkg"), os.path.join(self.temp_dir, "pkg", "loop"))
+        os.symlink(os.path.join(self.temp_dir, "pkg"), os.path.join(self.temp_dir, "alias"))
+
+        self.assertEqual(self._walk(), ["pkg/a.py"])
+        # 同一目录只遍历一次，经由哪条路径取决于名称顺序
+        self.assertEqual(self._walk(follow_symlinks=True), ["alias/a.py"])
+
+    def test_glob_to_regex(self):
+        """测试通配模式转换"""
+        import re
+        self.assertTrue(re.fullmatch(glob_to_regex("**/foo/*.py"), "a/b/foo/x.py"))
+        self.assertTrue(re.fullmatch(glob_to_regex("**/foo/*.py"), "foo/x.py"))
+        self.assertFalse(re.fullmatch(glob_to_regex("foo/*.py"), "foo/a/x.py"))
+        self.assertTrue(re.fullmatch(glob_to_regex("foo/**"), "foo/a/x.py"))
+        self.assertTrue(re.fullmatch(glob_to_regex("[!a]?.py"), "bc.py"))
+        self.assertFalse(re.fullmatch(glob_to_regex("[!a]?.py"), "ac.py"))
+
+    def test_is_ignored_last_rule_wins(self):
+        """测试最后一条匹配的规则生效"""
+        rules = parse_ignore_lines(["*.py", "!main.py", "# comment", ""])
+        self.assertTrue(is_ignored(rules, "src/a.py", False))
+        self.assertFalse(is_ignored(rules, "src/main.py", False))
+        self.assertFalse(is_ignored(rules, "README.md", False))
+
+
+if __name__ == '__main__':
+    unittest.main()
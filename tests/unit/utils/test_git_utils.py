@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Git工具函数测试
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.utils.git_utils import is_git_work_tree, get_changed_files, list_files
+
+
+@unittest.skipUnless(shutil.which("git"), "系统中未安装git")
+class TestGitUtils(unittest.TestCase):
+    """Git工具函数测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self._git("init", "-q")
+        self._write("keep.py", "a = 1\n")
+        self._write("edit.py", "b = 1\n")
+        self._write("gone.py", "c = 1\n")
+        self._commit("base")
+        self.base = self._git("rev-parse", "HEAD").strip()
+
+        self._write("edit.py", "b = 2\n")
+        os.remove(os.path.join(self.temp_dir, "gone.py"))
+        self._write("sub/new.py", "d = 1\n")
+        self._commit("change")
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir)
+
+    def _git(self, *args):
+        return subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"] + list(args),
+            cwd=self.temp_dir, capture_output=True, text=True, check=True
+        ).stdout
+
+    def _write(self, rel_path, content):
+        full_path = os.path.join(self.temp_dir, rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def _commit(self, message):
+        self._git("add", "-A")
+        self._git("commit", "-q", "-m", message)
+
+    def test_is_git_work_tree(self):
+        """测试git工作区检测"""
+        self.assertTrue(is_git_work_tree(self.temp_dir))
+        plain_dir = tempfile.mkdtemp()
+        try:
+            self.assertFalse(is_git_work_tree(plain_dir))
+        finally:
+            shutil.rmtree(plain_dir)
+
+    def test_changed_files_in_range(self):
+        """测试提交区间内的变更文件，不含已删除文件"""
+        changed = get_changed_files(self.temp_dir, rev_range=f"{self.base}..HEAD")
+        self.assertEqual(sorted(changed), ["edit.py", os.path.join("sub", "new.py")])
+
+    def test_changed_files_since_includes_worktree(self):
+        """测试since模式包含工作区修改和未跟踪文件"""
+        self._write("keep.py", "a = 2\n")
+        self._write("untracked.py", "e = 1\n")
+
+        changed = get_changed_files(self.temp_dir, since="HEAD")
+
+        self.assertEqual(sorted(changed), ["keep.py", "untracked.py"])
+
+    def test_changed_files_relative_to_subdir(self):
+        """测试子目录作为仓库路径时返回相对子目录的路径"""
+        changed = get_changed_files(os.path.join(self.temp_dir, "sub"), rev_range=f"{self.base}..HEAD")
+        self.assertEqual(changed, ["new.py"])
+
+    def test_list_files(self):
+        """测试从git索引列出文件，可选包含未跟踪但未被忽略的文件"""
+        self._write(".gitignore", "*.log\n")
+        self._write("debug.log", "x\n")
+        self._write("untracked.py", "e = 1\n")
+
+        self.assertEqual(list_files(self.temp_dir), ["edit.py", "keep.py", os.path.join("sub", "new.py")])
+        self.assertEqual(
+            sorted(list_files(self.temp_dir, include_untracked=True)),
+            [".gitignore", "edit.py", "keep.py", os.path.join("sub", "new.py"), "untracked.py"]
+        )
+
+    def test_invalid_revision_raises(self):
+        """测试无效提交抛出RuntimeError"""
+        with self.assertRaises(RuntimeError):
+            get_changed_files(self.temp_dir, since="no-such-rev")
+
+
+if __name__ == '__main__':
+    unittest.main()
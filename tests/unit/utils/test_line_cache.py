@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件行缓存测试
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.utils.line_cache import LineCache, MappedFile
+
+
+class TestLineCache(unittest.TestCase):
+    """文件行缓存测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_read_lines(self):
+        """按行读取原始字节，结尾有无换行和空文件"""
+        cases = [
+            (b"a\nbb\nccc\n", [b"a", b"bb", b"ccc"]),
+            (b"a\nbb\nccc", [b"a", b"bb", b"ccc"]),
+            (b"\n\n", [b"", b""]),
+            (b"", []),
+        ]
+        for data, lines in cases:
+            mapped = MappedFile(self.write("f.txt", data))
+            try:
+                self.assertEqual(mapped.line_count, len(lines), data)
+                self.assertEqual(mapped.read_lines(1, 10), lines, data)
+            finally:
+                mapped.close()
+
+    def test_get_lines(self):
+        """按行号范围读取，范围超出文件时截断，去掉CRLF换行"""
+        path = self.write("app.py", "x = 1\r\npassword = '密码'\n\nlast".encode("utf-8"))
+        cache = LineCache()
+        self.assertEqual(cache.get_lines(path, 2, 3), ["password = '密码'", ""])
+        self.assertEqual(cache.get_lines(path, 0, 1), ["x = 1"])
+        self.assertEqual(cache.get_lines(path, 4, 10), ["last"])
+        self.assertEqual(cache.get_lines(path, 5, 10), [])
+        self.assertEqual(cache.get_lines(path, 3, 2), [])
+        self.assertEqual(cache.get_lines(os.path.join(self.temp_dir.name, "missing.py"), 1, 2), [])
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        """超出容量时关闭最久未用的文件，访问会刷新顺序"""
+        paths = [self.write(f"{index}.py", b"line\n") for index in range(3)]
+        cache = LineCache(max_files=2)
+        first = cache.get(paths[0])
+        cache.get(paths[1])
+        self.assertIs(cache.get(paths[0]), first)
+        cache.get(paths[2])
+
+        self.assertEqual(len(cache), 2)
+        self.assertIs(cache.get(paths[0]), first)
+        self.assertEqual(first.read_lines(1, 1), [b"line"])
+        self.assertIsNot(cache.get(paths[1]), None)
+        self.assertEqual(len(cache), 2)
+        cache.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正则表达式分析测试
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import sys
+import unittest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.utils.regex_literals import escape_ere, regex_prefilter, required_literals, translate_to_ere
+
+# 预筛选一致性检查用例: (正则, 样本行)，以re.ASCII编译
+SAMPLES = [
+    (r"eval\(", ["eval(x)", "evaluate", "x = eval (1)"]),
+    (r"password\s*=\s*['\"]", ["password = 'x'", "password=\"y\"", "password: x", "pass = 'x'"]),
+    (r"\bfoo(bar|baz)\d+", ["foobar1", "xfoobaz22", "foobar", "foo bar1"]),
+    (r"os\.system|subprocess\.(call|run)", ["os.system(c)", "subprocess.run(x)", "ossystem", "subprocess.Popen"]),
+    (r"\d{3}-\d{4}", ["555-1234", "55-1234", "tel 123-45678"]),
+    (r"a(?=b)c", ["ac", "abc", "xx"]),
+    (r"(ab)+\1", ["abab", "ab", "aabb"]),
+    (r"a(|b)c", ["ac", "abc", "abbc"]),
+    (r"[^\s]+@[\w.]+", ["a@b.c", "@b", "user@"]),
+    (r"[]a^-]x", ["]x", "^x", "-x", "bx"]),
+    (r"^\s*import\s+\w+$", ["import os", "  import sys", "from x import y", "import a b"]),
+    (r"TODO:.*?done", ["TODO: not done", "TODO done", "done TODO:"]),
+]
+
+
+class TestRequiredLiterals(unittest.TestCase):
+    """必需字面量提取测试类"""
+
+    def test_literal_runs(self):
+        """选择最长的必需字面量"""
+        self.assertEqual(required_literals(r"eval\("), ["eval("])
+        self.assertEqual(required_literals(r"password\s*=\s*['\"]"), ["password"])
+        self.assertEqual(required_literals(r"\w+\.execute\(\s*f['\"]"), [".execute("])
+
+    def test_alternation(self):
+        """交替取各分支必需字面量的并集"""
+        self.assertEqual(required_literals(r"(?:TODO|FIXME):"), ["TODO", "FIXME"])
+        self.assertEqual(required_literals(r"os\.system|subprocess\.(call|run)"), ["os.system", "subprocess."])
+
+    def test_repeats(self):
+        """至少出现一次的重复保留其必需字面量，可选部分不提供字面量"""
+        self.assertEqual(required_literals(r"(?:abc)+x"), ["abc"])
+        self.assertIsNone(required_literals(r"(?:abc)?x"))
+
+    def test_no_usable_literals(self):
+        """字面量过短、忽略大小写或模式无效时返回None"""
+        self.assertIsNone(required_literals(r"\d{3}-\d{4}"))
+        self.assertIsNone(required_literals(r"ab|cdef"))
+        self.assertIsNone(required_literals(r"(?i)password"))
+        self.assertIsNone(required_literals(r"password", re.IGNORECASE))
+        self.assertIsNone(required_literals(r"["))
+
+
+class TestTranslateToEre(unittest.TestCase):
+    """ERE转换测试类"""
+
+    def test_python_classes_translated(self):
+        """re.ASCII下\\d、\\s、\\w转换为方括号表达式"""
+        self.assertEqual(translate_to_ere(r"\d+\s\w", re.ASCII), "[0-9]+[[:space:]][[:alnum:]_]")
+        self.assertEqual(translate_to_ere(r"(?a)\D"), "[^0-9]")
+
+    def test_unicode_classes_rejected(self):
+        """Unicode语义的\\d、\\w匹配全角数字和汉字，转换为方括号表达式会更严格，放弃转换"""
+        self.assertIsNotNone(re.search(r"\d{3}", "\uff11\uff12\uff13"))
+        self.assertIsNone(translate_to_ere(r"\d{3}"))
+        self.assertIsNone(translate_to_ere(r"[\w.]+@"))
+        self.assertIsNone(regex_prefilter(r"\d{3}-\d{4}"))
+        # 含有足够长的必需字面量时仍使用字面量预筛选
+        self.assertEqual(regex_prefilter(r"password\s*="), "password")
+
+    def test_assertions_dropped_and_lazy_made_greedy(self):
+        """断言省略、非贪婪量词按贪婪处理"""
+        self.assertEqual(translate_to_ere(r"\bfoo(?=bar)"), "foo")
+        self.assertEqual(translate_to_ere(r"a.*?b"), "a.*b")
+        self.assertEqual(translate_to_ere(r"a(|b)c"), "a((b)?)c")
+
+    def test_rejected(self):
+        """忽略大小写或匹配任意行的模式无法转换"""
+        self.assertIsNone(translate_to_ere(r"(?i)foo"))
+        self.assertIsNone(translate_to_ere(r"a(?i:b)"))
+        self.assertIsNone(translate_to_ere(r"\b"))
+        self.assertIsNone(translate_to_ere(r"x*"))
+
+    def test_escape_ere(self):
+        """ERE特殊字符被转义"""
+        self.assertEqual(escape_ere("a.b(c)|d"), r"a\.b\(c\)\|d")
+
+    @unittest.skipUnless(shutil.which("grep"), "grep not available")
+    def test_prefilter_never_rejects_matching_lines(self):
+        """grep预筛选保留所有能被原正则匹配的行"""
+        for pattern, lines in SAMPLES:
+            prefilter = regex_prefilter(pattern, re.ASCII)
+            self.assertIsNotNone(prefilter, pattern)
+            result = subprocess.run(
+                ["grep", "-E", "-e", prefilter],
+                input="\n".join(lines) + "\n", capture_output=True, text=True,
+                env=dict(os.environ, LC_ALL="C.UTF-8")
+            )
+            self.assertIn(result.returncode, (0, 1), result.stderr)
+            kept = set(result.stdout.splitlines())
+            for line in lines:
+                if re.search(pattern, line, re.ASCII):
+                    self.assertIn(line, kept, f"{pattern!r} / {prefilter!r}")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,12 +7,14 @@
 import unittest
 import sys
 import os
+from unittest.mock import patch
 
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
 
+from src.utils import text_utils
 from src.utils.text_utils import (
-    extract_code_snippets, highlight_text, truncate_text, 
+    LineIndex, extract_code_snippets, highlight_text, truncate_text, 
     normalize_whitespace, count_lines, find_pattern_positions
 )
 
@@ -87,5 +89,47 @@ class TestTextUtils(unittest.TestCase):
             self.assertIn("line_number", position)
 
 
+    def test_extract_code_snippets_reuses_index(self):
+        """行索引与原先按换行拆分的片段一致，可复用于多次提取"""
+        text = "line 1\nline 2\r\n\nline 4\n"
+        index = LineIndex.from_text(text)
+        snippets = extract_code_snippets(index, [1, 3, 5], context_lines=1)
+
+        self.assertEqual(snippets, extract_code_snippets(text, [1, 3, 5], context_lines=1))
+        self.assertEqual(snippets[0]["snippet"], "   1 | line 1\n     | line 2\r")
+        self.assertEqual(snippets[2]["snippet"], "     | line 4\n   5 | ")
+        self.assertEqual(count_lines(index), count_lines(text))
+
+
+class TestLineIndex(unittest.TestCase):
+    """换行偏移索引测试类"""
+
+    def _assert_index(self):
+        data = "ab\n\n中文\nlast".encode("utf-8")
+        index = LineIndex(data)
+        self.assertEqual(index.newline_count, 3)
+        self.assertEqual(index.line_count, 4)
+        self.assertEqual([index.line_of(offset) for offset in (0, 2, 3, 4, len(data) - 1)], [1, 1, 2, 3, 4])
+        self.assertEqual(index.span(2), (3, 3))
+        self.assertEqual(index.line(3), "中文")
+        self.assertEqual(index.line(4), "last")
+        with self.assertRaises(IndexError):
+            index.span(5)
+
+        trailing = LineIndex(b"a\nb\n")
+        self.assertEqual(trailing.line_count, 2)
+        self.assertEqual(trailing.line(3), "")
+        self.assertEqual(LineIndex(b"").line_count, 0)
+
+    def test_line_index(self):
+        """偏移到行号、行号到范围的查询"""
+        self._assert_index()
+
+    def test_line_index_without_numpy(self):
+        """未安装NumPy时的纯Python实现结果相同"""
+        with patch.object(text_utils, "HAS_NUMPY", False):
+            self._assert_index()
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file